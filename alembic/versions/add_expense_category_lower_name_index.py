@@ -0,0 +1,29 @@
+"""add lower(name) index on expense categories
+
+Revision ID: add_expense_category_lower_name_index
+Revises: add_trigram_search_indexes
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_expense_category_lower_name_index'
+down_revision = 'add_trigram_search_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Case-insensitive category name checks compare lower(name)
+    op.create_index(
+        'ix_expense_categories_lower_name',
+        'expense_categories',
+        [sa.text('lower(name)')]
+    )
+
+
+def downgrade():
+    op.drop_index('ix_expense_categories_lower_name', table_name='expense_categories')
@@ -0,0 +1,97 @@
+"""add index inventory materialized view
+
+Revision ID: add_index_inventory_view
+Revises: add_expense_category_lower_name_index
+Create Date: 2026-10-16 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_index_inventory_view'
+down_revision = 'add_expense_category_lower_name_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Snapshot of scripts/list_all_indexes.py's catalog read, so the reports don't
+    # have to stat every index file on each run
+    op.execute("""
+        CREATE MATERIALIZED VIEW IF NOT EXISTS mv_index_inventory AS
+        WITH public_indexes AS MATERIALIZED (
+            SELECT 
+                i.*,
+                n.nspname as schemaname,
+                t.relname as tablename,
+                c.relname as indexname,
+                pg_relation_size(i.indexrelid) as index_size_bytes
+            FROM pg_index i
+            JOIN pg_class c ON c.oid = i.indexrelid
+            JOIN pg_class t ON t.oid = i.indrelid
+            JOIN pg_namespace n ON n.oid = t.relnamespace
+            WHERE n.nspname = 'public'
+        )
+        SELECT 
+            x.schemaname,
+            x.tablename,
+            x.indexname,
+            pg_get_indexdef(x.indexrelid) as indexdef,
+            pg_size_pretty(x.index_size_bytes) as index_size,
+            x.index_size_bytes,
+            s.idx_scan as times_used,
+            s.idx_tup_read as tuples_read,
+            s.idx_tup_fetch as tuples_fetched,
+            CASE 
+                WHEN s.idx_scan = 0 THEN '❌ NEVER USED'
+                WHEN s.idx_scan < 10 THEN '⚠️  RARELY USED'
+                WHEN s.idx_scan < 100 THEN '🟡 LOW USAGE'
+                WHEN s.idx_scan < 1000 THEN '🟢 MODERATE USAGE'
+                ELSE '🔥 HIGH USAGE'
+            END as usage_status,
+            x.indkey::text as index_columns,
+            x.indnkeyatts as key_column_count,
+            x.indclass::text as index_opclasses,
+            x.indisunique as is_unique,
+            pg_get_expr(x.indexprs, x.indrelid) as index_expressions,
+            pg_get_expr(x.indpred, x.indrelid) as index_predicate,
+            now() as captured_at
+        FROM public_indexes x
+        LEFT JOIN pg_stat_user_indexes s ON s.indexrelid = x.indexrelid
+    """)
+    # A unique index is what allows REFRESH MATERIALIZED VIEW CONCURRENTLY
+    op.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS ix_mv_index_inventory_schemaname_indexname
+        ON mv_index_inventory (schemaname, indexname)
+    """)
+    # Refresh nightly where pg_cron is available; elsewhere the snapshot goes stale and
+    # list_all_indexes.py reads the catalog once it is more than a day old
+    op.execute("""
+        DO $$
+        BEGIN
+            IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_cron') THEN
+                PERFORM cron.schedule(
+                    'refresh_mv_index_inventory',
+                    '0 3 * * *',
+                    'REFRESH MATERIALIZED VIEW CONCURRENTLY mv_index_inventory'
+                );
+            END IF;
+        END
+        $$
+    """)
+
+
+def downgrade():
+    op.execute("""
+        DO $$
+        BEGIN
+            IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_cron') THEN
+                PERFORM cron.unschedule(jobid) FROM cron.job
+                WHERE jobname = 'refresh_mv_index_inventory';
+            END IF;
+        END
+        $$
+    """)
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS mv_index_inventory")
@@ -0,0 +1,42 @@
+"""add unique index for job created notifications
+
+Revision ID: add_notification_dedupe_index
+Revises: make_job_end_date_nullable
+Create Date: 2026-10-16 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_notification_dedupe_index'
+down_revision = 'make_job_end_date_nullable'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Remove duplicate job created notifications, keeping the earliest one
+    op.execute("""
+        DELETE FROM notifications a
+        USING notifications b
+        WHERE a.type = 'job_created'
+          AND b.type = 'job_created'
+          AND a.user_id = b.user_id
+          AND a.related_id = b.related_id
+          AND a.id > b.id
+    """)
+    
+    # One notification per user for each job created from an invoice
+    op.create_index(
+        'uq_notifications_job_created_user_related',
+        'notifications',
+        ['user_id', 'type', 'related_id'],
+        unique=True,
+        postgresql_where=sa.text("type = 'job_created'")
+    )
+
+
+def downgrade():
+    op.drop_index('uq_notifications_job_created_user_related', table_name='notifications')
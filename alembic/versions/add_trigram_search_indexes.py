@@ -0,0 +1,34 @@
+"""add trigram indexes for task and job search
+
+Revision ID: add_trigram_search_indexes
+Revises: add_notification_dedupe_index
+Create Date: 2026-10-16 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_trigram_search_indexes'
+down_revision = 'add_notification_dedupe_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Trigram GIN indexes let ILIKE '%term%' searches use an index instead of a sequential scan
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS ix_tasks_title_description_trgm
+        ON tasks USING gin (title gin_trgm_ops, description gin_trgm_ops)
+    """)
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS ix_jobs_title_client_trgm
+        ON jobs USING gin (title gin_trgm_ops, client gin_trgm_ops)
+    """)
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_jobs_title_client_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_tasks_title_description_trgm")
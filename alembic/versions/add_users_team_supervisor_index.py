@@ -0,0 +1,31 @@
+"""add (team_id, supervisor_id) index on users
+
+Revision ID: add_users_team_supervisor_index
+Revises: add_index_inventory_view
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_users_team_supervisor_index'
+down_revision = 'add_index_inventory_view'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The team supervisor update groups users with a supervisor by team_id and takes
+    # min(supervisor_id); this partial index answers that with an index-only scan
+    op.create_index(
+        'ix_users_team_id_supervisor_id',
+        'users',
+        ['team_id', 'supervisor_id'],
+        postgresql_where=sa.text("supervisor_id IS NOT NULL")
+    )
+
+
+def downgrade():
+    op.drop_index('ix_users_team_id_supervisor_id', table_name='users')
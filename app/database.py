@@ -12,6 +12,10 @@ engine = create_engine(
     pool_timeout=settings.db_pool_timeout,  # Seconds to wait for connection
     pool_recycle=settings.db_pool_recycle,  # Recycle connections after 1 hour
     pool_pre_ping=settings.db_pool_pre_ping, # Validate connections before use
+    # psycopg2: send executemany() UPDATE/DELETE batches as a few pages of
+    # statements (execute_batch) instead of one round trip per row
+    executemany_mode="values_plus_batch",
+    executemany_batch_page_size=1000,
     echo=settings.sql_echo  # Control SQL query logging via config
 )
 
@@ -40,9 +44,15 @@ def get_pool_status():
     }
 
 
-def fix_sequences():
-    """Fix all database sequences to prevent duplicate key violations"""
-    db = SessionLocal()
+def fix_sequences(db=None):
+    """Fix all database sequences to prevent duplicate key violations
+
+    When a session is passed in, the caller owns it: nothing is committed here
+    and errors propagate so the caller can roll back.
+    """
+    owns_session = db is None
+    if owns_session:
+        db = SessionLocal()
     try:
         tables_and_sequences = [
             ('teams', 'teams_id_seq'),
@@ -59,23 +69,33 @@ def fix_sequences():
         
         for table, sequence in tables_and_sequences:
             try:
-                # Get max ID from table
-                result = db.execute(text(f'SELECT MAX(id) FROM {table}'))
-                max_id = result.scalar() or 0
-                
-                # Reset sequence to start from max_id + 1
-                next_val = max_id + 1
-                db.execute(text(f'SELECT setval(\'{sequence}\', {next_val}, false)'))
+                # A savepoint per sequence: on PostgreSQL a failed statement would
+                # otherwise abort the whole transaction, and every later statement with it
+                with db.begin_nested():
+                    # Get max ID from table
+                    result = db.execute(text(f'SELECT MAX(id) FROM {table}'))
+                    max_id = result.scalar() or 0
+                    
+                    # Reset sequence to start from max_id + 1
+                    next_val = max_id + 1
+                    db.execute(text(f'SELECT setval(\'{sequence}\', {next_val}, false)'))
                 print(f'Fixed {sequence} to start from {next_val}')
                 
             except Exception as e:
+                # The caller's later steps share this transaction; let it see the real cause
+                if not owns_session:
+                    raise
                 print(f'Error fixing {sequence}: {e}')
         
-        db.commit()
+        if owns_session:
+            db.commit()
         print('All sequences fixed successfully!')
         
     except Exception as e:
+        if not owns_session:
+            raise
         print(f'Error fixing sequences: {e}')
         db.rollback()
     finally:
-        db.close()
+        if owns_session:
+            db.close()
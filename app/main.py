@@ -5,17 +5,28 @@ from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
 import logging
 import os
+import queue
 import time
+from logging.handlers import QueueHandler, QueueListener
 from app.config import settings
 from app.database import engine, Base, get_pool_status
-from app.routers import auth, users, teams, jobs, tasks, attendance, reminders, notifications, staff_profiles, financial_dashboard, dashboard, performance, unified_apis, websocket, expenses, expense_categories, financial_analytics, invoices, cache_management
+from app.routers import auth, users, teams, jobs, tasks, attendance, reminders, notifications, staff_profiles, financial_dashboard, dashboard, performance, unified_apis, websocket, expenses, expense_categories, financial_analytics, invoices, cache_management, exports
 from app.services.reminder_service import reminder_service
 from app.services.robust_cache_service import robust_cache
 from app.services.notification_queue import notification_queue
+from app.services.background_export_service import background_export_service
 from app.middleware.auth_middleware import AuthenticationMiddleware
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Configure logging: records are handed off to a listener thread so request
+# handlers and worker threads never block on stdout
+_log_queue = queue.Queue(-1)
+_log_queue_handler = QueueHandler(_log_queue)
+_log_queue_handler.setFormatter(logging.Formatter("%(message)s"))
+_log_stream_handler = logging.StreamHandler()
+_log_stream_handler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+log_listener = QueueListener(_log_queue, _log_stream_handler, respect_handler_level=True)
+logging.basicConfig(level=logging.INFO, handlers=[_log_queue_handler], force=True)
+log_listener.start()
 logger = logging.getLogger(__name__)
 
 
@@ -56,6 +67,9 @@ async def lifespan(app: FastAPI):
     logger.info("Notification queue stopped")
     reminder_service.stop()
     logger.info("Reminder service stopped")
+    background_export_service.shutdown()
+    logger.info("Background export service stopped")
+    log_listener.stop()
 
 
 # Create FastAPI app
@@ -124,6 +138,7 @@ app.include_router(expense_categories.router)
 app.include_router(financial_analytics.router)
 app.include_router(invoices.router)
 app.include_router(cache_management.router)
+app.include_router(exports.router)
 
 # Create uploads directory using configured base directory
 upload_base_dir = settings.get_upload_base_dir()
@@ -40,7 +40,8 @@ class AuthenticationMiddleware(BaseHTTPMiddleware):
         "/expenses/",
         "/notifications/",
         "/websocket/",
-        "/cache/"
+        "/cache/",
+        "/exports/"
     }
 
     async def dispatch(self, request: Request, call_next) -> Response:
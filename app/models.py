@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Float, ForeignKey, Text, Enum as SQLEnum, Date, Index
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Float, ForeignKey, Text, Enum as SQLEnum, Date, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -100,6 +100,12 @@ class User(Base):
     __table_args__ = (
         Index('ix_users_team_id', 'team_id'),
         Index('ix_users_supervisor_id', 'supervisor_id'),
+        # Team supervisor lookup: min(supervisor_id) per team, read from the index alone
+        Index(
+            'ix_users_team_id_supervisor_id',
+            'team_id', 'supervisor_id',
+            postgresql_where=text("supervisor_id IS NOT NULL")
+        ),
     )
     
     def to_dict(self, include_relationships=False):
@@ -189,6 +195,13 @@ class Job(Base):
         Index('ix_jobs_supervisor_assigner', 'supervisor_id', 'assigner_id'),
         Index('ix_jobs_created_at', 'created_at'),  # For ordering
         Index('ix_jobs_supervisor_status', 'supervisor_id', 'status'),  # For supervisor queries
+        # Trigram GIN index for ILIKE '%term%' search (needs the pg_trgm extension)
+        Index(
+            'ix_jobs_title_client_trgm',
+            'title', 'client',
+            postgresql_using='gin',
+            postgresql_ops={'title': 'gin_trgm_ops', 'client': 'gin_trgm_ops'}
+        ),
     )
     
     def update_status_from_progress(self):
@@ -254,6 +267,13 @@ class Task(Base):
         Index('ix_tasks_assigner_assigned', 'assigner_id', 'assigned_to_id'),
         Index('ix_tasks_created_at', 'created_at'),  # For ordering
         Index('ix_tasks_deadline_status', 'deadline', 'status'),  # For overdue tasks
+        # Trigram GIN index for ILIKE '%term%' search (needs the pg_trgm extension)
+        Index(
+            'ix_tasks_title_description_trgm',
+            'title', 'description',
+            postgresql_using='gin',
+            postgresql_ops={'title': 'gin_trgm_ops', 'description': 'gin_trgm_ops'}
+        ),
     )
 
 
@@ -436,6 +456,17 @@ class Notification(Base):
     
     # Relationships
     user = relationship("User", back_populates="notifications")
+    
+    # One notification per user for each job created from an invoice, so retried
+    # fan-outs can insert with ON CONFLICT DO NOTHING
+    __table_args__ = (
+        Index(
+            'uq_notifications_job_created_user_related',
+            'user_id', 'type', 'related_id',
+            unique=True,
+            postgresql_where=text("type = 'job_created'")
+        ),
+    )
 
 
 class PasswordResetToken(Base):
@@ -473,6 +504,11 @@ class ExpenseCategory(Base):
     created_by = relationship("User", backref="expense_categories")
     expenses = relationship("Expense", back_populates="category_obj")
 
+    __table_args__ = (
+        # Case-insensitive name lookups (duplicate checks, seeding)
+        Index('ix_expense_categories_lower_name', func.lower(name)),
+    )
+
 
 class Expense(Base):
     __tablename__ = "expenses"
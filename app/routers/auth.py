@@ -9,6 +9,7 @@ from app.config import settings
 import secrets
 import uuid
 from app.services.email_service import email_service
+from app.services.notification_queue import invalidate_active_recipients
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
 
@@ -60,6 +61,7 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
+    invalidate_active_recipients()
     
     return db_user
 
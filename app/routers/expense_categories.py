@@ -22,7 +22,7 @@ def create_expense_category(
     """Create a new expense category."""
     # Check if category name already exists
     existing_category = db.query(ExpenseCategory).filter(
-        ExpenseCategory.name.ilike(category_data.name)
+        func.lower(ExpenseCategory.name) == category_data.name.lower()
     ).first()
     
     if existing_category:
@@ -127,7 +127,7 @@ def update_expense_category(
     # Check if new name already exists (if name is being updated)
     if category_data.name and category_data.name != category.name:
         existing_category = db.query(ExpenseCategory).filter(
-            ExpenseCategory.name.ilike(category_data.name),
+            func.lower(ExpenseCategory.name) == category_data.name.lower(),
             ExpenseCategory.id != category_id
         ).first()
         
@@ -0,0 +1,47 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import JSONResponse, StreamingResponse
+from app.auth import get_current_user
+from app.models import User
+from app.services.background_export_service import background_export_service
+from app.services.export_service import iter_export_chunks
+
+router = APIRouter(prefix="/exports", tags=["exports"])
+
+
+@router.get("/{job_id}")
+def get_export(
+    job_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """Poll a background export; returns the file once it is ready."""
+    job = background_export_service.get_job(job_id)
+    if not job or job['user_id'] != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Export not found"
+        )
+
+    if job['status'] == 'failed':
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Export failed: {job['error']}"
+        )
+
+    if job['status'] != 'completed':
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content={"job_id": job_id, "status": job['status']}
+        )
+
+    output = background_export_service.take_result(job_id)
+    if output is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Export not found"
+        )
+
+    return StreamingResponse(
+        iter_export_chunks(output),
+        media_type=job['media_type'],
+        headers={"Content-Disposition": f"attachment; filename={job['filename']}"}
+    )
@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import func, and_, or_, extract
 from typing import List, Optional
@@ -13,7 +13,8 @@ from app.schemas import (
 )
 from app.auth import get_current_user
 from app.services.cache_service import cache_result
-from app.services.export_service import ExportService
+from app.services.export_service import export_service, iter_export_chunks
+from app.services.background_export_service import background_export_service, ExportQueueUnavailable
 
 router = APIRouter(prefix="/financial-analytics", tags=["financial-analytics"])
 
@@ -455,19 +456,50 @@ def export_financial_analytics_pdf(
     analytics_data = get_financial_analytics_data(db, start_date, end_date, period)
     
     # Export to PDF
-    export_service = ExportService()
     pdf_stream = export_service.export_financial_analytics_to_pdf(analytics_data)
     
     # Generate filename
     filename = f"financial_analytics_{period}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
     
-    return Response(
-        content=pdf_stream.getvalue(),
+    return StreamingResponse(
+        iter_export_chunks(pdf_stream),
         media_type="application/pdf",
         headers={"Content-Disposition": f"attachment; filename={filename}"}
     )
 
 
+@router.post("/export/pdf/background", status_code=status.HTTP_202_ACCEPTED)
+def export_financial_analytics_pdf_background(
+    period: str = "month",
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Queue the analytics PDF export; poll /exports/{job_id} for the file."""
+    start_date, end_date = get_date_range(period, start_date, end_date)
+    
+    # Data is gathered here so the worker never touches the request's session
+    analytics_data = get_financial_analytics_data(db, start_date, end_date, period)
+    
+    filename = f"financial_analytics_{period}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+    try:
+        job_id = background_export_service.submit(
+            'export_financial_analytics_to_pdf',
+            analytics_data,
+            filename=filename,
+            media_type="application/pdf",
+            user_id=current_user.id
+        )
+    except ExportQueueUnavailable as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"{e}; use GET /financial-analytics/export/pdf instead"
+        )
+    
+    return {"job_id": job_id, "status": "pending", "status_url": f"/exports/{job_id}"}
+
+
 def get_financial_analytics_data(db: Session, start_date: date, end_date: date, period: str) -> dict:
     """Get all financial analytics data for export."""
     # Get core metrics for the period
@@ -15,6 +15,7 @@ from app.auth import get_current_user, verify_password, get_password_hash
 from app.utils.database_utils import DatabaseUtils, safe_get_by_id, safe_paginate
 from app.exceptions import DatabaseError, ValidationError, ResourceNotFoundError, BusinessLogicError, AuthenticationError
 from app.utils.error_handler import ErrorHandler, database_error_handler
+from app.services.notification_queue import invalidate_active_recipients
 from sqlalchemy import func, and_, or_, case
 
 logger = logging.getLogger(__name__)
@@ -111,6 +112,7 @@ def update_user(
         
         db.commit()
         db.refresh(user)
+        invalidate_active_recipients()
         logger.info(f"User {user_id} updated successfully by user {current_user.id}")
         
         # Clear cache to ensure fresh data
@@ -197,6 +199,7 @@ def delete_user(
             # Now delete the user
             db.delete(user)
         
+        invalidate_active_recipients()
         logger.info(f"User {user_id} deleted successfully by user {current_user.id}")
         
         # Clear cache to ensure fresh data
@@ -247,6 +250,7 @@ def activate_user(
     user.is_active = True
     db.commit()
     db.refresh(user)
+    invalidate_active_recipients()
     return user
 
 
@@ -267,6 +271,7 @@ def deactivate_user(
     user.is_active = False
     db.commit()
     db.refresh(user)
+    invalidate_active_recipients()
     return user
 
 
@@ -344,6 +349,7 @@ def create_user(
         db.add(user)
         db.commit()
         db.refresh(user)
+        invalidate_active_recipients()
         logger.info(f"User {user.id} created successfully by user {current_user.id}")
         
         return user
@@ -0,0 +1,147 @@
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, IO, Optional
+
+from app.services.export_service import ExportService, export_service
+from app.services.robust_cache_service import robust_cache
+
+logger = logging.getLogger(__name__)
+
+# Seconds a finished export is kept for download before it is discarded
+EXPORT_RESULT_TTL = 15 * 60
+# Seconds a queued or running job is tracked before it is given up on
+EXPORT_JOB_TTL = 60 * 60
+# Finished exports are written here; every worker process on the host reads the same directory
+EXPORT_DIR = os.path.join(tempfile.gettempdir(), "henam_exports")
+EXPORT_JOB_KEY = "export_job:{job_id}"
+
+
+class ExportQueueUnavailable(RuntimeError):
+    """Raised when there is no shared job store to queue an export in."""
+
+
+class BackgroundExportService:
+    """
+    Runs heavy ExportService exports on a worker pool so request workers are not blocked.
+
+    Job records live in Redis and finished files in EXPORT_DIR, so a job queued by
+    one gunicorn worker can be polled and downloaded through any other.
+    """
+
+    def __init__(self, service: ExportService, max_workers: int = 2, result_ttl: int = EXPORT_RESULT_TTL,
+                 export_dir: str = EXPORT_DIR):
+        self.service = service
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="export")
+        self.result_ttl = result_ttl
+        self.export_dir = export_dir
+
+    @property
+    def redis(self):
+        return robust_cache.redis_client
+
+    def _output_path(self, job_id: str) -> str:
+        return os.path.join(self.export_dir, job_id)
+
+    def _save_job(self, job_id: str, job: Dict[str, Any], ttl: int):
+        self.redis.setex(EXPORT_JOB_KEY.format(job_id=job_id), ttl, json.dumps(job))
+
+    def submit(self, method_name: str, data: Any, filename: str, media_type: str, user_id: int) -> str:
+        """Queue an ExportService method call and return the job id to poll."""
+        if self.redis is None:
+            raise ExportQueueUnavailable("Background exports need Redis to share job state between workers")
+        self._purge_expired_files()
+        export = getattr(self.service, method_name)
+        job_id = uuid.uuid4().hex
+        job = {
+            'status': 'pending',
+            'filename': filename,
+            'media_type': media_type,
+            'user_id': user_id,
+            'error': None,
+        }
+        try:
+            self._save_job(job_id, job, EXPORT_JOB_TTL)
+        except Exception as e:
+            raise ExportQueueUnavailable(f"Could not queue export: {e}") from e
+        self.executor.submit(self._run, job_id, job, export, data)
+        logger.info(f"Export job {job_id} queued ({method_name})")
+        return job_id
+
+    def _run(self, job_id: str, job: Dict[str, Any], export, data: Any):
+        """Worker body: run the export, store the file and record the outcome on the job."""
+        try:
+            self._save_job(job_id, dict(job, status='running'), EXPORT_JOB_TTL)
+            output = export(data)
+            try:
+                os.makedirs(self.export_dir, exist_ok=True)
+                # Written under a temporary name and renamed, so readers never see a partial file
+                partial_path = self._output_path(job_id) + '.part'
+                with open(partial_path, 'wb') as f:
+                    shutil.copyfileobj(output, f)
+                os.replace(partial_path, self._output_path(job_id))
+            finally:
+                output.close()
+        except Exception as e:
+            logger.error(f"Export job {job_id} failed: {e}")
+            job.update(status='failed', error=str(e))
+        else:
+            job.update(status='completed')
+        try:
+            self._save_job(job_id, job, self.result_ttl)
+        except Exception as e:
+            logger.error(f"Could not record outcome of export job {job_id}: {e}")
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return the job record, or None if it is unknown, expired or Redis is unavailable."""
+        if self.redis is None:
+            return None
+        try:
+            value = self.redis.get(EXPORT_JOB_KEY.format(job_id=job_id))
+        except Exception as e:
+            logger.error(f"Could not read export job {job_id}: {e}")
+            return None
+        return json.loads(value) if value else None
+
+    def take_result(self, job_id: str) -> Optional[IO[bytes]]:
+        """Hand over a completed export's file; the job and file are forgotten afterwards."""
+        # Deleting the record is the claim: only one worker wins a concurrent download
+        if self.redis is None or not self.redis.delete(EXPORT_JOB_KEY.format(job_id=job_id)):
+            return None
+        path = self._output_path(job_id)
+        try:
+            output = open(path, 'rb')
+        except FileNotFoundError:
+            return None
+        # The open handle keeps the data readable until the response has streamed it
+        os.remove(path)
+        return output
+
+    def _purge_expired_files(self):
+        """Remove export files nobody downloaded within the TTL."""
+        now = time.time()
+        try:
+            entries = list(os.scandir(self.export_dir))
+        except FileNotFoundError:
+            return
+        for entry in entries:
+            try:
+                # .part files belong to running jobs; give those the full job TTL
+                ttl = EXPORT_JOB_TTL if entry.name.endswith('.part') else self.result_ttl
+                if now - entry.stat().st_mtime > ttl:
+                    os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+
+    def shutdown(self):
+        """Stop accepting work and cancel exports that have not started."""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Global background export service instance
+background_export_service = BackgroundExportService(export_service)
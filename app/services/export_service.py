@@ -1,118 +1,372 @@
 from openpyxl import Workbook
 from openpyxl.styles import Font, Alignment, PatternFill
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.utils import get_column_letter
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+from openpyxl.compat.numbers import NUMERIC_TYPES
+from openpyxl.utils.datetime import to_excel
 from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image, PageBreak
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image, PageBreak, PageTemplate, Frame, KeepTogether
+from reportlab.platypus.doctemplate import BaseDocTemplate
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib import colors
 from reportlab.lib.units import inch
-from reportlab.graphics.shapes import Drawing
+from reportlab.graphics.shapes import Drawing, String
 from reportlab.graphics.charts.piecharts import Pie
 from reportlab.graphics.charts.barcharts import VerticalBarChart
 from reportlab.graphics.charts.linecharts import HorizontalLineChart
+from reportlab.graphics.widgets.markers import makeMarker
 from reportlab.graphics import renderPDF
 from io import BytesIO
-from typing import List, Dict, Any
+from typing import List, Dict, Any, IO, Iterator, Optional
+import copy
 import logging
+import math
 import os
-from datetime import datetime
-import matplotlib
-matplotlib.use('Agg')  # Use non-interactive backend
-import matplotlib.pyplot as plt
+import shutil
+import tempfile
+import time
+import zipfile
+from datetime import date, datetime, time as dt_time, timedelta
+from xml.sax.saxutils import escape as xml_escape
 import numpy as np
 
 logger = logging.getLogger(__name__)
 
+# Professional color palette shared by the analytics charts
+CHART_COLORS = [colors.HexColor(c) for c in ('#2E86AB', '#A23B72', '#F18F01', '#C73E1D', '#6A994E', '#577590')]
+
+# Exports are kept in memory up to this size, then spilled to a temp file on disk
+SPOOL_MAX_SIZE = 8 << 20
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+# Rows per worksheet (or per file when segmented) in Excel exports
+EXCEL_CHUNK_SIZE = 100_000
+HEADER_FONT = Font(bold=True)
+HEADER_FILL = PatternFill(start_color="CCCCCC", end_color="CCCCCC", fill_type="solid")
+
+# Above this many rows the Excel exporters bypass openpyxl and write sheet XML directly
+EXCEL_FAST_PATH_ROWS = 50_000
+
+# Static parts of a minimal .xlsx package for the fast writer
+XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '{sheets}'
+    '</Types>'
+)
+XLSX_SHEET_CONTENT_TYPE = (
+    '<Override PartName="/xl/worksheets/sheet{index}.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+)
+XLSX_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets>{sheets}</sheets></workbook>'
+)
+XLSX_WORKBOOK_SHEET = '<sheet name="{name}" sheetId="{index}" r:id="rId{index}"/>'
+XLSX_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '{sheets}'
+    '<Relationship Id="rId{styles_id}" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>'
+    '</Relationships>'
+)
+XLSX_WORKBOOK_SHEET_REL = (
+    '<Relationship Id="rId{index}" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet{index}.xml"/>'
+)
+XLSX_SHEET_PROLOG = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<cols>{cols}</cols><sheetData>'
+)
+XLSX_SHEET_EPILOG = '</sheetData></worksheet>'
+XLSX_TEMPLATES = {
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    # Style 1 is the bold header on a CCCCCC fill used by the openpyxl path; styles 2-5
+    # carry the number formats openpyxl gives datetime, date, time and timedelta cells
+    'xl/styles.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+        '<numFmts count="3"><numFmt numFmtId="164" formatCode="yyyy-mm-dd h:mm:ss"/>'
+        '<numFmt numFmtId="165" formatCode="yyyy-mm-dd"/><numFmt numFmtId="166" formatCode="[hh]:mm:ss"/></numFmts>'
+        '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+        '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+        '<fills count="3"><fill><patternFill patternType="none"/></fill>'
+        '<fill><patternFill patternType="gray125"/></fill>'
+        '<fill><patternFill patternType="solid"><fgColor rgb="00CCCCCC"/><bgColor rgb="00CCCCCC"/></patternFill></fill>'
+        '</fills>'
+        '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+        '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+        '<cellXfs count="6"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+        '<xf numFmtId="0" fontId="1" fillId="2" borderId="0" xfId="0" applyFont="1" applyFill="1"/>'
+        '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+        '<xf numFmtId="165" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+        '<xf numFmtId="21" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+        '<xf numFmtId="166" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/></cellXfs>'
+        '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+        '</styleSheet>'
+    ),
+}
+
+# Cell style (index into cellXfs above) for each temporal type; datetime must precede date
+XLSX_TEMPORAL_STYLES = ((datetime, 2), (date, 3), (dt_time, 4), (timedelta, 5))
+
+# Bound currency formatters, shared by every row of every report
+_fmt_ngn = "NGN {:,.2f}".format
+_fmt_naira = "N{:,.2f}".format
+_fmt_naira_whole = "N{:,.0f}".format
+
+# Building the sample stylesheet is not free; every report only derives from it
+_STYLES = getSampleStyleSheet()
+
+# Analytics report footer, built once since only the timestamp line changes per report
+_FOOTER_STYLE = ParagraphStyle(
+    'Footer',
+    parent=_STYLES['Normal'],
+    fontSize=10,
+    textColor=colors.HexColor('#6C757D'),
+    alignment=1
+)
+_FOOTER_SUMMARY_HEADING = Paragraph("<b>Report Summary:</b>", _FOOTER_STYLE)
+_FOOTER_SUMMARY_BODY = Paragraph(
+    "The analysis includes revenue trends, expense breakdowns, and profitability metrics for informed decision-making.",
+    _FOOTER_STYLE
+)
+_FOOTER_SIGNATURE = Paragraph("<b>Henam Facility Management Ltd</b> | Financial Analytics Dashboard", _FOOTER_STYLE)
+_FOOTER_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#F8F9FA')),
+    ('BOX', (0, 0), (-1, -1), 1, colors.HexColor('#DEE2E6')),
+    ('LEFTPADDING', (0, 0), (-1, -1), 10),
+    ('RIGHTPADDING', (0, 0), (-1, -1), 10),
+    ('TOPPADDING', (0, 0), (-1, -1), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
+])
+
+# Company logo lookup, re-probed at most once per LOGO_CACHE_TTL seconds
+LOGO_BASE_PATH = "uploads/company_logo/henam_logo"
+LOGO_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.bmp')
+LOGO_CACHE_TTL = 60
+_logo_cache = {'path': None, 'checked_at': None}
+
+
+def _column_widths(headers: List[str], rows: List[List[Any]]) -> List[int]:
+    """Excel column widths fitted to the longest value in each column (capped at 50)."""
+    max_lengths = [len(header) for header in headers]
+    for row in rows:
+        for col, value in enumerate(row):
+            length = len(str(value))
+            if length > max_lengths[col]:
+                max_lengths[col] = length
+    return [min(max_length + 2, 50) for max_length in max_lengths]
+
+
+def _xlsx_cell(value: Any) -> str:
+    """Serialise one value as a positional <c> element for the fast xlsx writer.
+    
+    Types are mapped the way openpyxl maps them, so both Excel paths produce the
+    same cells: numbers (incl. Decimal) stay numeric, temporal values become serials
+    with a date format, and NaN/inf are left empty.
+    """
+    if value is None:
+        return '<c/>'
+    if isinstance(value, (bool, np.bool_)):
+        return f'<c t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, NUMERIC_TYPES):
+        return f'<c><v>{value}</v></c>' if math.isfinite(value) else '<c/>'
+    for kind, style in XLSX_TEMPORAL_STYLES:
+        if isinstance(value, kind):
+            if getattr(value, 'tzinfo', None) is not None:
+                raise TypeError("Excel does not support timezones in datetimes. "
+                                "The tzinfo in the datetime/time object must be set to None.")
+            return f'<c s="{style}"><v>{to_excel(value)}</v></c>'
+    text = xml_escape(ILLEGAL_CHARACTERS_RE.sub('', str(value)))
+    if not text:
+        return '<c t="inlineStr"/>'
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _safe_percentages(numerators, denominators) -> np.ndarray:
+    """Vectorised numerators / denominators * 100, 0 wherever the denominator is not positive."""
+    num = np.asarray(numerators, dtype=np.float64)
+    den = np.broadcast_to(np.asarray(denominators, dtype=np.float64), num.shape)
+    return np.divide(num * 100, den, out=np.zeros_like(num), where=den > 0)
+
+
+def _get_logo_path() -> Optional[str]:
+    """Return the company logo path, or None if no logo has been uploaded."""
+    now = time.monotonic()
+    checked_at = _logo_cache['checked_at']
+    if checked_at is None or now - checked_at > LOGO_CACHE_TTL:
+        path = None
+        for ext in LOGO_EXTENSIONS:
+            candidate = f"{LOGO_BASE_PATH}{ext}"
+            if os.path.exists(candidate):
+                path = candidate
+                break
+        _logo_cache.update(path=path, checked_at=now)
+    return _logo_cache['path']
+
+
+def _new_export_buffer() -> IO[bytes]:
+    """Create a file-like buffer for an export that spills to disk when large."""
+    return tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE, mode='w+b')
+
+
+def iter_export_chunks(output: IO[bytes], chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield an export buffer in fixed-size chunks and close it once drained."""
+    try:
+        while True:
+            chunk = output.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        output.close()
+
 
 class ExportService:
     def __init__(self):
-        self.styles = getSampleStyleSheet()
+        self.styles = _STYLES
     
-    def export_jobs_to_excel(self, jobs_data: List[Dict[str, Any]]) -> BytesIO:
-        """Export jobs data to Excel format."""
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Jobs Report"
-        
-        # Headers
+    def export_jobs_to_excel(self, jobs_data: List[Dict[str, Any]], chunk_size: int = EXCEL_CHUNK_SIZE,
+                             segment: bool = False) -> IO[bytes]:
+        """Export jobs data to Excel format, one sheet (or file when segmented) per chunk_size rows."""
         headers = ["Job ID", "Title", "Status", "Priority", "Assigned To", "Created Date", "Due Date"]
-        for col, header in enumerate(headers, 1):
-            cell = ws.cell(row=1, column=col, value=header)
-            cell.font = Font(bold=True)
-            cell.fill = PatternFill(start_color="CCCCCC", end_color="CCCCCC", fill_type="solid")
-        
-        # Data
-        for row, job in enumerate(jobs_data, 2):
-            ws.cell(row=row, column=1, value=job.get("id", ""))
-            ws.cell(row=row, column=2, value=job.get("title", ""))
-            ws.cell(row=row, column=3, value=job.get("status", ""))
-            ws.cell(row=row, column=4, value=job.get("priority", ""))
-            ws.cell(row=row, column=5, value=job.get("assigned_to", ""))
-            ws.cell(row=row, column=6, value=job.get("created_at", ""))
-            ws.cell(row=row, column=7, value=job.get("due_date", ""))
-        
-        # Auto-adjust column widths
-        for column in ws.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = min(max_length + 2, 50)
-            ws.column_dimensions[column_letter].width = adjusted_width
-        
-        # Save to BytesIO
-        output = BytesIO()
-        wb.save(output)
-        output.seek(0)
-        return output
+        rows = [
+            [job.get("id", ""), job.get("title", ""), job.get("status", ""), job.get("priority", ""),
+             job.get("assigned_to", ""), job.get("created_at", ""), job.get("due_date", "")]
+            for job in jobs_data
+        ]
+        return self._export_rows_to_excel("Jobs Report", headers, rows, chunk_size, segment)
     
-    def export_finance_to_excel(self, finance_data: Dict[str, Any]) -> BytesIO:
-        """Export finance data to Excel format."""
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Finance Report"
-        
-        # Headers
+    def export_finance_to_excel(self, finance_data: Dict[str, Any], chunk_size: int = EXCEL_CHUNK_SIZE,
+                                segment: bool = False) -> IO[bytes]:
+        """Export finance data to Excel format, one sheet (or file when segmented) per chunk_size rows."""
         headers = ["Category", "Amount", "Type", "Date", "Description"]
-        for col, header in enumerate(headers, 1):
-            cell = ws.cell(row=1, column=col, value=header)
-            cell.font = Font(bold=True)
-            cell.fill = PatternFill(start_color="CCCCCC", end_color="CCCCCC", fill_type="solid")
+        rows = [
+            [transaction.get("category", ""), transaction.get("amount", 0), transaction.get("type", ""),
+             transaction.get("date", ""), transaction.get("description", "")]
+            for transaction in finance_data.get("transactions", [])
+        ]
+        return self._export_rows_to_excel("Finance Report", headers, rows, chunk_size, segment)
+    
+    def _export_rows_to_excel(self, title: str, headers: List[str], rows: List[List[Any]],
+                              chunk_size: int, segment: bool) -> IO[bytes]:
+        """Write rows into write-only workbooks, splitting every chunk_size rows.
+        
+        Without segment the chunks become sheets "<title>", "<title> 2", ... of one
+        workbook; with segment each chunk is its own .xlsx inside a zip archive.
+        """
+        chunks = [rows[start:start + chunk_size] for start in range(0, len(rows), chunk_size)] or [[]]
+        output = _new_export_buffer()
+        
+        if segment:
+            file_prefix = title.lower().replace(" ", "_")
+            with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as archive:
+                for i, chunk in enumerate(chunks, 1):
+                    wb = Workbook(write_only=True)
+                    self._write_excel_sheet(wb.create_sheet(title), headers, chunk)
+                    part = _new_export_buffer()
+                    wb.save(part)
+                    part.seek(0)
+                    with archive.open(f"{file_prefix}_{i}.xlsx", 'w') as member:
+                        shutil.copyfileobj(part, member)
+                    part.close()
+        elif len(rows) >= EXCEL_FAST_PATH_ROWS:
+            self._write_xlsx_fast(output, title, headers, chunks)
+        else:
+            wb = Workbook(write_only=True)
+            for i, chunk in enumerate(chunks, 1):
+                sheet_title = title if i == 1 else f"{title} {i}"
+                self._write_excel_sheet(wb.create_sheet(sheet_title), headers, chunk)
+            wb.save(output)
         
-        # Data
-        transactions = finance_data.get("transactions", [])
-        for row, transaction in enumerate(transactions, 2):
-            ws.cell(row=row, column=1, value=transaction.get("category", ""))
-            ws.cell(row=row, column=2, value=transaction.get("amount", 0))
-            ws.cell(row=row, column=3, value=transaction.get("type", ""))
-            ws.cell(row=row, column=4, value=transaction.get("date", ""))
-            ws.cell(row=row, column=5, value=transaction.get("description", ""))
-        
-        # Auto-adjust column widths
-        for column in ws.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = min(max_length + 2, 50)
-            ws.column_dimensions[column_letter].width = adjusted_width
-        
-        # Save to BytesIO
-        output = BytesIO()
-        wb.save(output)
         output.seek(0)
-        return output    
+        return output
+    
+    def _write_excel_sheet(self, ws, headers: List[str], rows: List[List[Any]]):
+        """Fill a write-only worksheet with a styled header row and the data rows."""
+        # Write-only sheets need column widths before any row is appended
+        for col, width in enumerate(_column_widths(headers, rows), 1):
+            ws.column_dimensions[get_column_letter(col)].width = width
+        
+        header_cells = []
+        for header in headers:
+            cell = WriteOnlyCell(ws, value=header)
+            cell.font = HEADER_FONT
+            cell.fill = HEADER_FILL
+            header_cells.append(cell)
+        ws.append(header_cells)
+        
+        for row in rows:
+            ws.append(row)
+
+    def _write_xlsx_fast(self, output: IO[bytes], title: str, headers: List[str], chunks: List[List[List[Any]]]):
+        """Write an .xlsx by emitting the sheet XML directly, one sheet per chunk.
+        
+        Used for very large exports: rows are streamed into the zip as strings, so no
+        openpyxl cell objects are created. Output matches _write_excel_sheet (bold grey
+        header row, auto-sized columns).
+        """
+        sheet_names = [title if i == 1 else f"{title} {i}" for i in range(1, len(chunks) + 1)]
+        header_xml = '<row r="1">' + ''.join(
+            f'<c s="1" t="inlineStr"><is><t>{xml_escape(header)}</t></is></c>' for header in headers
+        ) + '</row>'
+        
+        with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for name, template in XLSX_TEMPLATES.items():
+                archive.writestr(name, template)
+            archive.writestr('[Content_Types].xml', XLSX_CONTENT_TYPES.format(sheets=''.join(
+                XLSX_SHEET_CONTENT_TYPE.format(index=i) for i in range(1, len(chunks) + 1)
+            )))
+            archive.writestr('xl/workbook.xml', XLSX_WORKBOOK.format(sheets=''.join(
+                XLSX_WORKBOOK_SHEET.format(index=i, name=xml_escape(name, {'"': '&quot;'}))
+                for i, name in enumerate(sheet_names, 1)
+            )))
+            archive.writestr('xl/_rels/workbook.xml.rels', XLSX_WORKBOOK_RELS.format(
+                sheets=''.join(XLSX_WORKBOOK_SHEET_REL.format(index=i) for i in range(1, len(chunks) + 1)),
+                styles_id=len(chunks) + 1
+            ))
+            
+            for index, chunk in enumerate(chunks, 1):
+                cols = ''.join(
+                    f'<col min="{col}" max="{col}" width="{width}" customWidth="1"/>'
+                    for col, width in enumerate(_column_widths(headers, chunk), 1)
+                )
+                with archive.open(f'xl/worksheets/sheet{index}.xml', 'w') as sheet:
+                    sheet.write(XLSX_SHEET_PROLOG.format(cols=cols).encode())
+                    sheet.write(header_xml.encode())
+                    parts = []
+                    append = parts.append
+                    for r, row in enumerate(chunk, 2):
+                        append(f'<row r="{r}">{"".join(map(_xlsx_cell, row))}</row>')
+                        if len(parts) >= 1000:
+                            sheet.write(''.join(parts).encode())
+                            parts.clear()
+                    parts.append(XLSX_SHEET_EPILOG)
+                    sheet.write(''.join(parts).encode())
 
-    def export_jobs_to_pdf(self, jobs_data: List[Dict[str, Any]]) -> BytesIO:
+    def export_jobs_to_pdf(self, jobs_data: List[Dict[str, Any]]) -> IO[bytes]:
         """Export jobs data to PDF format."""
-        output = BytesIO()
+        output = _new_export_buffer()
         doc = SimpleDocTemplate(output, pagesize=letter)
         elements = []
         
@@ -158,9 +412,9 @@ class ExportService:
         output.seek(0)
         return output
     
-    def export_finance_to_pdf(self, finance_data: Dict[str, Any]) -> BytesIO:
+    def export_finance_to_pdf(self, finance_data: Dict[str, Any]) -> IO[bytes]:
         """Export finance data to PDF format."""
-        output = BytesIO()
+        output = _new_export_buffer()
         doc = SimpleDocTemplate(output, pagesize=letter)
         elements = []
         
@@ -176,7 +430,7 @@ class ExportService:
         for transaction in transactions:
             table_data.append([
                 transaction.get("category", ""),
-                f"NGN {transaction.get('amount', 0):,.2f}",
+                _fmt_ngn(transaction.get('amount', 0)),
                 transaction.get("type", ""),
                 transaction.get("date", "")
             ])
@@ -206,9 +460,9 @@ class ExportService:
         output.seek(0)
         return output
     
-    def export_invoice_to_pdf(self, invoice_data: Dict[str, Any]) -> BytesIO:
+    def export_invoice_to_pdf(self, invoice_data: Dict[str, Any]) -> IO[bytes]:
         """Export invoice data to PDF format matching the exact client design."""
-        output = BytesIO()
+        output = _new_export_buffer()
         doc = SimpleDocTemplate(output, pagesize=letter,
                               rightMargin=50, leftMargin=50,
                               topMargin=40, bottomMargin=40)
@@ -231,12 +485,7 @@ class ExportService:
         )
         
         # Try to add logo
-        logo_path = None
-        for ext in ['.jpg', '.jpeg', '.png']:
-            test_path = f"uploads/company_logo/henam_logo{ext}"
-            if os.path.exists(test_path):
-                logo_path = test_path
-                break
+        logo_path = _get_logo_path()
         
         # Header: Logo on left, Company info on right
         if logo_path:
@@ -319,11 +568,12 @@ class ExportService:
         if job_description:
             item_text += f"<br/>{job_description}"
         
+        amount_text = _fmt_ngn(invoice_data.get('amount', 0))
         items_data = [[
             Paragraph(item_text, small_style),
             "1",
-            f"NGN {invoice_data.get('amount', 0):,.2f}",
-            f"NGN {invoice_data.get('amount', 0):,.2f}"
+            amount_text,
+            amount_text
         ]]
         
         items_table = Table(items_data, colWidths=[3.5*inch, 1*inch, 1.25*inch, 1.25*inch])
@@ -351,8 +601,8 @@ class ExportService:
         )
         
         totals_data = [
-            ["Subtotal", f"NGN {invoice_data.get('amount', 0):,.2f}"],
-            ["Total", f"NGN {invoice_data.get('amount', 0):,.2f}"]
+            ["Subtotal", amount_text],
+            ["Total", amount_text]
         ]
         
         totals_table = Table(totals_data, colWidths=[1.25*inch, 1.25*inch])
@@ -399,85 +649,110 @@ class ExportService:
         output.seek(0)
         return output
     
-    def _create_chart_image(self, chart_type: str, data: Dict, title: str, width: int = 6, height: int = 4) -> BytesIO:
-        """Create a chart image and return the BytesIO buffer."""
+    def _create_chart(self, chart_type: str, data: Dict, title: str, width: float = 6, height: float = 3.5) -> Drawing:
+        """Create a vector chart drawing (sized in inches) that can be added to a story directly."""
         try:
-            try:
-                plt.style.use('seaborn-v0_8')
-            except:
-                # Fallback if seaborn style is not available
-                plt.style.use('default')
+            d_width, d_height = width * inch, height * inch
+            drawing = Drawing(d_width, d_height)
+            drawing.add(String(d_width / 2, d_height - 16, title, fontName='Helvetica-Bold',
+                               fontSize=14, textAnchor='middle'))
             
-            fig, ax = plt.subplots(figsize=(width, height))
+            labels = [str(label) for label in data.keys()]
+            values = [float(value or 0) for value in data.values()]
             
-            # Set a professional color palette
-            colors_palette = ['#2E86AB', '#A23B72', '#F18F01', '#C73E1D', '#6A994E', '#577590']
+            # Plot area below the title, leaving room for axis labels
+            plot_x, plot_y = 60, 50
+            plot_width, plot_height = d_width - plot_x - 20, d_height - plot_y - 40
             
             if chart_type == 'pie':
-                labels = list(data.keys())
-                values = list(data.values())
                 if values and sum(values) > 0:  # Only create pie chart if there's data
-                    wedges, texts, autotexts = ax.pie(values, labels=labels, autopct='%1.1f%%', 
-                                                    colors=colors_palette[:len(labels)], startangle=90)
-                    # Make text more readable
-                    for autotext in autotexts:
-                        autotext.set_color('white')
-                        autotext.set_fontweight('bold')
-                else:
-                    ax.text(0.5, 0.5, 'No data available', ha='center', va='center', transform=ax.transAxes)
+                    total = sum(values)
+                    pie = Pie()
+                    size = min(plot_width, plot_height)
+                    pie.x = (d_width - size) / 2
+                    pie.y = plot_y - 20
+                    pie.width = pie.height = size
+                    pie.data = values
+                    pie.labels = [f"{label} ({value / total * 100:.1f}%)" for label, value in zip(labels, values)]
+                    pie.startAngle = 90
+                    pie.direction = 'anticlockwise'
+                    pie.slices.strokeWidth = 0.5
+                    pie.slices.strokeColor = colors.white
+                    pie.slices.fontName = 'Helvetica-Bold'
+                    pie.slices.fontSize = 8
+                    pie.slices.labelRadius = 1.2
+                    for i in range(len(values)):
+                        pie.slices[i].fillColor = CHART_COLORS[i % len(CHART_COLORS)]
+                    drawing.add(pie)
+                    return drawing
                     
             elif chart_type == 'bar':
-                labels = list(data.keys())
-                values = list(data.values())
                 if values and any(v > 0 for v in values):  # Only create bar chart if there's data
-                    bars = ax.bar(labels, values, color=colors_palette[:len(labels)])
-                    ax.set_ylabel('Amount (N)')
-                    # Add value labels on bars
-                    for bar in bars:
-                        height = bar.get_height()
-                        if height > 0:
-                            ax.text(bar.get_x() + bar.get_width()/2., height,
-                                   f'N{height:,.0f}', ha='center', va='bottom', fontweight='bold')
-                    plt.xticks(rotation=45, ha='right')
-                else:
-                    ax.text(0.5, 0.5, 'No data available', ha='center', va='center', transform=ax.transAxes)
+                    chart = VerticalBarChart()
+                    chart.x, chart.y = plot_x, plot_y
+                    chart.width, chart.height = plot_width, plot_height
+                    chart.data = [values]
+                    chart.categoryAxis.categoryNames = labels
+                    chart.categoryAxis.labels.angle = 30
+                    chart.categoryAxis.labels.boxAnchor = 'ne'
+                    chart.categoryAxis.labels.fontName = 'Helvetica'
+                    chart.categoryAxis.labels.fontSize = 8
+                    chart.categoryAxis.joinAxisMode = 'bottom'
+                    chart.valueAxis.valueMin = min(0, min(values))
+                    chart.valueAxis.labelTextFormat = _fmt_naira_whole
+                    chart.valueAxis.labels.fontName = 'Helvetica'
+                    chart.valueAxis.labels.fontSize = 8
+                    chart.bars.strokeColor = None
+                    for i in range(len(values)):
+                        chart.bars[(0, i)].fillColor = CHART_COLORS[i % len(CHART_COLORS)]
+                    # Value labels on bars
+                    chart.barLabelFormat = lambda v: _fmt_naira_whole(v) if v > 0 else ''
+                    chart.barLabels.nudge = 7
+                    chart.barLabels.fontName = 'Helvetica-Bold'
+                    chart.barLabels.fontSize = 8
+                    drawing.add(chart)
+                    return drawing
                 
             elif chart_type == 'line':
-                periods = list(data.keys())
-                values = list(data.values())
-                if values and periods:  # Only create line chart if there's data
-                    ax.plot(periods, values, marker='o', linewidth=3, markersize=8, color=colors_palette[0])
-                    ax.set_ylabel('Amount (N)')
-                    ax.set_xlabel('Period')
-                    plt.xticks(rotation=45, ha='right')
+                if values and labels:  # Only create line chart if there's data
+                    chart = HorizontalLineChart()
+                    chart.x, chart.y = plot_x, plot_y
+                    chart.width, chart.height = plot_width, plot_height
+                    chart.data = [values]
+                    chart.categoryAxis.categoryNames = labels
+                    chart.categoryAxis.labels.angle = 30
+                    chart.categoryAxis.labels.boxAnchor = 'ne'
+                    chart.categoryAxis.labels.fontName = 'Helvetica'
+                    chart.categoryAxis.labels.fontSize = 8
+                    chart.categoryAxis.joinAxisMode = 'bottom'
+                    chart.valueAxis.labelTextFormat = _fmt_naira_whole
+                    chart.valueAxis.labels.fontName = 'Helvetica'
+                    chart.valueAxis.labels.fontSize = 8
                     # Add grid for better readability
-                    ax.grid(True, alpha=0.3)
-                else:
-                    ax.text(0.5, 0.5, 'No data available', ha='center', va='center', transform=ax.transAxes)
-                
-            ax.set_title(title, fontsize=14, fontweight='bold', pad=20)
-            plt.tight_layout()
+                    chart.valueAxis.visibleGrid = True
+                    chart.valueAxis.gridStrokeColor = colors.HexColor('#DEE2E6')
+                    chart.lines[0].strokeColor = CHART_COLORS[0]
+                    chart.lines[0].strokeWidth = 3
+                    chart.lines[0].symbol = makeMarker('FilledCircle', fillColor=CHART_COLORS[0], size=6)
+                    drawing.add(chart)
+                    return drawing
             
-            # Save to BytesIO buffer instead of file
-            img_buffer = BytesIO()
-            plt.savefig(img_buffer, format='png', dpi=300, bbox_inches='tight', facecolor='white')
-            img_buffer.seek(0)
-            plt.close()
-            
-            return img_buffer
+            drawing.add(String(d_width / 2, d_height / 2, 'No data available', fontName='Helvetica',
+                               fontSize=10, textAnchor='middle'))
+            return drawing
             
         except Exception as e:
             logger.error(f"Error creating chart: {e}")
-            plt.close()  # Make sure to close the figure even on error
             return None
 
-    def export_financial_analytics_to_pdf(self, analytics_data: Dict[str, Any]) -> BytesIO:
+    def export_financial_analytics_to_pdf(self, analytics_data: Dict[str, Any]) -> IO[bytes]:
         """Export financial analytics data to PDF format with beautiful charts and design."""
-        output = BytesIO()
+        output = _new_export_buffer()
         doc = SimpleDocTemplate(output, pagesize=A4, 
                               rightMargin=50, leftMargin=50, 
                               topMargin=50, bottomMargin=50)
         story = []
+        story_append = story.append
         
         # Custom styles for a more beautiful design
         title_style = ParagraphStyle(
@@ -516,7 +791,7 @@ class ExportService:
         
         # Header with company branding
         title = Paragraph("FINANCIAL ANALYTICS REPORT", title_style)
-        story.append(title)
+        story_append(title)
         
         # Report period with better styling
         period_text = f"Report Period: {analytics_data.get('period', 'N/A').title()}"
@@ -526,20 +801,26 @@ class ExportService:
             period_text += f" | {start_date} to {end_date}"
         
         period_para = Paragraph(period_text, subtitle_style)
-        story.append(period_para)
-        story.append(Spacer(1, 20))
+        story_append(period_para)
+        story_append(Spacer(1, 20))
         
         # Executive Summary with KPI cards
         exec_summary = Paragraph("EXECUTIVE SUMMARY", section_style)
-        story.append(exec_summary)
+        story_append(exec_summary)
         
         core_metrics = analytics_data.get('core_metrics', {})
+        total_invoiced = core_metrics.get('total_invoiced', 0)
+        total_paid = core_metrics.get('total_paid', 0)
+        total_pending = core_metrics.get('total_pending', 0)
+        net_profit = core_metrics.get('net_profit', 0)
+        payment_rate = core_metrics.get('payment_rate', 0)
+        total_expenses = analytics_data.get('total_expenses', 0)
         
         # Create KPI summary cards
         kpi_data = [
-            ['Total Invoiced', f"N{core_metrics.get('total_invoiced', 0):,.2f}", 'Total Paid', f"N{core_metrics.get('total_paid', 0):,.2f}"],
-            ['Total Pending', f"N{core_metrics.get('total_pending', 0):,.2f}", 'Total Expenses', f"N{analytics_data.get('total_expenses', 0):,.2f}"],
-            ['Net Profit', f"N{core_metrics.get('net_profit', 0):,.2f}", 'Payment Rate', f"{core_metrics.get('payment_rate', 0):.1f}%"]
+            ['Total Invoiced', _fmt_naira(total_invoiced), 'Total Paid', _fmt_naira(total_paid)],
+            ['Total Pending', _fmt_naira(total_pending), 'Total Expenses', _fmt_naira(total_expenses)],
+            ['Net Profit', _fmt_naira(net_profit), 'Payment Rate', f"{payment_rate:.1f}%"]
         ]
         
         kpi_table = Table(kpi_data, colWidths=[120, 120, 120, 120])
@@ -555,68 +836,65 @@ class ExportService:
             ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#2E86AB')),
             ('ROUNDEDCORNERS', [5, 5, 5, 5])
         ]))
-        story.append(kpi_table)
-        story.append(Spacer(1, 30))
+        story_append(kpi_table)
+        story_append(Spacer(1, 30))
         
         # Revenue vs Expenses Chart
         revenue_expenses_title = Paragraph("REVENUE VS EXPENSES ANALYSIS", section_style)
-        story.append(revenue_expenses_title)
+        story_append(revenue_expenses_title)
         
         # Create revenue vs expenses chart
         revenue_expenses_data = {
-            'Total Revenue': core_metrics.get('total_paid', 0),
-            'Total Expenses': analytics_data.get('total_expenses', 0),
-            'Net Profit': core_metrics.get('net_profit', 0)
+            'Total Revenue': total_paid,
+            'Total Expenses': total_expenses,
+            'Net Profit': net_profit
         }
         
         try:
-            chart_buffer = self._create_chart_image('bar', revenue_expenses_data, 
-                                                  'Revenue vs Expenses Breakdown', 8, 5)
-            if chart_buffer:
-                chart_img = Image(chart_buffer, width=6*inch, height=3.5*inch)
-                story.append(chart_img)
+            chart = self._create_chart('bar', revenue_expenses_data, 'Revenue vs Expenses Breakdown', 6, 3.5)
+            if chart is not None:
+                story_append(chart)
             else:
-                story.append(Paragraph("Revenue chart could not be generated", self.styles['Normal']))
+                story_append(Paragraph("Revenue chart could not be generated", self.styles['Normal']))
         except Exception as e:
             logger.error(f"Error creating revenue chart: {e}")
-            story.append(Paragraph("Revenue chart could not be generated", self.styles['Normal']))
+            story_append(Paragraph("Revenue chart could not be generated", self.styles['Normal']))
         
-        story.append(Spacer(1, 30))
+        story_append(Spacer(1, 30))
         
         # Invoice Status Distribution
         invoice_title = Paragraph("INVOICE STATUS DISTRIBUTION", section_style)
-        story.append(invoice_title)
+        story_append(invoice_title)
         
         invoice_distribution = analytics_data.get('invoice_status_distribution', [])
         if invoice_distribution:
+            amounts = [status.get('amount', 0) for status in invoice_distribution]
+            
             # Create pie chart for invoice status
-            invoice_data = {}
-            for status in invoice_distribution:
-                invoice_data[status.get('status', 'Unknown')] = status.get('amount', 0)
+            invoice_data = {
+                status.get('status', 'Unknown'): amount
+                for status, amount in zip(invoice_distribution, amounts)
+            }
             
             try:
-                chart_buffer = self._create_chart_image('pie', invoice_data, 
-                                                      'Invoice Status by Amount', 7, 5)
-                if chart_buffer:
-                    chart_img = Image(chart_buffer, width=5*inch, height=3.5*inch)
-                    story.append(chart_img)
+                chart = self._create_chart('pie', invoice_data, 'Invoice Status by Amount', 5, 3.5)
+                if chart is not None:
+                    story_append(chart)
                 else:
-                    story.append(Paragraph("Invoice status chart could not be generated", self.styles['Normal']))
+                    story_append(Paragraph("Invoice status chart could not be generated", self.styles['Normal']))
             except Exception as e:
                 logger.error(f"Error creating invoice chart: {e}")
-                story.append(Paragraph("Invoice status chart could not be generated", self.styles['Normal']))
+                story_append(Paragraph("Invoice status chart could not be generated", self.styles['Normal']))
             
             # Add detailed table
             invoice_status_data = [['Status', 'Count', 'Amount', 'Percentage']]
-            total_amount = sum(status.get('amount', 0) for status in invoice_distribution)
+            percentages = _safe_percentages(amounts, sum(amounts)).tolist()
             
-            for status in invoice_distribution:
-                amount = status.get('amount', 0)
-                percentage = (amount / total_amount * 100) if total_amount > 0 else 0
+            for status, amount, percentage in zip(invoice_distribution, amounts, percentages):
                 invoice_status_data.append([
                     status.get('status', ''),
                     str(status.get('count', 0)),
-                    f"N{amount:,.2f}",
+                    _fmt_naira(amount),
                     f"{percentage:.1f}%"
                 ])
             
@@ -635,49 +913,46 @@ class ExportService:
                 ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
                 ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#DEE2E6'))
             ]))
-            story.append(Spacer(1, 15))
-            story.append(invoice_table)
+            story_append(Spacer(1, 15))
+            story_append(invoice_table)
         
-        story.append(PageBreak())
+        story_append(PageBreak())
         
         # Profit/Loss Trend Analysis
         trend_title = Paragraph("PROFIT/LOSS TREND ANALYSIS", section_style)
-        story.append(trend_title)
+        story_append(trend_title)
         
         profit_loss_trend = analytics_data.get('profit_loss_trend', [])
         if profit_loss_trend:
+            periods = [trend.get('period', '') for trend in profit_loss_trend]
+            profit_losses = [trend.get('profit_loss', 0) for trend in profit_loss_trend]
+            
             # Create line chart for trend
-            trend_data = {}
-            for trend in profit_loss_trend:
-                period = trend.get('period', '')
-                profit_loss = trend.get('profit_loss', 0)
-                trend_data[period] = profit_loss
+            trend_data = dict(zip(periods, profit_losses))
             
             try:
-                chart_buffer = self._create_chart_image('line', trend_data, 
-                                                      'Profit/Loss Trend Over Time', 8, 5)
-                if chart_buffer:
-                    chart_img = Image(chart_buffer, width=6*inch, height=3.5*inch)
-                    story.append(chart_img)
+                chart = self._create_chart('line', trend_data, 'Profit/Loss Trend Over Time', 6, 3.5)
+                if chart is not None:
+                    story_append(chart)
                 else:
-                    story.append(Paragraph("Trend chart could not be generated", self.styles['Normal']))
+                    story_append(Paragraph("Trend chart could not be generated", self.styles['Normal']))
             except Exception as e:
                 logger.error(f"Error creating trend chart: {e}")
-                story.append(Paragraph("Trend chart could not be generated", self.styles['Normal']))
+                story_append(Paragraph("Trend chart could not be generated", self.styles['Normal']))
             
             # Add detailed trend table
             trend_table_data = [['Period', 'Revenue', 'Expenses', 'Profit/Loss', 'Margin %']]
-            for trend in profit_loss_trend:
-                revenue = trend.get('revenue', 0)
-                expenses = trend.get('expenses', 0)
-                profit_loss = trend.get('profit_loss', 0)
-                margin = (profit_loss / revenue * 100) if revenue > 0 else 0
-                
+            revenues = [trend.get('revenue', 0) for trend in profit_loss_trend]
+            expenses_list = [trend.get('expenses', 0) for trend in profit_loss_trend]
+            margins = _safe_percentages(profit_losses, revenues).tolist()
+            for period, revenue, expenses, profit_loss, margin in zip(
+                periods, revenues, expenses_list, profit_losses, margins
+            ):
                 trend_table_data.append([
-                    trend.get('period', ''),
-                    f"N{revenue:,.2f}",
-                    f"N{expenses:,.2f}",
-                    f"N{profit_loss:,.2f}",
+                    period,
+                    _fmt_naira(revenue),
+                    _fmt_naira(expenses),
+                    _fmt_naira(profit_loss),
                     f"{margin:.1f}%"
                 ])
             
@@ -696,13 +971,13 @@ class ExportService:
                 ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
                 ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#DEE2E6'))
             ]))
-            story.append(Spacer(1, 15))
-            story.append(trend_table)
+            story_append(Spacer(1, 15))
+            story_append(trend_table)
         
         # Top Expense Categories
-        story.append(Spacer(1, 30))
+        story_append(Spacer(1, 30))
         expense_title = Paragraph("TOP EXPENSE CATEGORIES", section_style)
-        story.append(expense_title)
+        story_append(expense_title)
         
         top_categories = analytics_data.get('top_expense_categories', [])
         if top_categories:
@@ -712,41 +987,28 @@ class ExportService:
                 expense_data[category.get('category', 'Unknown')] = category.get('total_amount', 0)
             
             try:
-                chart_buffer = self._create_chart_image('bar', expense_data, 
-                                                      'Top 5 Expense Categories', 8, 5)
-                if chart_buffer:
-                    chart_img = Image(chart_buffer, width=6*inch, height=3.5*inch)
-                    story.append(chart_img)
+                chart = self._create_chart('bar', expense_data, 'Top 5 Expense Categories', 6, 3.5)
+                if chart is not None:
+                    story_append(chart)
                 else:
-                    story.append(Paragraph("Expense chart could not be generated", self.styles['Normal']))
+                    story_append(Paragraph("Expense chart could not be generated", self.styles['Normal']))
             except Exception as e:
                 logger.error(f"Error creating expense chart: {e}")
-                story.append(Paragraph("Expense chart could not be generated", self.styles['Normal']))
+                story_append(Paragraph("Expense chart could not be generated", self.styles['Normal']))
         
         # Footer with insights
-        story.append(Spacer(1, 40))
-        footer_style = ParagraphStyle(
-            'Footer',
-            parent=self.styles['Normal'],
-            fontSize=10,
-            textColor=colors.HexColor('#6C757D'),
-            alignment=1,
-            borderWidth=1,
-            borderColor=colors.HexColor('#DEE2E6'),
-            borderPadding=10,
-            backColor=colors.HexColor('#F8F9FA')
-        )
-        
-        footer_text = f"""
-        <b>Report Summary:</b><br/>
-        This comprehensive financial analytics report was generated on {datetime.now().strftime('%B %d, %Y at %I:%M %p')}.<br/>
-        The analysis includes revenue trends, expense breakdowns, and profitability metrics for informed decision-making.<br/>
-        <br/>
-        <b>Henam Facility Management Ltd</b> | Financial Analytics Dashboard
-        """
-        
-        footer = Paragraph(footer_text, footer_style)
-        story.append(footer)
+        story_append(Spacer(1, 40))
+        now_str = datetime.now().strftime('%B %d, %Y at %I:%M %p')
+        # Static lines are parsed once at import; copies keep concurrent builds independent
+        footer_table = Table([[[
+            copy.copy(_FOOTER_SUMMARY_HEADING),
+            Paragraph(f"This comprehensive financial analytics report was generated on {now_str}.", _FOOTER_STYLE),
+            copy.copy(_FOOTER_SUMMARY_BODY),
+            Spacer(1, _FOOTER_STYLE.leading),
+            copy.copy(_FOOTER_SIGNATURE),
+        ]]])
+        footer_table.setStyle(_FOOTER_TABLE_STYLE)
+        story_append(KeepTogether(footer_table))
         
         # Build PDF
         doc.build(story)
@@ -758,55 +1020,50 @@ class ExportService:
 export_service = ExportService()
 
 
+class WatermarkPageTemplate(PageTemplate):
+    """Page template that draws the company logo as a faint watermark."""
+
+    def __init__(self, id, frames, logo_path=None, **kwargs):
+        PageTemplate.__init__(self, id, frames, **kwargs)
+        self.logo_path = logo_path
+        
+    def beforeDrawPage(self, canvas, doc):
+        """Add watermark before drawing page content"""
+        # logo_path comes from _get_logo_path(), whose cached answer can be up to
+        # LOGO_CACHE_TTL seconds old, so the file may have gone away since
+        if self.logo_path:
+            # Save current graphics state
+            canvas.saveState()
+            try:
+                # Set transparency (0.25 = 25% opacity, more visible overlay)
+                canvas.setFillAlpha(0.25)
+                canvas.setStrokeAlpha(0.25)
+                
+                # Get page dimensions
+                page_width, page_height = letter
+                
+                # Calculate position for watermark to overlay table area
+                # Make watermark larger and position it over the main content
+                watermark_width = 350
+                watermark_height = 120
+                x = (page_width - watermark_width) / 2
+                y = (page_height - watermark_height) / 2 + 50  # Shift up slightly to overlay table
+                
+                # Draw the watermark image
+                canvas.drawImage(self.logo_path, x, y, 
+                               width=watermark_width, 
+                               height=watermark_height,
+                               preserveAspectRatio=True,
+                               mask='auto')
+            except Exception as e:
+                print(f"Warning: Could not add watermark: {e}")
+            finally:
+                # Restore graphics state even if the image failed, or the page renders at 25% opacity
+                canvas.restoreState()
+
+
 def generate_invoice_pdf_OLD(invoice, db) -> BytesIO:
     """Generate PDF for a specific invoice and return the binary data."""
-    # Import required modules
-    from reportlab.lib.styles import ParagraphStyle
-    from reportlab.lib.units import inch
-    from reportlab.platypus import Image, PageTemplate, Frame
-    from reportlab.platypus.doctemplate import BaseDocTemplate
-    from reportlab.pdfgen import canvas
-    import os
-    
-    # Custom page template with watermark
-    class WatermarkPageTemplate(PageTemplate):
-        def __init__(self, id, frames, logo_path=None, **kwargs):
-            PageTemplate.__init__(self, id, frames, **kwargs)
-            self.logo_path = logo_path
-            
-        def beforeDrawPage(self, canvas, doc):
-            """Add watermark before drawing page content"""
-            if self.logo_path and os.path.exists(self.logo_path):
-                try:
-                    # Save current graphics state
-                    canvas.saveState()
-                    
-                    # Set transparency (0.25 = 25% opacity, more visible overlay)
-                    canvas.setFillAlpha(0.25)
-                    canvas.setStrokeAlpha(0.25)
-                    
-                    # Get page dimensions
-                    page_width, page_height = letter
-                    
-                    # Calculate position for watermark to overlay table area
-                    # Make watermark larger and position it over the main content
-                    watermark_width = 350
-                    watermark_height = 120
-                    x = (page_width - watermark_width) / 2
-                    y = (page_height - watermark_height) / 2 + 50  # Shift up slightly to overlay table
-                    
-                    # Draw the watermark image
-                    canvas.drawImage(self.logo_path, x, y, 
-                                   width=watermark_width, 
-                                   height=watermark_height,
-                                   preserveAspectRatio=True,
-                                   mask='auto')
-                    
-                    # Restore graphics state
-                    canvas.restoreState()
-                except Exception as e:
-                    print(f"Warning: Could not add watermark: {e}")
-    
     # Create PDF in memory with optimized margins for single page
     output = BytesIO()
     
@@ -815,17 +1072,9 @@ def generate_invoice_pdf_OLD(invoice, db) -> BytesIO:
                          rightMargin=50, leftMargin=50, 
                          topMargin=50, bottomMargin=50)
     
-    # Check if logo exists for watermark - try different formats
-    logo_path = None
-    logo_exists = False
-    
-    # Try different image formats
-    for ext in ['.jpg', '.jpeg', '.png', '.gif', '.bmp']:
-        test_logo_path = f"uploads/company_logo/henam_logo{ext}"
-        if os.path.exists(test_logo_path):
-            logo_path = test_logo_path
-            logo_exists = True
-            break
+    # Check if logo exists for watermark
+    logo_path = _get_logo_path()
+    logo_exists = logo_path is not None
     
     # Create frame for content
     frame = Frame(doc.leftMargin, doc.bottomMargin, doc.width, doc.height, id='normal')
@@ -841,7 +1090,7 @@ def generate_invoice_pdf_OLD(invoice, db) -> BytesIO:
     doc.addPageTemplates([watermark_template])
     
     elements = []
-    styles = getSampleStyleSheet()
+    styles = _STYLES
     
     # Clean professional styles with better fonts and spacing
     # Company header style - elegant and prominent
@@ -1115,11 +1364,10 @@ def generate_invoice_pdf_OLD(invoice, db) -> BytesIO:
     return output
 
 
-def generate_invoice_pdf(invoice, db) -> BytesIO:
+def generate_invoice_pdf(invoice, db, styles=None) -> BytesIO:
     """Generate PDF invoice matching the exact client design."""
-    from reportlab.lib.units import inch
-    from reportlab.platypus import Image
-    import os
+    if styles is None:
+        styles = _STYLES
     
     # Naira symbol - using NGN as the symbol doesn't render properly in PDFs
     NAIRA = "NGN "
@@ -1129,7 +1377,6 @@ def generate_invoice_pdf(invoice, db) -> BytesIO:
                           rightMargin=50, leftMargin=50,
                           topMargin=50, bottomMargin=50)
     elements = []
-    styles = getSampleStyleSheet()
     
     # Normal readable styles
     normal_style = ParagraphStyle(
@@ -1150,12 +1397,7 @@ def generate_invoice_pdf(invoice, db) -> BytesIO:
     )
     
     # Find logo
-    logo_path = None
-    for ext in ['.jpg', '.jpeg', '.png']:
-        test_path = f"uploads/company_logo/henam_logo{ext}"
-        if os.path.exists(test_path):
-            logo_path = test_path
-            break
+    logo_path = _get_logo_path()
     
     # Header: Logo (left) and Company Info (right)
     if logo_path:
@@ -1,11 +1,16 @@
+import logging
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from datetime import datetime, timedelta
 from typing import Optional
 from app.models import Invoice, Job, User, Team, JobStatus, InvoiceStatus, Notification, NotificationType
 from app.services.notification_service import notification_service
+from app.services.notification_queue import notification_queue, get_active_recipients, insert_notifications
+from app.services.email_service import email_service
+from app.database import SessionLocal
 import asyncio
 
+logger = logging.getLogger(__name__)
 
 class InvoiceConversionService:
     """Service for handling invoice-to-job conversion logic."""
@@ -66,77 +71,23 @@ class InvoiceConversionService:
             invoice.converted_job_id = job.id
             invoice.job_id = job.id  # Link the invoice to the new job
             
-            # Don't commit here - let the calling endpoint handle the commit
-            db.flush()  # Just flush to get the IDs
+            # Don't commit here - let the calling endpoint handle the commit;
+            # the invoice UPDATE goes out with it
             
-            # Start notifications in background (fire-and-forget)
-            def start_job_notifications():
-                try:
-                    import threading
-                    import asyncio
-                    def run_job_notifications():
-                        try:
-                            loop = asyncio.new_event_loop()
-                            asyncio.set_event_loop(loop)
-                            loop.run_until_complete(
-                                InvoiceConversionService.notify_job_created_from_invoice(job, invoice, db)
-                            )
-                            loop.close()
-                            print(f"✅ Completed job creation notifications for invoice #{invoice.invoice_number}")
-                        except Exception as e:
-                            print(f"Error in background job notifications: {e}")
-                    
-                    # Start in background thread
-                    notification_thread = threading.Thread(target=run_job_notifications, daemon=True)
-                    notification_thread.start()
-                    print(f"✅ Started job creation notifications for invoice #{invoice.invoice_number}")
-                except Exception as e:
-                    print(f"Error starting job creation notifications: {e}")
-            
-            start_job_notifications()
+            # Hand notifications to the shared notification queue (fire-and-forget)
+            await InvoiceConversionService.notify_job_created_from_invoice(job, invoice, db)
             
             return job
             
         except Exception as e:
             db.rollback()
-            print(f"Error converting invoice to job: {e}")
+            logger.error(f"Error converting invoice to job: {e}")
             raise e
     
     @staticmethod
     async def notify_job_created_from_invoice(job: Job, invoice: Invoice, db: Session):
-        """Send email notifications to all users about the new job created from invoice payment."""
+        """Queue in-app and email notifications about a job created from invoice payment."""
         try:
-            # Create a fresh session for notifications to avoid rollback issues
-            from app.database import SessionLocal
-            notification_db = SessionLocal()
-            
-            recipients = []
-            try:
-                # Get all active users and extract their data while session is active
-                users = notification_db.query(User).filter(User.is_active == True).all()
-                
-                # Extract user data while session is active
-                recipients = [{'email': user.email, 'name': user.name} for user in users]
-                
-                for user in users:
-                    # Create in-app notification
-                    notification = Notification(
-                        user_id=user.id,
-                        type=NotificationType.JOB_CREATED,
-                        title="New Job Created from Invoice Payment",
-                        message=f"A new job '{job.title}' has been automatically created because payment was received for invoice #{invoice.invoice_number}. Payment amount: ₦{invoice.paid_amount:,.2f}",
-                        related_id=job.id
-                    )
-                    notification_db.add(notification)
-                
-                notification_db.commit()
-                print(f"✅ Created system notifications for job creation from invoice #{invoice.invoice_number}")
-            finally:
-                notification_db.close()
-            
-            # Send email notifications using the existing email service
-            from app.services.email_service import email_service
-            
             invoice_data = {
                 'invoice_number': invoice.invoice_number,
                 'client_name': invoice.client_name,
@@ -150,79 +101,80 @@ class InvoiceConversionService:
                 'client': job.client
             }
             
-            email_service.send_invoice_converted_to_job_notification(invoice_data, job_data, recipients)
+            await notification_queue.enqueue_invoice_converted(invoice_data, job_data)
             
         except Exception as e:
-            print(f"Error sending job creation notifications: {e}")
+            logger.error(f"Error queueing job creation notifications: {e}")
     
     @staticmethod
     async def notify_invoice_created(invoice: Invoice, db: Session, creator_user_id: int = None):
         """Send email notifications to all users about a new invoice."""
         try:
-            # Create a fresh session for notifications to avoid rollback issues
-            from app.database import SessionLocal
-            notification_db = SessionLocal()
-            
-            recipients = []
-            try:
-                # Get all active users and extract their data while session is active
-                users = notification_db.query(User).filter(User.is_active == True).all()
-                
-                # Extract user data while session is active
-                recipients = [{'email': user.email, 'name': user.name} for user in users]
-                
-                for user in users:
-                    # Create different messages for creator vs other users
-                    if creator_user_id and user.id == creator_user_id:
-                        title = "Invoice Created Successfully"
-                        message = f"Your invoice #{invoice.invoice_number} for {invoice.client_name} has been created successfully. Amount: ₦{invoice.amount:,.2f}, Due: {invoice.due_date.strftime('%Y-%m-%d')}. You can download the PDF from the Actions menu."
-                    else:
-                        title = "New Invoice Created"
-                        message = f"A new invoice #{invoice.invoice_number} has been created for {invoice.client_name}. Amount: ₦{invoice.amount:,.2f}, Due: {invoice.due_date.strftime('%Y-%m-%d')}"
-                    
-                    # Create in-app notification
-                    notification = Notification(
-                        user_id=user.id,
-                        type=NotificationType.INVOICE_CREATED,
-                        title=title,
-                        message=message,
-                        related_id=invoice.id
-                    )
-                    notification_db.add(notification)
-                
-                notification_db.commit()
-                print(f"✅ Created system notifications for invoice #{invoice.invoice_number}")
-            finally:
-                notification_db.close()
-            
-            # Send email notifications using the existing email service
-            from app.services.email_service import email_service
+            amount_str = f"{invoice.amount:,.2f}"
+            due_str = invoice.due_date.strftime('%Y-%m-%d')
             
             invoice_data = {
                 'invoice_number': invoice.invoice_number,
                 'client_name': invoice.client_name,
                 'job_type': invoice.job_type,
                 'amount': invoice.amount,
-                'due_date': invoice.due_date.strftime('%Y-%m-%d'),
+                'due_date': due_str,
                 'description': invoice.description or invoice.job_details
             }
             
-            email_service.send_invoice_created_notification(invoice_data, recipients)
+            # Create a fresh session for notifications to avoid rollback issues
+            loop = asyncio.get_running_loop()
+            with SessionLocal() as notification_db:
+                # Active users as (id, email, name), cached briefly across events
+                rows = get_active_recipients(notification_db)
+                
+                # Format the per-event values once; only user_id varies per row
+                creator_row = {
+                    'type': NotificationType.INVOICE_CREATED,
+                    'title': "Invoice Created Successfully",
+                    'message': f"Your invoice #{invoice.invoice_number} for {invoice.client_name} has been created successfully. Amount: ₦{amount_str}, Due: {due_str}. You can download the PDF from the Actions menu.",
+                    'related_id': invoice.id
+                }
+                other_row = {
+                    'type': NotificationType.INVOICE_CREATED,
+                    'title': "New Invoice Created",
+                    'message': f"A new invoice #{invoice.invoice_number} has been created for {invoice.client_name}. Amount: ₦{amount_str}, Due: {due_str}",
+                    'related_id': invoice.id
+                }
+                
+                # Build in-app notification rows; recipients that turn out to be deleted
+                # are dropped by the insert and skipped for email too
+                values = []
+                for user_id, email, name in rows:
+                    row = creator_row if creator_user_id and user_id == creator_user_id else other_row
+                    values.append({**row, 'user_id': user_id})
+                dropped = insert_notifications(notification_db, values)
+                recipients = [{'email': email, 'name': name} for user_id, email, name in rows if user_id not in dropped]
+                
+                # Send email notifications on the shared pool while the commit is in flight
+                email_future = loop.run_in_executor(
+                    notification_queue.executor,
+                    email_service.send_invoice_created_notification,
+                    invoice_data,
+                    recipients
+                )
+                try:
+                    notification_db.commit()
+                    logger.info(f"Created system notifications for invoice #{invoice.invoice_number}")
+                finally:
+                    await email_future
             
-            print(f"✅ Sent email notifications for invoice #{invoice.invoice_number}")
+            logger.info(f"Sent email notifications for invoice #{invoice.invoice_number}")
             
         except Exception as e:
-            print(f"Error sending invoice creation notifications: {e}")
+            logger.error(f"Error sending invoice creation notifications: {e}")
 
     @staticmethod
     async def notify_invoice_updated(invoice: Invoice, db: Session, updater_user_id: int = None):
         """Send notification to the user who updated the invoice."""
         try:
             # Create a fresh session for notifications to avoid rollback issues
-            from app.database import SessionLocal
-            notification_db = SessionLocal()
-            
-            try:
+            with SessionLocal() as notification_db:
                 if updater_user_id:
                     # Create notification for the user who updated the invoice
                     notification = Notification(
@@ -234,55 +186,22 @@ class InvoiceConversionService:
                     )
                     notification_db.add(notification)
                     notification_db.commit()
-                    print(f"✅ Created update notification for invoice #{invoice.invoice_number}")
-            finally:
-                notification_db.close()
+                    logger.info(f"Created update notification for invoice #{invoice.invoice_number}")
                 
         except Exception as e:
-            print(f"Error sending invoice update notification: {e}")
+            logger.error(f"Error sending invoice update notification: {e}")
 
     @staticmethod
     async def notify_payment_updated(invoice: Invoice, db: Session, updater_user_id: int = None):
         """Send notification about payment update."""
+        # Two payments landing on the same invoice back to back produce the same fan-out
+        dedupe_key = ('payment_updated', invoice.id)
+        if not notification_queue.claim(dedupe_key):
+            logger.info(f"Payment update notification for invoice #{invoice.invoice_number} already in flight, skipping duplicate")
+            return
+        
         try:
-            # Create a fresh session for notifications to avoid rollback issues
-            from app.database import SessionLocal
-            notification_db = SessionLocal()
-            
-            recipients = []
-            try:
-                # Get all active users and extract their data while session is active
-                users = notification_db.query(User).filter(User.is_active == True).all()
-                
-                # Extract user data while session is active
-                recipients = [{'email': user.email, 'name': user.name} for user in users]
-                
-                for user in users:
-                    # Create different messages for updater vs other users
-                    if updater_user_id and user.id == updater_user_id:
-                        title = "Payment Updated Successfully"
-                        message = f"You updated the payment for invoice #{invoice.invoice_number} ({invoice.client_name}). Paid: ₦{invoice.paid_amount:,.2f}, Remaining: ₦{invoice.pending_amount:,.2f}"
-                    else:
-                        title = "Invoice Payment Updated"
-                        message = f"Payment updated for invoice #{invoice.invoice_number} ({invoice.client_name}). Paid: ₦{invoice.paid_amount:,.2f}, Remaining: ₦{invoice.pending_amount:,.2f}"
-                    
-                    # Create in-app notification
-                    notification = Notification(
-                        user_id=user.id,
-                        type=NotificationType.INVOICE_CREATED,  # Reuse invoice type for payment updates
-                        title=title,
-                        message=message,
-                        related_id=invoice.id
-                    )
-                    notification_db.add(notification)
-                
-                notification_db.commit()
-                print(f"✅ Created system notifications for payment update on invoice #{invoice.invoice_number}")
-            finally:
-                notification_db.close()
-            
-            # Send email notifications using the existing email service
-            from app.services.email_service import email_service
+            amounts_str = f"Paid: ₦{invoice.paid_amount:,.2f}, Remaining: ₦{invoice.pending_amount:,.2f}"
             
             invoice_data = {
                 'invoice_number': invoice.invoice_number,
@@ -293,13 +212,54 @@ class InvoiceConversionService:
                 'status': invoice.status.value
             }
             
-            # Send payment update email notification
-            email_service.send_payment_updated_notification(invoice_data, recipients)
+            # Create a fresh session for notifications to avoid rollback issues
+            loop = asyncio.get_running_loop()
+            with SessionLocal() as notification_db:
+                # Active users as (id, email, name), cached briefly across events
+                rows = get_active_recipients(notification_db)
+                
+                # Format the per-event values once; only user_id varies per row
+                updater_row = {
+                    'type': NotificationType.INVOICE_CREATED,  # Reuse invoice type for payment updates
+                    'title': "Payment Updated Successfully",
+                    'message': f"You updated the payment for invoice #{invoice.invoice_number} ({invoice.client_name}). {amounts_str}",
+                    'related_id': invoice.id
+                }
+                other_row = {
+                    'type': NotificationType.INVOICE_CREATED,
+                    'title': "Invoice Payment Updated",
+                    'message': f"Payment updated for invoice #{invoice.invoice_number} ({invoice.client_name}). {amounts_str}",
+                    'related_id': invoice.id
+                }
+                
+                # Build in-app notification rows; recipients that turn out to be deleted
+                # are dropped by the insert and skipped for email too
+                values = []
+                for user_id, email, name in rows:
+                    row = updater_row if updater_user_id and user_id == updater_user_id else other_row
+                    values.append({**row, 'user_id': user_id})
+                dropped = insert_notifications(notification_db, values)
+                recipients = [{'email': email, 'name': name} for user_id, email, name in rows if user_id not in dropped]
+                
+                # Send payment update email notifications on the shared pool while the commit is in flight
+                email_future = loop.run_in_executor(
+                    notification_queue.executor,
+                    email_service.send_payment_updated_notification,
+                    invoice_data,
+                    recipients
+                )
+                try:
+                    notification_db.commit()
+                    logger.info(f"Created system notifications for payment update on invoice #{invoice.invoice_number}")
+                finally:
+                    await email_future
             
-            print(f"✅ Sent email notifications for payment update on invoice #{invoice.invoice_number}")
+            logger.info(f"Sent email notifications for payment update on invoice #{invoice.invoice_number}")
             
         except Exception as e:
-            print(f"Error sending payment update notifications: {e}")
+            logger.error(f"Error sending payment update notifications: {e}")
+        finally:
+            notification_queue.release(dedupe_key)
 
 
 # Create a singleton instance
@@ -1,24 +1,160 @@
 import asyncio
+import functools
+import itertools
 import logging
-from typing import Dict, Any, List, Optional
-from datetime import datetime
+import threading
+import time
+from typing import Dict, Any, List, Optional, Tuple
 from concurrent.futures import ThreadPoolExecutor
 from app.services.email_service import email_service
-from app.database import get_db
-from app.models import Notification, NotificationType, NotificationStatus, User
+from app.database import SessionLocal
+from app.models import Job, Notification, NotificationType, NotificationStatus, User
+from app.services.robust_cache_service import robust_cache
+from sqlalchemy import insert, or_, select, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of queued notifications drained into one DB transaction
+NOTIFICATION_BATCH_SIZE = 64
+# Threads used for SMTP sends; each notification's recipients are split across them
+EMAIL_WORKERS = 4
+# Seconds within which a repeat of a still-pending update notification is dropped
+COALESCE_WINDOW = 2.0
+# Pending notifications held before new ones are rejected
+NOTIFICATION_QUEUE_MAXSIZE = 10_000
+# Lower values are processed first; update fan-outs yield to creations and conversions
+NOTIFICATION_PRIORITIES = {
+    'invoice_converted': 0,
+    'job_created': 1,
+    'task_created': 1,
+    'job_updated': 2,
+    'task_updated': 2,
+}
+
+# Seconds the active-user recipient list is reused between notification events
+ACTIVE_RECIPIENTS_TTL = 60
+# Bumped on every user change so each gunicorn worker drops its cached list, not just the one
+# that handled the change; without Redis the TTL alone bounds staleness
+ACTIVE_RECIPIENTS_VERSION_KEY = "notifications:active_recipients:version"
+_active_recipients_cache = {'rows': None, 'fetched_at': None, 'version': None}
+_active_recipients_lock = threading.Lock()
+
+
+def _active_recipients_version() -> Optional[str]:
+    """Shared cache version from Redis, or None when Redis is unavailable."""
+    if robust_cache.redis_client is None:
+        return None
+    try:
+        return robust_cache.redis_client.get(ACTIVE_RECIPIENTS_VERSION_KEY) or '0'
+    except Exception as e:
+        logger.warning(f"Could not read active recipients version: {e}")
+        return None
+
+
+def get_active_recipients(db: Session) -> Tuple[Tuple[int, str, str], ...]:
+    """Return (id, email, name) for all active users, re-queried at most once per TTL or user change."""
+    now = time.monotonic()
+    version = _active_recipients_version()
+    with _active_recipients_lock:
+        fetched_at = _active_recipients_cache['fetched_at']
+        if (fetched_at is not None and now - fetched_at <= ACTIVE_RECIPIENTS_TTL
+                and _active_recipients_cache['version'] == version):
+            return _active_recipients_cache['rows']
+    
+    rows = tuple(
+        tuple(row) for row in db.execute(
+            select(User.id, User.email, User.name).where(User.is_active == True)
+        ).all()
+    )
+    with _active_recipients_lock:
+        _active_recipients_cache.update(rows=rows, fetched_at=now, version=version)
+    return rows
+
+
+def invalidate_active_recipients():
+    """Drop the cached recipient list, in every worker, after users are created, changed or removed."""
+    with _active_recipients_lock:
+        _active_recipients_cache.update(rows=None, fetched_at=None, version=None)
+    if robust_cache.redis_client is not None:
+        try:
+            robust_cache.redis_client.incr(ACTIVE_RECIPIENTS_VERSION_KEY)
+        except Exception as e:
+            logger.warning(f"Could not bump active recipients version: {e}")
+
+
+def insert_notifications(db: Session, values: List[Dict[str, Any]], statement=None) -> set:
+    """
+    Bulk insert in-app notification rows inside a savepoint.
+    
+    A cached recipient may have been deleted since the list was read, which fails the
+    users foreign key for the whole statement. In that case the cache is invalidated,
+    the rows are narrowed to users that are still active and the insert is retried
+    once. Returns the user ids that were dropped, so callers can skip their emails.
+    """
+    if statement is None:
+        statement = insert(Notification.__table__)
+    if not values:
+        return set()
+    try:
+        with db.begin_nested():
+            db.execute(statement, values)
+        return set()
+    except IntegrityError as e:
+        logger.warning(f"Notification insert hit a stale recipient, retrying with current users: {e.orig}")
+    
+    invalidate_active_recipients()
+    user_ids = {row['user_id'] for row in values}
+    live = set(db.scalars(select(User.id).where(User.id.in_(user_ids), User.is_active == True)))
+    values = [row for row in values if row['user_id'] in live]
+    if values:
+        with db.begin_nested():
+            db.execute(statement, values)
+    return user_ids - live
+
+
+# Bulk insert that ignores notifications already recorded for the same event
+NOTIFICATION_INSERT = pg_insert(Notification.__table__).on_conflict_do_nothing(
+    index_elements=['user_id', 'type', 'related_id'],
+    index_where=text("type = 'job_created'")
+)
+
 
 class NotificationQueue:
     """Async queue for handling email notifications without blocking API responses."""
     
     def __init__(self):
-        self.executor = ThreadPoolExecutor(max_workers=4)
-        self.queue = asyncio.Queue()
+        self.executor = ThreadPoolExecutor(max_workers=EMAIL_WORKERS)
+        self.queue = asyncio.PriorityQueue(maxsize=NOTIFICATION_QUEUE_MAXSIZE)
+        self._sequence = itertools.count()
         self.is_running = False
         self.worker_task = None
+        self._handlers = {
+            'job_created': self._handle_job_created,
+            'job_updated': self._handle_job_updated,
+            'task_created': self._handle_task_created,
+            'task_updated': self._handle_task_updated,
+            'invoice_converted': self._handle_invoice_converted,
+        }
+        self._inflight: Dict[tuple, float] = {}
+        self._inflight_lock = threading.Lock()
+    
+    def claim(self, key: tuple) -> bool:
+        """Mark a notification as in flight; False if the same one is already pending within the coalescing window."""
+        now = time.monotonic()
+        with self._inflight_lock:
+            claimed_at = self._inflight.get(key)
+            if claimed_at is not None and now - claimed_at < COALESCE_WINDOW:
+                return False
+            self._inflight[key] = now
+            return True
+    
+    def release(self, key: tuple):
+        """Allow notifications for this key again once the pending one is being processed."""
+        with self._inflight_lock:
+            self._inflight.pop(key, None)
     
     async def start(self):
         """Start the notification queue worker."""
@@ -42,280 +178,372 @@ class NotificationQueue:
             logger.info("Notification queue stopped")
     
     async def _worker(self):
-        """Background worker that processes notification queue."""
+        """Background worker that drains the queue and processes notifications in batches."""
         while self.is_running:
             try:
                 # Wait for notification with timeout
-                notification_data = await asyncio.wait_for(self.queue.get(), timeout=1.0)
-                await self._process_notification(notification_data)
-                self.queue.task_done()
+                _, _, notification_data = await asyncio.wait_for(self.queue.get(), timeout=1.0)
             except asyncio.TimeoutError:
                 continue
+            
+            # Drain whatever else is already waiting so bursts share one transaction
+            batch = [notification_data]
+            while len(batch) < NOTIFICATION_BATCH_SIZE and not self.queue.empty():
+                batch.append(self.queue.get_nowait()[2])
+            
+            try:
+                await self._process_batch(batch)
             except Exception as e:
-                logger.error(f"Error processing notification: {str(e)}")
+                logger.error(f"Error processing notification batch: {str(e)}")
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
     
     async def _process_notification(self, notification_data: Dict[str, Any]):
         """Process a single notification."""
-        try:
-            notification_type = notification_data.get('type')
+        await self._process_batch([notification_data])
+    
+    async def _process_batch(self, batch: List[Dict[str, Any]]):
+        """Write in-app notifications for a batch in one transaction, then send the emails.
+        
+        If the batch insert fails, each notification is retried in its own transaction so
+        one bad row doesn't lose the rest; emails go out only for notifications whose
+        in-app rows were committed.
+        """
+        prepared = []
+        with SessionLocal() as db:
+            for notification_data in batch:
+                dedupe_key = notification_data.get('dedupe_key')
+                if dedupe_key is not None:
+                    self.release(dedupe_key)
+                try:
+                    item = self._prepare_notification(db, notification_data)
+                except Exception as e:
+                    logger.error(f"Error handling notification {notification_data.get('type')}: {str(e)}")
+                    continue
+                if item is None:
+                    continue
+                rows, email = item
+                prepared.append((notification_data, rows, email))
             
-            if notification_type == 'job_created':
-                await self._handle_job_created(notification_data)
-            elif notification_type == 'job_updated':
-                await self._handle_job_updated(notification_data)
-            elif notification_type == 'task_created':
-                await self._handle_task_created(notification_data)
-            elif notification_type == 'task_updated':
-                await self._handle_task_updated(notification_data)
-            else:
-                logger.warning(f"Unknown notification type: {notification_type}")
-                
-        except Exception as e:
-            logger.error(f"Error handling notification {notification_data.get('type')}: {str(e)}")
+            # Create in-app notifications for the whole batch in a single bulk INSERT.
+            # A Core table insert skips the ORM bulk-save path; nothing is added to the session.
+            # Rows already written by an earlier attempt are skipped by the unique index.
+            committed = []
+            try:
+                dropped = insert_notifications(
+                    db, [row for _, rows, _ in prepared for row in rows], NOTIFICATION_INSERT
+                )
+                db.commit()
+                committed = [(notification_data, email, dropped) for notification_data, _, email in prepared]
+            except Exception as e:
+                db.rollback()
+                if len(prepared) > 1:
+                    logger.warning(f"Error saving notifications for batch of {len(batch)}, retrying one at a time: {str(e)}")
+                    for notification_data, rows, email in prepared:
+                        try:
+                            dropped = insert_notifications(db, rows, NOTIFICATION_INSERT)
+                            db.commit()
+                        except Exception as e:
+                            logger.error(f"Error saving {notification_data.get('type')} notification: {str(e)}")
+                            db.rollback()
+                            continue
+                        committed.append((notification_data, email, dropped))
+                else:
+                    logger.error(f"Error saving notifications for batch of {len(batch)}: {str(e)}")
+        
+        # Send email notifications, skipping users deleted since the recipients were read
+        for notification_data, (send, recipients), dropped in committed:
+            try:
+                await self._send_email(send, [r for r in recipients if r['user_id'] not in dropped])
+            except Exception as e:
+                logger.error(f"Error sending {notification_data.get('type')} email notification: {str(e)}")
+        
+        logger.info(f"Processed {len(committed)} of {len(batch)} queued notifications")
+    
+    def _put(self, notification_data: Dict[str, Any]) -> bool:
+        """Queue a notification by priority; drop it with a warning when the queue is full."""
+        priority = NOTIFICATION_PRIORITIES.get(notification_data['type'], 2)
+        try:
+            self.queue.put_nowait((priority, next(self._sequence), notification_data))
+        except asyncio.QueueFull:
+            logger.warning(f"Notification queue full, dropping {notification_data['type']} notification")
+            dedupe_key = notification_data.get('dedupe_key')
+            if dedupe_key is not None:
+                self.release(dedupe_key)
+            return False
+        return True
+    
+    async def _send_email(self, send, recipients: List[Dict[str, str]]):
+        """Split recipients into one chunk per email worker and send the chunks concurrently."""
+        if not recipients:
+            return
+        chunk_size = -(-len(recipients) // EMAIL_WORKERS)
+        loop = asyncio.get_event_loop()
+        await asyncio.gather(*[
+            loop.run_in_executor(self.executor, functools.partial(send, recipients=recipients[i:i + chunk_size]))
+            for i in range(0, len(recipients), chunk_size)
+        ])
+    
+    def _prepare_notification(self, db: Session, notification_data: Dict[str, Any]) -> Optional[Tuple[List[Dict[str, Any]], tuple]]:
+        """Build the in-app notification rows and the (send, recipients) email pair for one queued item."""
+        notification_type = notification_data.get('type')
+        handler = self._handlers.get(notification_type)
+        if handler is None:
+            logger.warning(f"Unknown notification type: {notification_type}")
+            return None
+        return handler(db, notification_data)
     
-    async def _handle_job_created(self, data: Dict[str, Any]):
+    def _handle_job_created(self, db: Session, data: Dict[str, Any]):
         """Handle job created notification."""
-        logger.info(f"Processing job created notification for job {data.get('job_data', {}).get('id')}")
+        job_data = data.get('job_data', {})
+        logger.info(f"Processing job created notification for job {job_data.get('id')}")
         
         # Get all users for job creation notifications
-        db = next(get_db())
-        try:
-            users = db.query(User).filter(User.is_active == True).all()
-            recipients = [{'email': user.email, 'name': user.name} for user in users]
-            
-            # Send email notifications
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(
-                self.executor,
-                email_service.send_job_created_notification,
-                data.get('job_data', {}),
-                recipients
-            )
-            
-            # Create in-app notifications
-            for user in users:
-                notification = Notification(
-                    user_id=user.id,
-                    type=NotificationType.JOB_ASSIGNED,
-                    title="New Job Created",
-                    message=f"A new job '{data.get('job_data', {}).get('title', 'Untitled')}' has been created.",
-                    related_id=data.get('job_data', {}).get('id')
-                )
-                db.add(notification)
-            
-            db.commit()
-            logger.info(f"Job created notifications processed successfully for job {data.get('job_data', {}).get('id')}")
-            
-        except Exception as e:
-            logger.error(f"Error handling job created notification: {str(e)}")
-            db.rollback()
-        finally:
-            db.close()
+        rows = get_active_recipients(db)
+        recipients = [{'user_id': user_id, 'email': email, 'name': name} for user_id, email, name in rows]
+        
+        title = "New Job Created"
+        message = f"A new job '{job_data.get('title', 'Untitled')}' has been created."
+        values = [
+            {
+                'user_id': user_id,
+                'type': NotificationType.JOB_ASSIGNED,
+                'title': title,
+                'message': message,
+                'related_id': job_data.get('id')
+            }
+            for user_id, _, _ in rows
+        ]
+        
+        return values, (functools.partial(email_service.send_job_created_notification, job_data), recipients)
     
-    async def _handle_job_updated(self, data: Dict[str, Any]):
+    def _handle_job_updated(self, db: Session, data: Dict[str, Any]):
         """Handle job updated notification."""
-        db = next(get_db())
-        try:
-            job_data = data.get('job_data', {})
-            job_id = job_data.get('id')
-            
-            if not job_id:
-                logger.error("Job ID not provided for job updated notification")
-                return
-            
-            # Get job participants (supervisor, assigner, team members)
-            from app.models import Job, Team
-            job = db.query(Job).filter(Job.id == job_id).first()
-            if not job:
-                logger.error(f"Job {job_id} not found for notification")
-                return
-            
-            # Get all users involved with this job
-            user_ids = set()
-            if job.supervisor_id:
-                user_ids.add(job.supervisor_id)
-            if job.assigner_id:
-                user_ids.add(job.assigner_id)
-            
-            # Add team members
-            team_members = db.query(User).filter(User.team_id == job.team_id).all()
-            for member in team_members:
-                user_ids.add(member.id)
-            
-            # Get users and send notifications
-            users = db.query(User).filter(User.id.in_(user_ids), User.is_active == True).all()
-            recipients = [{'email': user.email, 'name': user.name} for user in users]
-            
-            # Send email notifications
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(
-                self.executor,
-                email_service.send_job_updated_notification,
-                job_data,
-                recipients,
-                data.get('updated_by', 'System'),
-                data.get('changes', 'Job updated')
-            )
-            
-            # Create in-app notifications
-            for user in users:
-                notification = Notification(
-                    user_id=user.id,
-                    type=NotificationType.JOB_ASSIGNED,
-                    title="Job Updated",
-                    message=f"Job '{job_data.get('title', 'Untitled')}' has been updated by {data.get('updated_by', 'System')}.",
-                    related_id=job_id
-                )
-                db.add(notification)
-            
-            db.commit()
-            logger.info(f"Job updated notifications processed for job {job_id}")
-            
-        except Exception as e:
-            logger.error(f"Error handling job updated notification: {str(e)}")
-            db.rollback()
-        finally:
-            db.close()
+        job_data = data.get('job_data', {})
+        job_id = job_data.get('id')
+        
+        if not job_id:
+            logger.error("Job ID not provided for job updated notification")
+            return None
+        
+        # Get active job participants (supervisor, assigner, team members) in one round trip
+        rows = db.execute(
+            select(User.id, User.email, User.name)
+            .select_from(Job)
+            .join(User, or_(
+                User.id == Job.supervisor_id,
+                User.id == Job.assigner_id,
+                User.team_id == Job.team_id
+            ))
+            .where(Job.id == job_id, User.is_active == True)
+            .distinct()
+        ).all()
+        if not rows:
+            logger.error(f"Job {job_id} not found or has no active participants for notification")
+            return None
+        
+        recipients = [{'user_id': user_id, 'email': email, 'name': name} for user_id, email, name in rows]
+        
+        updated_by = data.get('updated_by', 'System')
+        title = "Job Updated"
+        message = f"Job '{job_data.get('title', 'Untitled')}' has been updated by {updated_by}."
+        values = [
+            {
+                'user_id': user_id,
+                'type': NotificationType.JOB_ASSIGNED,
+                'title': title,
+                'message': message,
+                'related_id': job_id
+            }
+            for user_id, _, _ in rows
+        ]
+        
+        logger.info(f"Job updated notifications prepared for job {job_id}")
+        send = functools.partial(
+            email_service.send_job_updated_notification,
+            job_data,
+            updated_by=updated_by,
+            changes=data.get('changes', 'Job updated')
+        )
+        return values, (send, recipients)
     
-    async def _handle_task_created(self, data: Dict[str, Any]):
+    def _handle_task_created(self, db: Session, data: Dict[str, Any]):
         """Handle task created notification."""
-        db = next(get_db())
-        try:
-            task_data = data.get('task_data', {})
-            assigner_id = task_data.get('assigner_id')
-            assigned_to_id = task_data.get('assigned_to_id')
-            
-            if not assigner_id or not assigned_to_id:
-                logger.error("Assigner or assignee ID not provided for task created notification")
-                return
-            
-            # Get assigner and assignee
-            user_ids = [assigner_id, assigned_to_id]
-            users = db.query(User).filter(User.id.in_(user_ids), User.is_active == True).all()
-            recipients = [{'email': user.email, 'name': user.name} for user in users]
-            
-            # Send email notifications
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(
-                self.executor,
-                email_service.send_task_created_notification,
-                task_data,
-                recipients
-            )
-            
-            # Create in-app notifications
-            for user in users:
-                notification = Notification(
-                    user_id=user.id,
-                    type=NotificationType.TASK_ASSIGNED,
-                    title="New Task Assigned",
-                    message=f"A new task '{task_data.get('title', 'Untitled')}' has been assigned.",
-                    related_id=task_data.get('id')
-                )
-                db.add(notification)
-            
-            db.commit()
-            logger.info(f"Task created notifications processed for task {task_data.get('id')}")
-            
-        except Exception as e:
-            logger.error(f"Error handling task created notification: {str(e)}")
-            db.rollback()
-        finally:
-            db.close()
+        task_data = data.get('task_data', {})
+        assigner_id = task_data.get('assigner_id')
+        assigned_to_id = task_data.get('assigned_to_id')
+        
+        if not assigner_id or not assigned_to_id:
+            logger.error("Assigner or assignee ID not provided for task created notification")
+            return None
+        
+        # Get assigner and assignee
+        user_ids = [assigner_id, assigned_to_id]
+        rows = db.execute(
+            select(User.id, User.email, User.name).where(User.id.in_(user_ids), User.is_active == True)
+        ).all()
+        recipients = [{'user_id': user_id, 'email': email, 'name': name} for user_id, email, name in rows]
+        
+        title = "New Task Assigned"
+        message = f"A new task '{task_data.get('title', 'Untitled')}' has been assigned."
+        values = [
+            {
+                'user_id': user_id,
+                'type': NotificationType.TASK_ASSIGNED,
+                'title': title,
+                'message': message,
+                'related_id': task_data.get('id')
+            }
+            for user_id, _, _ in rows
+        ]
+        
+        logger.info(f"Task created notifications prepared for task {task_data.get('id')}")
+        return values, (functools.partial(email_service.send_task_created_notification, task_data), recipients)
     
-    async def _handle_task_updated(self, data: Dict[str, Any]):
+    def _handle_task_updated(self, db: Session, data: Dict[str, Any]):
         """Handle task updated notification."""
-        db = next(get_db())
-        try:
-            task_data = data.get('task_data', {})
-            assigner_id = task_data.get('assigner_id')
-            assigned_to_id = task_data.get('assigned_to_id')
-            
-            if not assigner_id or not assigned_to_id:
-                logger.error("Assigner or assignee ID not provided for task updated notification")
-                return
-            
-            # Get assigner and assignee
-            user_ids = [assigner_id, assigned_to_id]
-            users = db.query(User).filter(User.id.in_(user_ids), User.is_active == True).all()
-            recipients = [{'email': user.email, 'name': user.name} for user in users]
-            
-            # Send email notifications
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(
-                self.executor,
-                email_service.send_task_updated_notification,
-                task_data,
-                recipients,
-                data.get('updated_by', 'System'),
-                data.get('changes', 'Task updated')
-            )
-            
-            # Create in-app notifications
-            for user in users:
-                notification = Notification(
-                    user_id=user.id,
-                    type=NotificationType.TASK_ASSIGNED,
-                    title="Task Updated",
-                    message=f"Task '{task_data.get('title', 'Untitled')}' has been updated by {data.get('updated_by', 'System')}.",
-                    related_id=task_data.get('id')
-                )
-                db.add(notification)
-            
-            db.commit()
-            logger.info(f"Task updated notifications processed for task {task_data.get('id')}")
-            
-        except Exception as e:
-            logger.error(f"Error handling task updated notification: {str(e)}")
-            db.rollback()
-        finally:
-            db.close()
+        task_data = data.get('task_data', {})
+        assigner_id = task_data.get('assigner_id')
+        assigned_to_id = task_data.get('assigned_to_id')
+        
+        if not assigner_id or not assigned_to_id:
+            logger.error("Assigner or assignee ID not provided for task updated notification")
+            return None
+        
+        # Get assigner and assignee
+        user_ids = [assigner_id, assigned_to_id]
+        rows = db.execute(
+            select(User.id, User.email, User.name).where(User.id.in_(user_ids), User.is_active == True)
+        ).all()
+        recipients = [{'user_id': user_id, 'email': email, 'name': name} for user_id, email, name in rows]
+        
+        updated_by = data.get('updated_by', 'System')
+        title = "Task Updated"
+        message = f"Task '{task_data.get('title', 'Untitled')}' has been updated by {updated_by}."
+        values = [
+            {
+                'user_id': user_id,
+                'type': NotificationType.TASK_ASSIGNED,
+                'title': title,
+                'message': message,
+                'related_id': task_data.get('id')
+            }
+            for user_id, _, _ in rows
+        ]
+        
+        logger.info(f"Task updated notifications prepared for task {task_data.get('id')}")
+        send = functools.partial(
+            email_service.send_task_updated_notification,
+            task_data,
+            updated_by=updated_by,
+            changes=data.get('changes', 'Task updated')
+        )
+        return values, (send, recipients)
+    
+    def _handle_invoice_converted(self, db: Session, data: Dict[str, Any]):
+        """Handle job created from invoice payment notification."""
+        invoice_data = data.get('invoice_data', {})
+        job_data = data.get('job_data', {})
+        
+        rows = get_active_recipients(db)
+        recipients = [{'user_id': user_id, 'email': email, 'name': name} for user_id, email, name in rows]
+        
+        title = "New Job Created from Invoice Payment"
+        message = f"A new job '{job_data.get('title')}' has been automatically created because payment was received for invoice #{invoice_data.get('invoice_number')}. Payment amount: ₦{invoice_data.get('paid_amount', 0):,.2f}"
+        values = [
+            {
+                'user_id': user_id,
+                'type': NotificationType.JOB_CREATED,
+                'title': title,
+                'message': message,
+                'related_id': job_data.get('id')
+            }
+            for user_id, _, _ in rows
+        ]
+        
+        logger.info(f"Invoice converted notifications prepared for job {job_data.get('id')}")
+        send = functools.partial(email_service.send_invoice_converted_to_job_notification, invoice_data, job_data)
+        return values, (send, recipients)
     
     async def enqueue_job_created(self, job_data: Dict[str, Any]):
         """Enqueue job created notification."""
         notification_data = {
             'type': 'job_created',
             'job_data': job_data,
-            'timestamp': datetime.now().isoformat()
+            'timestamp_ns': time.time_ns()
         }
         
-        await self.queue.put(notification_data)
-        logger.info(f"Job created notification queued for job {job_data.get('id')}")
+        if self._put(notification_data):
+            logger.info(f"Job created notification queued for job {job_data.get('id')}")
     
     async def enqueue_job_updated(self, job_data: Dict[str, Any], updated_by: str, changes: str):
         """Enqueue job updated notification."""
+        # Only an identical repeat is coalesced; an update by someone else, or with other
+        # changes, still carries information and is queued on its own
+        dedupe_key = ('job_updated', job_data.get('id'), updated_by, changes)
+        if not self.claim(dedupe_key):
+            logger.info(f"Identical job updated notification for job {job_data.get('id')} already pending, skipping duplicate")
+            return
+        
         notification_data = {
             'type': 'job_updated',
             'job_data': job_data,
             'updated_by': updated_by,
             'changes': changes,
-            'timestamp': datetime.now().isoformat()
+            'dedupe_key': dedupe_key,
+            'timestamp_ns': time.time_ns()
         }
-        await self.queue.put(notification_data)
-        logger.info(f"Job updated notification queued for job {job_data.get('id')}")
+        if self._put(notification_data):
+            logger.info(f"Job updated notification queued for job {job_data.get('id')}")
     
     async def enqueue_task_created(self, task_data: Dict[str, Any]):
         """Enqueue task created notification."""
         notification_data = {
             'type': 'task_created',
             'task_data': task_data,
-            'timestamp': datetime.now().isoformat()
+            'timestamp_ns': time.time_ns()
         }
         
-        await self.queue.put(notification_data)
-        logger.info(f"Task created notification queued for task {task_data.get('id')}")
+        if self._put(notification_data):
+            logger.info(f"Task created notification queued for task {task_data.get('id')}")
     
     async def enqueue_task_updated(self, task_data: Dict[str, Any], updated_by: str, changes: str):
         """Enqueue task updated notification."""
+        # Only an identical repeat is coalesced; an update by someone else, or with other
+        # changes, still carries information and is queued on its own
+        dedupe_key = ('task_updated', task_data.get('id'), updated_by, changes)
+        if not self.claim(dedupe_key):
+            logger.info(f"Identical task updated notification for task {task_data.get('id')} already pending, skipping duplicate")
+            return
+        
         notification_data = {
             'type': 'task_updated',
             'task_data': task_data,
             'updated_by': updated_by,
             'changes': changes,
-            'timestamp': datetime.now().isoformat()
+            'dedupe_key': dedupe_key,
+            'timestamp_ns': time.time_ns()
+        }
+        if self._put(notification_data):
+            logger.info(f"Task updated notification queued for task {task_data.get('id')}")
+    
+    async def enqueue_invoice_converted(self, invoice_data: Dict[str, Any], job_data: Dict[str, Any]):
+        """Enqueue job created from invoice payment notification."""
+        dedupe_key = ('invoice_converted', invoice_data.get('invoice_number'))
+        if not self.claim(dedupe_key):
+            logger.info(f"Invoice converted notification for invoice #{invoice_data.get('invoice_number')} already pending, skipping duplicate")
+            return
+        
+        notification_data = {
+            'type': 'invoice_converted',
+            'invoice_data': invoice_data,
+            'job_data': job_data,
+            'dedupe_key': dedupe_key,
+            'timestamp_ns': time.time_ns()
         }
-        await self.queue.put(notification_data)
-        logger.info(f"Task updated notification queued for task {task_data.get('id')}")
+        if self._put(notification_data):
+            logger.info(f"Invoice converted notification queued for job {job_data.get('id')}")
 
 
 # Global notification queue instance
@@ -1,6 +1,7 @@
 import logging
 from typing import Dict, Any, List, Optional
 from datetime import datetime
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from app.models import Job, Task, User, Team, Notification, NotificationType
 from app.services.notification_queue import notification_queue
@@ -181,9 +182,9 @@ class NotificationService:
         
         # Add team members
         if job.team_id:
-            team_members = db.query(User).filter(User.team_id == job.team_id).all()
-            for member in team_members:
-                user_ids.add(member.id)
+            user_ids.update(
+                member_id for member_id, in db.execute(select(User.id).where(User.team_id == job.team_id)).all()
+            )
         
         # Get all users
         users = db.query(User).filter(User.id.in_(user_ids), User.is_active == True).all()
@@ -1,14 +1,29 @@
 """
 Error handling utilities and recovery strategies.
 """
+import inspect
+import json
 import logging
+import random
+import threading
+import time
 import traceback
-from typing import Any, Dict, Optional, Callable, Union
+import uuid
+from typing import TYPE_CHECKING, Any, Dict, Optional, Callable, Tuple, Union
 from functools import wraps
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError, OperationalError
-from redis.exceptions import RedisError, ConnectionError as RedisConnectionError
-from fastapi import HTTPException, Request
-from fastapi.responses import JSONResponse
+from fastapi import HTTPException
+
+try:
+    from redis.exceptions import RedisError, ConnectionError as RedisConnectionError
+except ImportError:
+    # Without redis installed there is nothing to catch; an empty tuple matches no exception
+    RedisError = RedisConnectionError = ()
+
+if TYPE_CHECKING:
+    # Only needed for annotations; the exception handlers import them on first use
+    from fastapi import Request
+    from fastapi.responses import JSONResponse, Response
 
 from app.exceptions import (
     DatabaseError, ValidationError, BusinessLogicError,
@@ -17,6 +32,78 @@ from app.exceptions import (
 
 logger = logging.getLogger(__name__)
 
+# Breaker timeouts are intervals, so measure them on a clock that wall-clock changes can't move
+_now = time.monotonic
+
+# Default backoff bounds in seconds for retried transient failures
+RETRY_BASE_DELAY = 1.0
+RETRY_CAP = 30.0
+
+
+def _is_connection_error(e: OperationalError) -> bool:
+    """
+    Classify an OperationalError as a lost or failed database connection.
+    
+    SQLAlchemy flags pool-level disconnects with connection_invalidated; otherwise
+    the driver error tells us: PostgreSQL class 08 codes are connection exceptions,
+    and a driver OperationalError without any SQLSTATE never reached the server.
+    """
+    if e.connection_invalidated:
+        return True
+    orig = getattr(e, "orig", None)
+    if orig is None:
+        return False
+    pgcode = getattr(orig, "pgcode", None)
+    return pgcode is None or pgcode.startswith("08")
+
+
+class AdaptiveBackoff:
+    """
+    Per-operation retry backoff that adapts to how each operation recovers.
+    
+    The backoff ceiling is kept per (operation, prior retries) and starts at the
+    plain exponential value. It shrinks when a retry after that wait succeeds and
+    grows when it fails again, always staying within [base, cap]; the actual
+    sleep is drawn uniformly below the ceiling (full jitter).
+    """
+    
+    def __init__(self, alpha_commit: float = 0.1, alpha_abort: float = 0.5, max_attempt_bucket: int = 2):
+        self.alpha_commit = min(max(alpha_commit, 0.0), 0.5)
+        self.alpha_abort = min(max(alpha_abort, 0.0), 0.5)
+        self.max_attempt_bucket = max_attempt_bucket
+        self._backoff: Dict[Tuple[str, int], float] = {}
+        self._lock = threading.Lock()
+    
+    def _key(self, operation_name: str, attempt: int) -> Tuple[str, int]:
+        # Attempts past the last bucket share its entry (0, 1, 2+)
+        return operation_name, min(attempt, self.max_attempt_bucket)
+    
+    def delay(self, operation_name: str, attempt: int, base: float, cap: float) -> float:
+        """Sleep time before retrying operation_name after `attempt` earlier retries."""
+        key = self._key(operation_name, attempt)
+        ceiling = self._backoff.get(key)
+        if ceiling is None:
+            ceiling = self._backoff.setdefault(key, min(cap, base * 2 ** key[1]))
+        return random.uniform(0, min(cap, max(base, ceiling)))
+    
+    def record_success(self, operation_name: str, attempt: int, base: float, cap: float):
+        """The retry made after `attempt` earlier retries went through; back off less next time."""
+        self._adjust(operation_name, attempt, 1 / (1 + self.alpha_commit), base, cap)
+    
+    def record_failure(self, operation_name: str, attempt: int, base: float, cap: float):
+        """The retry made after `attempt` earlier retries failed again; back off more next time."""
+        self._adjust(operation_name, attempt, 1 + self.alpha_abort, base, cap)
+    
+    def _adjust(self, operation_name: str, attempt: int, factor: float, base: float, cap: float):
+        key = self._key(operation_name, attempt)
+        with self._lock:
+            ceiling = self._backoff.get(key, min(cap, base * 2 ** key[1]))
+            self._backoff[key] = min(cap, max(base, ceiling * factor))
+
+
+# Shared across requests so what one retry learns applies to the next
+adaptive_backoff = AdaptiveBackoff()
+
 
 class ErrorHandler:
     """Centralized error handling and recovery strategies."""
@@ -43,7 +130,8 @@ class ErrorHandler:
         error_context = {
             "operation": operation,
             "table": table,
-            "original_error": str(e)
+            # repr keeps the class and driver message without the SQL and bound parameters
+            "original_error": repr(e)
         }
         
         # Log the error with full context
@@ -64,7 +152,7 @@ class ErrorHandler:
         
         elif isinstance(e, OperationalError):
             # Connection issues, timeouts, etc.
-            if "connection" in str(e).lower():
+            if _is_connection_error(e):
                 # Connection issue - might be temporary
                 if fallback_data is not None:
                     logger.warning(f"Using fallback data for {operation} due to connection issue")
@@ -116,7 +204,7 @@ class ErrorHandler:
         error_context = {
             "operation": operation,
             "cache_key": cache_key,
-            "original_error": str(e)
+            "original_error": repr(e)
         }
         
         logger.warning(
@@ -131,11 +219,12 @@ class ErrorHandler:
                 logger.info(f"Using fallback function for {operation}")
                 return fallback_function()
             except Exception as fallback_error:
-                logger.error(
-                    f"Fallback function also failed for {operation}",
-                    extra={"fallback_error": str(fallback_error)},
-                    exc_info=True
-                )
+                if logger.isEnabledFor(logging.ERROR):
+                    logger.error(
+                        f"Fallback function also failed for {operation}",
+                        extra={"fallback_error": repr(fallback_error)},
+                        exc_info=True
+                    )
                 # Fall through to raise cache error
         
         # Determine if this is a connection issue or other cache error
@@ -186,65 +275,151 @@ class ErrorHandler:
         operation: Callable,
         operation_name: str,
         fallback_data: Optional[Any] = None,
-        reraise: bool = True
+        reraise: bool = True,
+        max_retries: int = 3,
+        base_delay: float = RETRY_BASE_DELAY,
+        cap: float = RETRY_CAP,
+        breaker: Optional["CircuitBreaker"] = None
     ) -> Any:
         """
         Safely execute an operation with error handling.
         
+        Transient failures (database OperationalError, Redis connection errors)
+        are retried with adaptive exponential backoff and full jitter before falling back
+        to the usual error handling; integrity and other errors are not retried.
+        
         Args:
             operation: Function to execute
             operation_name: Name of the operation for logging
             fallback_data: Data to return if operation fails
             reraise: Whether to reraise exceptions or return fallback data
+            max_retries: Total attempts for transient failures
+            base_delay: Backoff ceiling in seconds for the first retry
+            cap: Upper bound in seconds for any single backoff
+            breaker: Circuit breaker guarding the same dependency; retries stop
+                without sleeping once it is open
             
         Returns:
             Result of operation or fallback data
         """
-        try:
-            return operation()
-        except SQLAlchemyError as e:
-            return ErrorHandler.handle_database_error(
-                e, operation_name, fallback_data=fallback_data
-            )
-        except RedisError as e:
-            return ErrorHandler.handle_cache_error(
-                e, operation_name, fallback_function=lambda: fallback_data
-            )
-        except Exception as e:
-            logger.error(
-                f"Unexpected error in {operation_name}",
-                extra={"operation": operation_name, "error": str(e)},
-                exc_info=True
-            )
+        attempt = 0
+        while True:
+            try:
+                result = operation()
+            except SQLAlchemyError as e:
+                if isinstance(e, OperationalError) and ErrorHandler._retry_transient(
+                    operation_name, attempt, max_retries, base_delay, cap, breaker
+                ):
+                    attempt += 1
+                    continue
+                return ErrorHandler.handle_database_error(
+                    e, operation_name, fallback_data=fallback_data
+                )
+            except RedisError as e:
+                if isinstance(e, RedisConnectionError) and ErrorHandler._retry_transient(
+                    operation_name, attempt, max_retries, base_delay, cap, breaker
+                ):
+                    attempt += 1
+                    continue
+                return ErrorHandler.handle_cache_error(
+                    e, operation_name, fallback_function=lambda: fallback_data
+                )
+            except Exception as e:
+                if logger.isEnabledFor(logging.ERROR):
+                    logger.error(
+                        f"Unexpected error in {operation_name}",
+                        extra={"operation": operation_name, "error": repr(e)},
+                        exc_info=True
+                    )
+                
+                if reraise:
+                    raise
+                else:
+                    return fallback_data
             
-            if reraise:
-                raise
-            else:
-                return fallback_data
+            if attempt:
+                adaptive_backoff.record_success(operation_name, attempt - 1, base_delay, cap)
+            return result
+    
+    @staticmethod
+    def _retry_transient(
+        operation_name: str,
+        attempt: int,
+        max_retries: int,
+        base_delay: float = RETRY_BASE_DELAY,
+        cap: float = RETRY_CAP,
+        breaker: Optional["CircuitBreaker"] = None
+    ) -> bool:
+        """
+        Back off before retrying a transient failure.
+        
+        Returns False when no attempts are left; the caller then handles the error.
+        """
+        if attempt:
+            # The previous retry failed as well
+            adaptive_backoff.record_failure(operation_name, attempt - 1, base_delay, cap)
+        
+        if attempt + 1 >= max_retries:
+            return False
+        
+        # No point waiting for a retry the breaker is going to reject
+        if breaker is not None and breaker.is_open():
+            raise ExternalServiceError(
+                detail=f"Service temporarily unavailable during {operation_name} (circuit breaker open)",
+                service_name=operation_name,
+                operation=operation_name,
+                context={"circuit_breaker_state": breaker.state, "attempt": attempt + 1}
+            )
+        
+        delay = adaptive_backoff.delay(operation_name, attempt, base_delay, cap)
+        logger.warning(
+            f"Transient error in {operation_name}, retrying in {delay:.2f}s "
+            f"(attempt {attempt + 1})"
+        )
+        time.sleep(delay)
+        return True
 
 
 def database_error_handler(
     operation: str,
     table: Optional[str] = None,
-    fallback_data: Optional[Any] = None
+    fallback_data: Optional[Any] = None,
+    max_retries: int = 1
 ):
     """
     Decorator for handling database errors in functions.
     
+    With max_retries > 1, OperationalError is retried using the adaptive backoff
+    keyed on `operation`; only use that for functions that open their own session.
+    
     Usage:
         @database_error_handler("fetch_users", table="users", fallback_data=[])
         def get_users():
             return db.query(User).all()
     """
     def decorator(func: Callable) -> Callable:
+        # Decorator arguments are bound as keyword-only defaults so the wrapper reads
+        # them as fast locals instead of going through closure cells
         @wraps(func)
-        def wrapper(*args, **kwargs):
-            try:
-                return func(*args, **kwargs)
-            except SQLAlchemyError as e:
-                return ErrorHandler.handle_database_error(
-                    e, operation, table, fallback_data
-                )
+        def wrapper(*args, _func=func, _op=operation, _table=table, _fallback=fallback_data,
+                    _max_retries=max_retries, **kwargs):
+            attempt = 0
+            while True:
+                try:
+                    result = _func(*args, **kwargs)
+                except SQLAlchemyError as e:
+                    if isinstance(e, OperationalError) and ErrorHandler._retry_transient(
+                        _op, attempt, _max_retries
+                    ):
+                        attempt += 1
+                        continue
+                    return ErrorHandler.handle_database_error(
+                        e, _op, _table, _fallback
+                    )
+                
+                if attempt:
+                    adaptive_backoff.record_success(_op, attempt - 1, RETRY_BASE_DELAY, RETRY_CAP)
+                return result
         return wrapper
     return decorator
 
@@ -262,65 +437,76 @@ def cache_error_handler(
             return cache.get("key")
     """
     def decorator(func: Callable) -> Callable:
+        # Bound as keyword-only defaults, as in database_error_handler
         @wraps(func)
-        def wrapper(*args, **kwargs):
+        def wrapper(*args, _func=func, _op=operation, _fb=fallback_function, **kwargs):
             try:
-                return func(*args, **kwargs)
+                return _func(*args, **kwargs)
             except RedisError as e:
                 return ErrorHandler.handle_cache_error(
-                    e, operation, fallback_function=fallback_function
+                    e, _op, fallback_function=_fb
                 )
         return wrapper
     return decorator
 
 
-async def global_exception_handler(request: Request, exc: Exception) -> JSONResponse:
+# Body of every unhandled-exception response; only the id, path and method change
+_INTERNAL_ERROR_TEMPLATE = (
+    '{"error_code":"INTERNAL_SERVER_ERROR",'
+    '"message":"An unexpected error occurred. Please try again later.",'
+    '"error_id":"%s","context":{"path":%s,"method":%s}}'
+)
+
+
+async def global_exception_handler(request: "Request", exc: Exception) -> "Response":
     """
     Global exception handler for unhandled exceptions.
     
     This should be registered with FastAPI:
         app.add_exception_handler(Exception, global_exception_handler)
     """
+    from fastapi.responses import Response
+    
     # Generate a unique error ID for tracking
-    import uuid
     error_id = str(uuid.uuid4())
     
-    # Log the error with full context
-    logger.error(
-        f"Unhandled exception [ID: {error_id}]",
-        extra={
-            "error_id": error_id,
-            "path": str(request.url),
-            "method": request.method,
-            "client": request.client.host if request.client else "unknown",
-            "error_type": type(exc).__name__,
-            "error_message": str(exc)
-        },
-        exc_info=True
-    )
+    # Log the error with full context; skip building it when ERROR is filtered out
+    if logger.isEnabledFor(logging.ERROR):
+        logger.error(
+            f"Unhandled exception [ID: {error_id}]",
+            extra={
+                "error_id": error_id,
+                "path": str(request.url),
+                "method": request.method,
+                "client": request.client.host if request.client else "unknown",
+                "error_type": type(exc).__name__,
+                "error_message": repr(exc)
+            },
+            exc_info=True
+        )
     
-    # Return a structured error response
-    return JSONResponse(
+    # Return a structured error response; only the request-supplied strings need escaping
+    body = _INTERNAL_ERROR_TEMPLATE % (
+        error_id,
+        json.dumps(request.url.path),
+        json.dumps(request.method)
+    )
+    return Response(
+        content=body.encode(),
         status_code=500,
-        content={
-            "error_code": "INTERNAL_SERVER_ERROR",
-            "message": "An unexpected error occurred. Please try again later.",
-            "error_id": error_id,
-            "context": {
-                "path": str(request.url.path),
-                "method": request.method
-            }
-        }
+        media_type="application/json"
     )
 
 
-async def http_exception_handler(request: Request, exc: HTTPException) -> JSONResponse:
+async def http_exception_handler(request: "Request", exc: HTTPException) -> "JSONResponse":
     """
     Enhanced HTTP exception handler that ensures consistent error format.
     
     This should be registered with FastAPI:
         app.add_exception_handler(HTTPException, http_exception_handler)
     """
+    from fastapi.responses import JSONResponse
+    
     # If the detail is already structured (from our custom exceptions), use it
     if isinstance(exc.detail, dict):
         content = exc.detail
@@ -347,6 +533,10 @@ class CircuitBreaker:
     """
     Circuit breaker pattern implementation for external service calls.
     
+    Works for both plain and async def callables; coroutine functions get an
+    async wrapper so success and failure are recorded when the awaited work
+    finishes, not when the coroutine object is created.
+    
     Usage:
         breaker = CircuitBreaker(failure_threshold=5, timeout=60)
         
@@ -354,6 +544,11 @@ class CircuitBreaker:
         def call_external_service():
             # Make external service call
             pass
+        
+        @breaker
+        async def call_external_service_async():
+            # Await external service call
+            pass
     """
     
     def __init__(self, failure_threshold: int = 5, timeout: int = 60):
@@ -362,19 +557,28 @@ class CircuitBreaker:
         self.failure_count = 0
         self.last_failure_time = None
         self.state = "CLOSED"  # CLOSED, OPEN, HALF_OPEN
+        # Guards the failure read-modify-write; successes are plain stores and skip it
+        self._lock = threading.Lock()
     
     def __call__(self, func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                self._before_call(func)
+                
+                try:
+                    result = await func(*args, **kwargs)
+                    self._on_success()
+                    return result
+                except Exception as e:
+                    self._on_failure()
+                    raise
+            
+            return async_wrapper
+        
         @wraps(func)
         def wrapper(*args, **kwargs):
-            if self.state == "OPEN":
-                if self._should_attempt_reset():
-                    self.state = "HALF_OPEN"
-                else:
-                    raise ExternalServiceError(
-                        detail="Service temporarily unavailable (circuit breaker open)",
-                        service_name=func.__name__,
-                        context={"circuit_breaker_state": self.state}
-                    )
+            self._before_call(func)
             
             try:
                 result = func(*args, **kwargs)
@@ -386,13 +590,28 @@ class CircuitBreaker:
         
         return wrapper
     
+    def _before_call(self, func: Callable):
+        """Fail fast while open; let a trial call through once the timeout has passed."""
+        if self.state == "OPEN":
+            if self._should_attempt_reset():
+                self.state = "HALF_OPEN"
+            else:
+                raise ExternalServiceError(
+                    detail="Service temporarily unavailable (circuit breaker open)",
+                    service_name=func.__name__,
+                    context={"circuit_breaker_state": self.state}
+                )
+    
+    def is_open(self) -> bool:
+        """True while calls would be rejected without reaching the protected function."""
+        return self.state == "OPEN" and not self._should_attempt_reset()
+    
     def _should_attempt_reset(self) -> bool:
         """Check if enough time has passed to attempt a reset."""
         if self.last_failure_time is None:
             return True
         
-        import time
-        return time.time() - self.last_failure_time >= self.timeout
+        return _now() - self.last_failure_time >= self.timeout
     
     def _on_success(self):
         """Reset circuit breaker on successful call."""
@@ -401,12 +620,15 @@ class CircuitBreaker:
     
     def _on_failure(self):
         """Handle failure and potentially open circuit breaker."""
-        import time
-        self.failure_count += 1
-        self.last_failure_time = time.time()
+        with self._lock:
+            self.failure_count += 1
+            failure_count = self.failure_count
+            self.last_failure_time = _now()
+            
+            if failure_count >= self.failure_threshold:
+                self.state = "OPEN"
         
-        if self.failure_count >= self.failure_threshold:
-            self.state = "OPEN"
+        if failure_count >= self.failure_threshold:
             logger.warning(
-                f"Circuit breaker opened after {self.failure_count} failures"
-            )
\ No newline at end of file
+                f"Circuit breaker opened after {failure_count} failures"
+            )
@@ -1,7 +1,9 @@
 """
 Pagination utilities for consistent pagination across all APIs
 """
+from functools import lru_cache
 from typing import Dict, Any, List
+from sqlalchemy import func
 from sqlalchemy.orm import Query
 
 
@@ -21,25 +23,37 @@ def create_pagination_metadata(
     Returns:
         Dictionary with pagination metadata
     """
+    # Metadata is a pure function of three ints; hand out a copy of the cached dict
+    return dict(_pagination_metadata(page, limit, total_count))
+
+
+@lru_cache(maxsize=1024)
+def _pagination_metadata(page: int, limit: int, total_count: int) -> Dict[str, Any]:
     total_pages = (total_count + limit - 1) // limit if total_count > 0 else 1
+    has_next = page < total_pages
+    has_previous = page > 1
     
     return {
         "page": page,
         "limit": limit,
         "total_count": total_count,
         "total_pages": total_pages,
-        "has_next": page < total_pages,
-        "has_previous": page > 1,
-        "next_page": page + 1 if page < total_pages else None,
-        "previous_page": page - 1 if page > 1 else None,
+        "has_next": has_next,
+        "has_previous": has_previous,
+        "next_page": page + 1 if has_next else None,
+        "previous_page": page - 1 if has_previous else None,
         "start_index": (page - 1) * limit + 1 if total_count > 0 else 0,
         "end_index": min(page * limit, total_count)
     }
 
 
-def apply_pagination(query: Query, page: int, limit: int) -> tuple[Query, int]:
+def apply_pagination(query: Query, page: int, limit: int) -> tuple[List[Any], int]:
     """
-    Apply pagination to a SQLAlchemy query
+    Apply pagination to a SQLAlchemy query and fetch the requested page
+    
+    The total is computed with a COUNT(*) OVER () window column on the page
+    query itself, so listing endpoints need a single round trip instead of a
+    separate COUNT query that re-runs the whole filter plan.
     
     Args:
         query: SQLAlchemy query object
@@ -47,18 +61,30 @@ def apply_pagination(query: Query, page: int, limit: int) -> tuple[Query, int]:
         limit: Items per page
         
     Returns:
-        Tuple of (paginated_query, total_count)
+        Tuple of (items, total_count)
     """
-    # Get total count before pagination
-    total_count = query.count()
-    
     # Calculate offset
     offset = (page - 1) * limit
     
-    # Apply pagination
-    paginated_query = query.offset(offset).limit(limit)
+    # Fetch the page with the unpaginated total attached to every row
+    rows = (
+        query.add_columns(func.count().over().label('total_count'))
+        .offset(offset)
+        .limit(limit)
+        .all()
+    )
+    
+    if not rows:
+        # Past the last page the window has no rows to report on
+        return [], query.order_by(None).count() if page > 1 else 0
+    
+    total_count = rows[0][-1]
+    if len(rows[0]) == 2:
+        items = [row[0] for row in rows]
+    else:
+        items = [tuple(row[:-1]) for row in rows]
     
-    return paginated_query, total_count
+    return items, total_count
 
 
 def validate_pagination_params(page: int, limit: int) -> tuple[int, int]:
@@ -73,10 +99,10 @@ def validate_pagination_params(page: int, limit: int) -> tuple[int, int]:
         Tuple of (validated_page, validated_limit)
     """
     # Ensure page is at least 1
-    page = max(1, page)
+    page = 1 if page < 1 else page
     
     # Ensure limit is between 1 and 100
-    limit = max(1, min(100, limit))
+    limit = 1 if limit < 1 else (100 if limit > 100 else limit)
     
     return page, limit
 
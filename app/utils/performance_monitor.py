@@ -1,3 +1,4 @@
+import math
 import time
 import logging
 from functools import wraps
@@ -9,6 +10,10 @@ from app.config import settings
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Pass as threshold_seconds to never flag a call as slow; with debug off the
+# decorators then have nothing to log and return the function unwrapped
+DISABLE_SENTINEL = math.inf
+
 class PerformanceMonitor:
     """Performance monitoring utilities."""
     
@@ -19,20 +24,26 @@ class PerformanceMonitor:
         
         Args:
             threshold_seconds: Log queries that take longer than this threshold
+                (DISABLE_SENTINEL skips wrapping entirely when debug is off)
         """
         def decorator(func: Callable) -> Callable:
+            # Resolved once per decorated function rather than on every call
+            log_timings = settings.debug and logger.isEnabledFor(logging.INFO)
+            if not log_timings and threshold_seconds >= DISABLE_SENTINEL:
+                return func
+            
             @wraps(func)
             def wrapper(*args, **kwargs):
-                start_time = time.time()
+                start_time = time.perf_counter()
                 result = func(*args, **kwargs)
-                execution_time = time.time() - start_time
+                execution_time = time.perf_counter() - start_time
                 
                 if execution_time > threshold_seconds:
                     logger.warning(
                         f"Slow query detected: {func.__name__} took {execution_time:.2f}s "
                         f"(threshold: {threshold_seconds}s)"
                     )
-                elif settings.debug:
+                elif log_timings:
                     logger.info(f"Query {func.__name__} executed in {execution_time:.2f}s")
                 
                 return result
@@ -46,20 +57,26 @@ class PerformanceMonitor:
         
         Args:
             threshold_seconds: Log endpoints that take longer than this threshold
+                (DISABLE_SENTINEL skips wrapping entirely when debug is off)
         """
         def decorator(func: Callable) -> Callable:
+            # Resolved once per decorated function rather than on every call
+            log_timings = settings.debug and logger.isEnabledFor(logging.INFO)
+            if not log_timings and threshold_seconds >= DISABLE_SENTINEL:
+                return func
+            
             @wraps(func)
             async def wrapper(*args, **kwargs):
-                start_time = time.time()
+                start_time = time.perf_counter()
                 result = await func(*args, **kwargs)
-                execution_time = time.time() - start_time
+                execution_time = time.perf_counter() - start_time
                 
                 if execution_time > threshold_seconds:
                     logger.warning(
                         f"Slow API endpoint: {func.__name__} took {execution_time:.2f}s "
                         f"(threshold: {threshold_seconds}s)"
                     )
-                elif settings.debug:
+                elif log_timings:
                     logger.info(f"API {func.__name__} responded in {execution_time:.2f}s")
                 
                 return result
@@ -76,11 +93,11 @@ class PerformanceMonitor:
             operation_name: Name of the operation being measured
             threshold_seconds: Log if operation takes longer than this threshold
         """
-        start_time = time.time()
+        start_time = time.perf_counter()
         try:
             yield
         finally:
-            execution_time = time.time() - start_time
+            execution_time = time.perf_counter() - start_time
             if execution_time > threshold_seconds:
                 logger.warning(
                     f"Slow operation: {operation_name} took {execution_time:.2f}s "
@@ -2,11 +2,25 @@
 Query optimization utilities to ensure proper index usage and avoid N+1 queries.
 """
 
-from sqlalchemy.orm import joinedload, selectinload
-from sqlalchemy import and_, or_
-from typing import List, Optional, Type, Any
+from sqlalchemy.orm import selectinload
+from sqlalchemy import and_, or_, tuple_
+from datetime import datetime
+from typing import List, Optional, Type, Any, Tuple
 from app.models import Task, Job, User, Team
 
+# Loader options are immutable, so each eager-loading configuration is built once
+_TASK_OPTS_NO_JOB = (selectinload(Task.assigned_to), selectinload(Task.assigner))
+_TASK_OPTS_WITH_JOB = _TASK_OPTS_NO_JOB + (selectinload(Task.job),)
+_JOB_OPTS_NO_TASKS = (selectinload(Job.supervisor), selectinload(Job.assigner), selectinload(Job.team))
+_JOB_OPTS_WITH_TASKS = _JOB_OPTS_NO_TASKS + (selectinload(Job.tasks),)  # Use selectinload for one-to-many
+
+# Default pagination ordering per model; other models are added on first use
+_ORDER_BY = {
+    Task: Task.created_at.desc(),
+    Job: Job.created_at.desc(),
+    User: User.created_at.desc(),
+    Team: Team.created_at.desc(),
+}
 
 class QueryOptimizer:
     """Utility class for optimizing database queries."""
@@ -16,6 +30,9 @@ class QueryOptimizer:
         """
         Add eager loading for task relationships to avoid N+1 queries.
         
+        Uses selectinload so each related row is fetched once with an
+        IN (...) query instead of being repeated across a LEFT OUTER JOIN.
+        
         Args:
             query: SQLAlchemy query object
             include_job: Whether to include job relationship
@@ -23,21 +40,16 @@ class QueryOptimizer:
         Returns:
             Optimized query with eager loading
         """
-        options = [
-            joinedload(Task.assigned_to),
-            joinedload(Task.assigner)
-        ]
-        
-        if include_job:
-            options.append(joinedload(Task.job))
-            
-        return query.options(*options)
+        return query.options(*(_TASK_OPTS_WITH_JOB if include_job else _TASK_OPTS_NO_JOB))
     
     @staticmethod
     def get_jobs_with_relations(query, include_tasks: bool = False):
         """
         Add eager loading for job relationships to avoid N+1 queries.
         
+        Uses selectinload so each related row is fetched once with an
+        IN (...) query instead of being repeated across a LEFT OUTER JOIN.
+        
         Args:
             query: SQLAlchemy query object
             include_tasks: Whether to include tasks relationship
@@ -45,16 +57,7 @@ class QueryOptimizer:
         Returns:
             Optimized query with eager loading
         """
-        options = [
-            joinedload(Job.supervisor),
-            joinedload(Job.assigner),
-            joinedload(Job.team)
-        ]
-        
-        if include_tasks:
-            options.append(selectinload(Job.tasks))  # Use selectinload for one-to-many
-            
-        return query.options(*options)
+        return query.options(*(_JOB_OPTS_WITH_TASKS if include_tasks else _JOB_OPTS_NO_TASKS))
     
     @staticmethod
     def apply_task_filters(query, assigned_to_id: Optional[int] = None, 
@@ -76,27 +79,34 @@ class QueryOptimizer:
         Returns:
             Query with filters applied in optimal order
         """
+        # Collect conditions and apply them in one filter() so the query is cloned once
+        conds = []
+        
         # Apply indexed filters first (in order of selectivity)
         if assigned_to_id:
-            query = query.filter(Task.assigned_to_id == assigned_to_id)
+            conds.append(Task.assigned_to_id == assigned_to_id)
             
         if assigner_id:
-            query = query.filter(Task.assigner_id == assigner_id)
+            conds.append(Task.assigner_id == assigner_id)
             
         if status:
-            query = query.filter(Task.status == status)
+            conds.append(Task.status == status)
             
         if priority:
-            query = query.filter(Task.priority == priority)
+            conds.append(Task.priority == priority)
         
-        # Apply search filters last (can't use indexes effectively)
+        # Apply search filters last; the pg_trgm GIN index serves ILIKE '%term%'
         if search:
-            query = query.filter(
+            pattern = f"%{search}%"
+            conds.append(
                 or_(
-                    Task.title.ilike(f"%{search}%"),
-                    Task.description.ilike(f"%{search}%")
+                    Task.title.ilike(pattern),
+                    Task.description.ilike(pattern)
                 )
             )
+        
+        if conds:
+            query = query.filter(and_(*conds))
             
         return query
     
@@ -120,27 +130,34 @@ class QueryOptimizer:
         Returns:
             Query with filters applied in optimal order
         """
+        # Collect conditions and apply them in one filter() so the query is cloned once
+        conds = []
+        
         # Apply indexed filters first (in order of selectivity)
         if team_id:
-            query = query.filter(Job.team_id == team_id)
+            conds.append(Job.team_id == team_id)
             
         if supervisor_id:
-            query = query.filter(Job.supervisor_id == supervisor_id)
+            conds.append(Job.supervisor_id == supervisor_id)
             
         if assigner_id:
-            query = query.filter(Job.assigner_id == assigner_id)
+            conds.append(Job.assigner_id == assigner_id)
             
         if status:
-            query = query.filter(Job.status == status)
+            conds.append(Job.status == status)
         
-        # Apply search filters last (can't use indexes effectively)
+        # Apply search filters last; the pg_trgm GIN index serves ILIKE '%term%'
         if search:
-            query = query.filter(
+            pattern = f"%{search}%"
+            conds.append(
                 or_(
-                    Job.title.ilike(f"%{search}%"),
-                    Job.client.ilike(f"%{search}%")
+                    Job.title.ilike(pattern),
+                    Job.client.ilike(pattern)
                 )
             )
+        
+        if conds:
+            query = query.filter(and_(*conds))
             
         return query
     
@@ -161,17 +178,46 @@ class QueryOptimizer:
         offset = (page - 1) * limit
         
         if order_by is None:
-            # Default ordering by created_at desc for consistent pagination
-            if hasattr(query.column_descriptions[0]['entity'], 'created_at'):
-                order_by = query.column_descriptions[0]['entity'].created_at.desc()
-            else:
-                order_by = query.column_descriptions[0]['entity'].id.desc()
+            # Default ordering by created_at desc (id desc without it) for consistent pagination
+            entity = query.column_descriptions[0]['entity']
+            order_by = _ORDER_BY.get(entity)
+            if order_by is None:
+                column = entity.created_at if hasattr(entity, 'created_at') else entity.id
+                order_by = _ORDER_BY[entity] = column.desc()
         
         return query.order_by(order_by).offset(offset).limit(limit)
     
+    @staticmethod
+    def paginate_query_keyset(query, cursor: Optional[Tuple[datetime, int]], limit: int, entity):
+        """
+        Apply keyset (cursor) pagination ordered by created_at desc, id desc.
+        
+        Unlike OFFSET paging the cost does not grow with page depth, since the
+        database seeks straight to the cursor position on the created_at index.
+        
+        Args:
+            query: SQLAlchemy query object
+            cursor: (created_at, id) of the last item already seen; empty or None for the first page
+            limit: Items per page
+            entity: Model class being paginated
+            
+        Returns:
+            Tuple of (items, next_cursor); next_cursor is None on the last page
+        """
+        if cursor:
+            query = query.filter(tuple_(entity.created_at, entity.id) < tuple(cursor))
+        
+        items = query.order_by(entity.created_at.desc(), entity.id.desc()).limit(limit + 1).all()
+        
+        if len(items) > limit:
+            items = items[:limit]
+            return items, (items[-1].created_at, items[-1].id)
+        return items, None
+    
     @staticmethod
     def get_user_tasks_optimized(db_session, user_id: int, page: int = 1, 
-                                limit: int = 20, status_filter: Optional[Any] = None):
+                                limit: int = 20, status_filter: Optional[Any] = None,
+                                cursor: Optional[Tuple[datetime, int]] = None):
         """
         Get tasks assigned to a user with optimized query.
         
@@ -181,9 +227,12 @@ class QueryOptimizer:
             page: Page number
             limit: Items per page
             status_filter: Optional status filter
+            cursor: Keyset cursor from a previous call; pass () for the first
+                keyset page. When given, page is ignored.
             
         Returns:
-            List of tasks with eager loaded relationships
+            List of tasks with eager loaded relationships, or a tuple of
+            (tasks, next_cursor) when cursor is given
         """
         query = db_session.query(Task)
         query = QueryOptimizer.get_tasks_with_relations(query)
@@ -192,6 +241,10 @@ class QueryOptimizer:
             assigned_to_id=user_id, 
             status=status_filter
         )
+        
+        if cursor is not None:
+            return QueryOptimizer.paginate_query_keyset(query, cursor, limit, Task)
+        
         query = QueryOptimizer.paginate_query(query, page, limit)
         
         return query.all()
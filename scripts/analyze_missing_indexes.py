@@ -73,44 +73,50 @@ def check_existing_indexes():
     
     engine = create_engine(settings.database_url)
     
+    # Existing indexes for every table in one bound query
+    query = text("""
+    SELECT 
+        tablename,
+        indexname,
+        indexdef
+    FROM pg_indexes
+    WHERE schemaname = 'public' 
+    AND tablename = ANY(:tables)
+    ORDER BY tablename, indexname;
+    """)
+    
+    try:
+        with engine.connect() as conn:
+            result = conn.execute(query, {"tables": list(MISSING_INDEXES)}).fetchall()
+    except Exception as e:
+        print(f"   ⚠️  Error checking existing indexes: {e}")
+        return
+    
+    existing_by_table = {}
+    for row in result:
+        existing_by_table.setdefault(row.tablename, {})[row.indexname] = row.indexdef
+    
     for table, needed_indexes in MISSING_INDEXES.items():
         print(f"\n📋 {table.upper()}")
         print("-" * 100)
         
-        # Get existing indexes for this table
-        query = f"""
-        SELECT 
-            indexname,
-            indexdef
-        FROM pg_indexes
-        WHERE schemaname = 'public' 
-        AND tablename = '{table}'
-        ORDER BY indexname;
-        """
+        existing = existing_by_table.get(table, {})
         
-        try:
-            with engine.connect() as conn:
-                result = conn.execute(text(query)).fetchall()
-                existing = {row.indexname: row.indexdef for row in result}
-                
-                for columns in needed_indexes:
-                    columns_str = ", ".join(columns)
-                    
-                    # Check if similar index exists
-                    found = False
-                    for idx_name, idx_def in existing.items():
-                        # Simple check - see if all columns are in the index definition
-                        if all(col.split()[0] in idx_def.lower() for col in columns):
-                            print(f"   ✅ {columns_str}")
-                            print(f"      Exists as: {idx_name}")
-                            found = True
-                            break
-                    
-                    if not found:
-                        print(f"   ❌ MISSING: {columns_str}")
-                        
-        except Exception as e:
-            print(f"   ⚠️  Error checking {table}: {e}")
+        for columns in needed_indexes:
+            columns_str = ", ".join(columns)
+            
+            # Check if similar index exists
+            found = False
+            for idx_name, idx_def in existing.items():
+                # Simple check - see if all columns are in the index definition
+                if all(col.split()[0] in idx_def.lower() for col in columns):
+                    print(f"   ✅ {columns_str}")
+                    print(f"      Exists as: {idx_name}")
+                    found = True
+                    break
+            
+            if not found:
+                print(f"   ❌ MISSING: {columns_str}")
 
 def generate_create_statements():
     """Generate CREATE INDEX statements for missing indexes."""
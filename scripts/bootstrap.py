@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Bootstrap a fresh database in one go: fix sequences, create the admin user
+and seed the default expense categories.
+
+All three steps share one session (and so one pooled connection) and are
+committed together; init_admin.py, fix_sequences.py and
+init_expense_categories.py still run each step on its own.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import inspect
+from app.database import SessionLocal, engine, fix_sequences
+from app.models import Base
+from init_admin import create_admin_user
+from init_expense_categories import create_default_categories
+
+def bootstrap():
+    """Run every init step on a single session and commit once."""
+    # Create tables if they don't exist
+    if not inspect(engine).has_table("users"):
+        Base.metadata.create_all(bind=engine)
+    
+    db = SessionLocal()
+    try:
+        # Sequences first so the inserts below don't collide with existing ids
+        fix_sequences(db)
+        create_admin_user(db)
+        create_default_categories(db)
+        db.commit()
+        print("\n✅ Bootstrap completed")
+        return True
+    
+    except Exception as e:
+        print(f"❌ Bootstrap failed, nothing was committed: {str(e)}")
+        db.rollback()
+        return False
+    
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    print("🚀 Bootstrapping database...")
+    sys.exit(0 if bootstrap() else 1)
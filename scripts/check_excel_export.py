@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Check that the fast Excel writer reads back the same as the openpyxl path.
+
+Writes one set of mixed-type rows through both writers of ExportService, loads each
+result with openpyxl and compares every cell's value, type and number format.
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from openpyxl import Workbook, load_workbook
+from app.services.export_service import ExportService, _new_export_buffer
+
+HEADERS = ["ID", "Title", "Amount", "Rate", "Paid", "Created At", "Due Date", "Start Time", "Duration", "Notes"]
+
+def sample_rows(count=500):
+    """Rows covering every cell type the exporters pass through."""
+    rows = []
+    for i in range(count):
+        rows.append([
+            i,
+            f"Job <{i}> & \"quoted\"",
+            Decimal(f"{i}.50"),
+            [1.25, float('nan'), float('inf'), -float('inf')][i % 4],
+            i % 2 == 0,
+            datetime(2024, 1, 1, 12, 30) + timedelta(hours=i),
+            date(2024, 1, 1) + timedelta(days=i),
+            time(i % 24, 15),
+            timedelta(hours=i % 50, minutes=5),
+            None if i % 3 else "",
+        ])
+    return rows
+
+def read_back(output):
+    """(value, data_type, number_format) for every cell of every sheet, plus the header styles."""
+    output.seek(0)
+    wb = load_workbook(output)
+    cells = []
+    for ws in wb.worksheets:
+        for row in ws.iter_rows():
+            cells.append([(cell.value, cell.data_type, cell.number_format) for cell in row])
+        header_styles = [(cell.font.b, cell.fill.fgColor.rgb[-6:]) for cell in ws[1]]
+        cells.append(header_styles)
+    return [ws.title for ws in wb.worksheets], cells
+
+def main():
+    """Main function."""
+    
+    print("🔍 Comparing fast and openpyxl Excel writers")
+    print("=" * 60)
+    
+    service = ExportService()
+    rows = sample_rows()
+    chunks = [rows[:300], rows[300:]]
+    
+    fast_output = _new_export_buffer()
+    service._write_xlsx_fast(fast_output, "Check", HEADERS, chunks)
+    
+    openpyxl_output = _new_export_buffer()
+    wb = Workbook(write_only=True)
+    for i, chunk in enumerate(chunks, 1):
+        service._write_excel_sheet(wb.create_sheet("Check" if i == 1 else f"Check {i}"), HEADERS, chunk)
+    wb.save(openpyxl_output)
+    
+    fast_sheets, fast_cells = read_back(fast_output)
+    openpyxl_sheets, openpyxl_cells = read_back(openpyxl_output)
+    
+    mismatches = []
+    if fast_sheets != openpyxl_sheets:
+        mismatches.append(f"sheets: fast={fast_sheets} openpyxl={openpyxl_sheets}")
+    for r, (fast_row, openpyxl_row) in enumerate(zip(fast_cells, openpyxl_cells), 1):
+        if fast_row != openpyxl_row:
+            mismatches.append(f"row {r}: fast={fast_row} openpyxl={openpyxl_row}")
+    if len(fast_cells) != len(openpyxl_cells):
+        mismatches.append(f"row count: fast={len(fast_cells)} openpyxl={len(openpyxl_cells)}")
+    
+    if mismatches:
+        for mismatch in mismatches[:10]:
+            print(f"❌ {mismatch}")
+        print(f"\n❌ {len(mismatches)} mismatch(es)")
+        return False
+    
+    print(f"✅ {len(rows)} rows across {len(chunks)} sheets read back identically")
+    return True
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
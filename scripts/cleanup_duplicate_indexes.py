@@ -10,6 +10,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from sqlalchemy import create_engine, text
 from app.config import settings
 import logging
+from datetime import datetime
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -83,48 +84,80 @@ DUPLICATE_INDEXES_TO_DROP = [
     "ix_users_team_id_active_async",
 ]
 
-def drop_duplicate_indexes():
-    """Drop duplicate indexes to improve performance."""
+# Listed indexes scanned at least this often since the stats reset are kept unless --force is given
+INDEX_SCAN_THRESHOLD = 100
+
+# Tables covered by the remaining-index summary
+ANALYZED_TABLES = ['jobs', 'invoices', 'tasks', 'users', 'attendance', 'notifications', 'reminders']
+
+def drop_duplicate_indexes(force=False):
+    """Drop duplicate indexes to improve performance (indexes still in use are kept unless force)."""
     
     print("🧹 Cleaning Up Duplicate Indexes")
     print("=" * 60)
     print(f"Total indexes to drop: {len(DUPLICATE_INDEXES_TO_DROP)}")
     print()
     
-    engine = create_engine(settings.database_url)
+    # Use autocommit for CONCURRENT index drops
+    engine = create_engine(settings.database_url, isolation_level="AUTOCOMMIT")
     
     success_count = 0
     not_found_count = 0
+    in_use_count = 0
     error_count = 0
     
     with engine.connect() as conn:
+        # One catalog lookup tells us which names are actually there to drop and how much they're used
+        scans = {
+            row.indexname: row.idx_scan for row in conn.execute(
+                text("""
+                SELECT c.relname AS indexname, COALESCE(s.idx_scan, 0) AS idx_scan
+                FROM pg_class c
+                JOIN pg_namespace n ON n.oid = c.relnamespace
+                LEFT JOIN pg_stat_user_indexes s ON s.indexrelid = c.oid
+                WHERE n.nspname = 'public' AND c.relkind IN ('i', 'I') AND c.relname = ANY(:names)
+                """),
+                {"names": DUPLICATE_INDEXES_TO_DROP}
+            )
+        }
+        
+        # The list is a static snapshot; an index queries still rely on is not a duplicate to drop
+        in_use = {} if force else {
+            name: idx_scan for name, idx_scan in scans.items()
+            if idx_scan >= INDEX_SCAN_THRESHOLD
+        }
+        for name, idx_scan in in_use.items():
+            logger.warning(f"Keeping {name}: {idx_scan} scans recorded (use --force to drop anyway)")
+        in_use_count = len(in_use)
+        existing = scans.keys() - in_use.keys()
+        
         for i, index_name in enumerate(DUPLICATE_INDEXES_TO_DROP, 1):
+            print(f"[{i}/{len(DUPLICATE_INDEXES_TO_DROP)}] Dropping {index_name}...", end=" ")
+            if index_name in in_use:
+                print("⏸️  (in use, kept)")
+                continue
+            if index_name not in existing:
+                # Only names that exist are sent to the server; on a re-run this is usually none
+                print("⚠️  (not found)")
+                not_found_count += 1
+                continue
+            
             try:
-                print(f"[{i}/{len(DUPLICATE_INDEXES_TO_DROP)}] Dropping {index_name}...", end=" ")
-                
-                # Drop index if exists
-                drop_sql = f"DROP INDEX IF EXISTS {index_name}"
-                conn.execute(text(drop_sql))
-                conn.commit()
-                
+                # CONCURRENTLY avoids the ACCESS EXCLUSIVE lock that would block reads and
+                # writes on the table; it takes one index per statement, outside a transaction
+                conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name}"))
                 print("✅")
                 success_count += 1
-                
             except Exception as e:
-                error_msg = str(e).lower()
-                if "does not exist" in error_msg:
-                    print("⚠️  (not found)")
-                    not_found_count += 1
-                else:
-                    print(f"❌ Error: {e}")
-                    error_count += 1
-                    logger.error(f"Failed to drop {index_name}: {e}")
-                    conn.rollback()
+                print(f"❌ Error: {e}")
+                error_count += 1
+                logger.error(f"Failed to drop {index_name}: {e}")
     
     print("\n" + "=" * 60)
     print("📊 Cleanup Summary:")
     print(f"   Successfully dropped: {success_count}")
     print(f"   Not found: {not_found_count}")
+    print(f"   Kept (in use): {in_use_count}")
     print(f"   Errors: {error_count}")
     print()
     
@@ -141,33 +174,43 @@ def drop_duplicate_indexes():
         print("⚠️  No indexes were dropped")
         return False
 
-def analyze_remaining_indexes():
-    """Show remaining indexes after cleanup."""
+def analyze_remaining_indexes(verbose=False):
+    """Show remaining indexes after cleanup (per-table counts, or every index with verbose)."""
     
     print("\n🔍 Analyzing Remaining Indexes...")
     print("=" * 60)
     
     engine = create_engine(settings.database_url)
     
-    query = """
-    SELECT 
-        schemaname,
-        tablename,
-        indexname,
-        indexdef
-    FROM pg_indexes 
-    WHERE schemaname = 'public'
-    AND (
-        tablename IN ('jobs', 'invoices', 'tasks', 'users', 'attendance', 'notifications', 'reminders')
-    )
-    ORDER BY tablename, indexname;
-    """
+    if verbose:
+        query = """
+        SELECT 
+            tablename,
+            indexname
+        FROM pg_indexes 
+        WHERE schemaname = 'public'
+        AND tablename = ANY(:tables)
+        ORDER BY tablename, indexname;
+        """
+    else:
+        query = """
+        SELECT 
+            tablename,
+            count(*) AS index_count
+        FROM pg_indexes 
+        WHERE schemaname = 'public'
+        AND tablename = ANY(:tables)
+        GROUP BY tablename
+        ORDER BY tablename;
+        """
     
     try:
         with engine.connect() as conn:
-            result = conn.execute(text(query)).fetchall()
+            result = conn.execute(text(query), {"tables": ANALYZED_TABLES}).fetchall()
             
-            if result:
+            if not result:
+                print("No indexes found")
+            elif verbose:
                 current_table = None
                 for row in result:
                     if row.tablename != current_table:
@@ -176,15 +219,25 @@ def analyze_remaining_indexes():
                         print("-" * 60)
                     print(f"   {row.indexname}")
             else:
-                print("No indexes found")
+                for row in result:
+                    print(f"📋 {row.tablename.upper():<15} {row.index_count} indexes")
+                print("\n(run with --verbose to list every index)")
                 
     except Exception as e:
         print(f"⚠️  Could not analyze indexes: {e}")
 
 def vacuum_analyze():
-    """Run VACUUM ANALYZE to reclaim space and update statistics."""
+    """
+    Refresh planner statistics after the drops.
+    
+    DROP INDEX leaves no dead tuples behind, so a sampled ANALYZE is all the
+    planner needs; set RUN_VACUUM=true to VACUUM as well (e.g. after deletes).
+    """
+    
+    run_vacuum = os.getenv('RUN_VACUUM') == 'true'
+    command = "VACUUM ANALYZE" if run_vacuum else "ANALYZE"
     
-    print("\n🔧 Running VACUUM ANALYZE...")
+    print(f"\n🔧 Running {command}...")
     print("=" * 60)
     
     # Use autocommit for VACUUM
@@ -198,16 +251,16 @@ def vacuum_analyze():
         for table in tables:
             try:
                 print(f"Analyzing {table}...", end=" ")
-                conn.execute(text(f"VACUUM ANALYZE {table}"))
+                conn.execute(text(f"{command} {table}"))
                 print("✅")
             except Exception as e:
                 print(f"❌ {e}")
         
         conn.close()
-        print("\n✅ VACUUM ANALYZE completed")
+        print(f"\n✅ {command} completed")
         
     except Exception as e:
-        print(f"❌ VACUUM ANALYZE failed: {e}")
+        print(f"❌ {command} failed: {e}")
 
 def main():
     """Main function."""
@@ -215,7 +268,7 @@ def main():
     print("🚀 Database Index Cleanup Tool")
     print("=" * 60)
     print(f"Database: {settings.database_url.split('@')[1] if '@' in settings.database_url else 'Unknown'}")
-    print(f"Timestamp: {__import__('datetime').datetime.now()}")
+    print(f"Timestamp: {datetime.now()}")
     print()
     
     # Confirm before proceeding
@@ -230,13 +283,13 @@ def main():
             return False
     
     # Drop duplicate indexes
-    success = drop_duplicate_indexes()
+    success = drop_duplicate_indexes(force='--force' in sys.argv)
     
     if success:
         # Show remaining indexes
-        analyze_remaining_indexes()
+        analyze_remaining_indexes(verbose='--verbose' in sys.argv)
         
-        # Run VACUUM ANALYZE
+        # Refresh statistics (VACUUM only with RUN_VACUUM=true)
         vacuum_analyze()
         
         print("\n📝 Next Steps:")
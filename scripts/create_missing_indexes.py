@@ -7,8 +7,11 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from sqlalchemy import create_engine, text
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from app.config import settings
 import logging
+import re
+from datetime import datetime
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -19,7 +22,6 @@ MISSING_INDEXES = [
     "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_jobs_team_id_status_created_at ON jobs(team_id, status, created_at DESC)",
     "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_jobs_supervisor_id_status_created_at ON jobs(supervisor_id, status, created_at DESC)",
     "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_jobs_status_created_at ON jobs(status, created_at DESC)",
-    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_jobs_team_id_status ON jobs(team_id, status)",
     "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_jobs_team_id_updated_at ON jobs(team_id, updated_at DESC)",
     "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_jobs_status_progress ON jobs(status, progress)",
     
@@ -45,6 +47,96 @@ MISSING_INDEXES = [
     "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_attendance_date_status ON attendance(date, status)",
 ]
 
+# Optional per-connection maintenance_work_mem for the builds, e.g. "256MB"; every
+# table builds on its own connection, so this is used once per table in parallel
+INDEX_MAINTENANCE_WORK_MEM = os.getenv('INDEX_MAINTENANCE_WORK_MEM')
+
+# Bound how long one build may wait for locks or run, so a single blocker can't stall the script
+INDEX_LOCK_TIMEOUT = '30s'
+INDEX_STATEMENT_TIMEOUT = '15min'
+# SQLSTATEs for lock_timeout (lock_not_available) and statement_timeout (query_canceled)
+TIMEOUT_SQLSTATES = ('55P03', '57014')
+
+_CIC_RE = re.compile(r"CREATE INDEX\s+CONCURRENTLY\s+IF NOT EXISTS\s+(\S+)\s+ON\s+(\w+)", re.I)
+
+# (index name, table, statement) for each entry, parsed once at load
+INDEX_PLAN = [
+    (m.group(1), m.group(2), sql)
+    for sql in MISSING_INDEXES
+    for m in [_CIC_RE.search(sql)]
+]
+
+def index_columns_of(index_sql):
+    """Column list of a CREATE INDEX statement, with the default ASC made implicit."""
+    columns = index_sql.split("(", 1)[1].rsplit(")", 1)[0]
+    return tuple(
+        " ".join(column.split()).removesuffix(" ASC")
+        for column in columns.split(",")
+    )
+
+def find_redundant_prefix_indexes(plan):
+    """
+    Pairs of (redundant, covering) index names on the same table where the first
+    index's columns are a leading prefix of the second's.
+    
+    Only plain btree indexes are compared; unique, partial and non-btree indexes
+    are not interchangeable with a longer composite.
+    """
+    plain = [
+        (table, index_name, index_columns_of(sql))
+        for index_name, table, sql in plan
+        if " USING " not in sql and " WHERE " not in sql and "UNIQUE" not in sql
+    ]
+    return [
+        (short_name, long_name)
+        for table, short_name, short_cols in plain
+        for other_table, long_name, long_cols in plain
+        if table == other_table
+        and len(short_cols) < len(long_cols)
+        and long_cols[:len(short_cols)] == short_cols
+    ]
+
+# A btree on (a, b, c) already serves lookups on (a, b); keep such duplicates out of the list
+assert not find_redundant_prefix_indexes(INDEX_PLAN), \
+    f"Redundant prefix indexes in MISSING_INDEXES: {find_redundant_prefix_indexes(INDEX_PLAN)}"
+
+def create_table_indexes(engine, statements):
+    """
+    Build one table's indexes in order on a dedicated connection.
+    
+    Builds on the same table would only queue behind each other's locks, so
+    they stay serial; different tables run in parallel in separate workers.
+    """
+    results = []
+    with engine.connect() as conn:
+        if INDEX_MAINTENANCE_WORK_MEM:
+            if not re.fullmatch(r"\d+\s*(kB|MB|GB)", INDEX_MAINTENANCE_WORK_MEM):
+                raise ValueError(f"Invalid INDEX_MAINTENANCE_WORK_MEM: {INDEX_MAINTENANCE_WORK_MEM}")
+            conn.execute(text(f"SET maintenance_work_mem = '{INDEX_MAINTENANCE_WORK_MEM}'"))
+        conn.execute(text(f"SET lock_timeout = '{INDEX_LOCK_TIMEOUT}'"))
+        conn.execute(text(f"SET statement_timeout = '{INDEX_STATEMENT_TIMEOUT}'"))
+        
+        for index_name, index_sql in statements:
+            try:
+                # Execute index creation
+                conn.execute(text(index_sql))
+                results.append((index_name, "created", None))
+            except Exception as e:
+                error_msg = str(e).lower()
+                if "already exists" in error_msg or "duplicate" in error_msg:
+                    results.append((index_name, "exists", None))
+                elif getattr(getattr(e, 'orig', None), 'pgcode', None) in TIMEOUT_SQLSTATES:
+                    # An interrupted concurrent build leaves an INVALID index behind that
+                    # IF NOT EXISTS would skip on retry, so clear it out first
+                    try:
+                        conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name}"))
+                    except Exception as drop_error:
+                        logger.error(f"Failed to drop invalid index {index_name}: {drop_error}")
+                    results.append((index_name, "timeout", e))
+                else:
+                    results.append((index_name, "error", e))
+    return results
+
 def create_indexes():
     """Create missing indexes."""
     
@@ -60,32 +152,64 @@ def create_indexes():
     exists_count = 0
     error_count = 0
     
-    conn = engine.connect()
+    # Group statements by table, keeping the listed order within each table
+    groups = {}
+    for index_name, table, index_sql in INDEX_PLAN:
+        groups.setdefault(table, []).append((index_name, index_sql))
     
-    for i, index_sql in enumerate(MISSING_INDEXES, 1):
-        try:
-            # Extract index name
-            index_name = index_sql.split("IF NOT EXISTS ")[1].split(" ON ")[0]
-            
-            print(f"[{i}/{len(MISSING_INDEXES)}] Creating {index_name}...", end=" ")
-            
-            # Execute index creation
-            conn.execute(text(index_sql))
-            
-            print("✅")
-            success_count += 1
-            
-        except Exception as e:
-            error_msg = str(e).lower()
-            if "already exists" in error_msg or "duplicate" in error_msg:
-                print("⚠️  (already exists)")
+    done = 0
+    retry = []
+    
+    def report(results, retrying=False):
+        nonlocal done, success_count, exists_count, error_count
+        for index_name, outcome, error in results:
+            if not retrying:
+                done += 1
+            prefix = "[retry]" if retrying else f"[{done}/{len(MISSING_INDEXES)}]"
+            if outcome == "created":
+                print(f"{prefix} Created {index_name} ✅")
+                success_count += 1
+            elif outcome == "exists":
+                print(f"{prefix} {index_name} ⚠️  (already exists)")
                 exists_count += 1
+            elif outcome == "timeout" and not retrying:
+                print(f"{prefix} {index_name} ⏳ (timed out, will retry)")
+                retry.append((index_name, statements_by_name[index_name]))
             else:
-                print(f"❌ Error: {e}")
+                print(f"{prefix} {index_name} ❌ Error: {error}")
                 error_count += 1
-                logger.error(f"Failed to create index: {e}")
+                logger.error(f"Failed to create index: {error}")
+    
+    statements_by_name = {index_name: index_sql for index_name, _, index_sql in INDEX_PLAN}
+    
+    with ThreadPoolExecutor(max_workers=len(groups)) as executor:
+        futures = {
+            executor.submit(create_table_indexes, engine, statements): table
+            for table, statements in groups.items()
+        }
+        for future in as_completed(futures):
+            table = futures[future]
+            try:
+                results = future.result()
+            except Exception as e:
+                # The whole table's group failed (e.g. could not connect)
+                for index_name, _ in groups[table]:
+                    done += 1
+                    print(f"[{done}/{len(MISSING_INDEXES)}] {index_name} ❌ Error: {e}")
+                    error_count += 1
+                logger.error(f"Failed to create indexes on {table}: {e}")
+                continue
+            
+            report(results)
     
-    conn.close()
+    # Builds that timed out get one more serial attempt once everything else is done
+    if retry:
+        print(f"\n🔁 Retrying {len(retry)} timed out index build(s)...")
+        try:
+            report(create_table_indexes(engine, retry), retrying=True)
+        except Exception as e:
+            error_count += len(retry)
+            logger.error(f"Retry of timed out index builds failed: {e}")
     
     print("\n" + "=" * 80)
     print("📊 Summary:")
@@ -114,7 +238,7 @@ def main():
     print("🚀 Create Missing Indexes")
     print("=" * 80)
     print(f"Database: {settings.database_url.split('@')[1] if '@' in settings.database_url else 'Unknown'}")
-    print(f"Timestamp: {__import__('datetime').datetime.now()}")
+    print(f"Timestamp: {datetime.now()}")
     print()
     
     print("⚠️  This will create indexes using CONCURRENTLY (no table locks)")
@@ -7,14 +7,27 @@ Generates cryptographically secure secret keys for JWT tokens.
 import secrets
 import string
 import base64
+import fileinput
 import os
 from datetime import datetime
 
 
+# Character pool for random string keys
+_ALPHABET = (string.ascii_letters + string.digits + "!@#$%^&*()_+-=[]{}|;:,.<>?").encode()
+# Bytes at or above the largest multiple of the pool size are rejected to avoid modulo bias
+_ACCEPT_BELOW = 256 // len(_ALPHABET) * len(_ALPHABET)
+
+
 def generate_random_string(length=64):
     """Generate a random string with letters, digits, and special characters."""
-    characters = string.ascii_letters + string.digits + "!@#$%^&*()_+-=[]{}|;:,.<>?"
-    return ''.join(secrets.choice(characters) for _ in range(length))
+    out = bytearray()
+    while len(out) < length:
+        for b in secrets.token_bytes(length * 2):
+            if b < _ACCEPT_BELOW:
+                out.append(_ALPHABET[b % len(_ALPHABET)])
+                if len(out) == length:
+                    break
+    return out.decode()
 
 
 def generate_base64_key(length=32):
@@ -81,24 +94,19 @@ def main():
     if save_to_env in ['y', 'yes']:
         env_file = ".env"
         if os.path.exists(env_file):
-            # Read existing .env file
-            with open(env_file, 'r') as f:
-                lines = f.readlines()
-            
-            # Update or add SECRET_KEY
+            # Rewrite the existing .env line by line, replacing the first SECRET_KEY
+            # (the original is kept as .env.bak)
             updated = False
-            for i, line in enumerate(lines):
-                if line.startswith('SECRET_KEY='):
-                    lines[i] = f'SECRET_KEY={strong_key}\n'
+            for line in fileinput.input(env_file, inplace=True, backup='.bak'):
+                if not updated and line.startswith('SECRET_KEY='):
+                    print(f'SECRET_KEY={strong_key}')
                     updated = True
-                    break
+                else:
+                    print(line, end='')
             
             if not updated:
-                lines.append(f'SECRET_KEY={strong_key}\n')
-            
-            # Write back to file
-            with open(env_file, 'w') as f:
-                f.writelines(lines)
+                with open(env_file, 'a') as f:
+                    f.write(f'SECRET_KEY={strong_key}\n')
             
             print(f"✅ Secret key saved to {env_file}")
         else:
@@ -8,22 +8,33 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from sqlalchemy import inspect
 from sqlalchemy.orm import Session
 from app.database import SessionLocal, engine
-from app.models import Base, User, UserRole
+from app.models import Base, User
 from app.auth import get_password_hash
 from app.config import settings
 
-def create_admin_user():
-    """Create the initial admin user."""
-    # Create tables if they don't exist
-    Base.metadata.create_all(bind=engine)
+def create_admin_user(db: Session = None):
+    """
+    Create the initial admin user.
     
-    db = SessionLocal()
+    When a session is passed in (see bootstrap.py) the user is only flushed;
+    committing, rolling back and closing are left to the caller.
+    """
+    # Create tables if they don't exist; on a migrated database one catalog
+    # check replaces create_all's per-table lookups
+    if not inspect(engine).has_table("users"):
+        Base.metadata.create_all(bind=engine)
+    
+    owns_session = db is None
+    if owns_session:
+        db = SessionLocal()
     try:
-        # Check if admin already exists
-        existing_admin = db.query(User).filter(User.role == UserRole.ADMIN).first()
-        if existing_admin:
+        # Check if admin already exists; every user is an admin since roles were
+        # removed, so EXISTS over users answers it without loading a row
+        admin_exists = db.query(db.query(User.id).exists()).scalar()
+        if admin_exists:
             print("Admin user already exists!")
             return
         
@@ -32,14 +43,16 @@ def create_admin_user():
             name="System Administrator",
             email="admin@henam.com",
             password_hash=get_password_hash("admin123"),  # Change this password!
-            role=UserRole.ADMIN,
             team_id=None,
             is_active=True
         )
         
         db.add(admin_user)
-        db.commit()
-        db.refresh(admin_user)
+        if owns_session:
+            db.commit()
+            db.refresh(admin_user)
+        else:
+            db.flush()
         
         print(f"Admin user created successfully!")
         print(f"Email: admin@henam.com")
@@ -48,10 +61,13 @@ def create_admin_user():
         print("\nIMPORTANT: Please change the admin password after first login!")
         
     except Exception as e:
+        if not owns_session:
+            raise
         print(f"Error creating admin user: {str(e)}")
         db.rollback()
     finally:
-        db.close()
+        if owns_session:
+            db.close()
 
 if __name__ == "__main__":
     create_admin_user()
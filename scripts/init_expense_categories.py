@@ -7,90 +7,77 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 from app.database import engine, SessionLocal
 from app.models import ExpenseCategory, User
 
-def create_default_categories():
-    """Create default expense categories."""
-    db = SessionLocal()
+# Default categories as (name, description)
+_DEFAULT_CATEGORIES: tuple[tuple[str, str], ...] = (
+    ("Office Supplies", "Stationery, paper, pens, and other office materials"),
+    ("Equipment", "Tools, machinery, and equipment purchases"),
+    ("Transportation", "Fuel, vehicle maintenance, and travel expenses"),
+    ("Utilities", "Electricity, water, internet, and phone bills"),
+    ("Maintenance", "Building and equipment maintenance costs"),
+    ("Marketing", "Advertising, promotional materials, and marketing campaigns"),
+    ("Professional Services", "Legal, accounting, consulting, and other professional fees"),
+    ("Insurance", "Business insurance premiums and coverage"),
+    ("Training", "Employee training and development expenses"),
+    ("Miscellaneous", "Other business expenses not covered by specific categories"),
+)
+
+def create_default_categories(db: Session = None):
+    """
+    Create default expense categories.
+    
+    When a session is passed in (see bootstrap.py) nothing is committed here;
+    committing, rolling back and closing are left to the caller.
+    """
+    owns_session = db is None
+    if owns_session:
+        db = SessionLocal()
     
     try:
-        # Get the first admin user to assign as creator
-        admin_user = db.query(User).filter(User.email.like('%admin%')).first()
-        if not admin_user:
-            # Get any user as fallback
-            admin_user = db.query(User).first()
+        # Creator is the seeded admin (init_admin.py), found through the unique email index; only the id is needed
+        admin_user_id = db.query(User.id).filter(User.email == "admin@henam.com").scalar()
+        if admin_user_id is None:
+            # Fall back to the oldest user (primary key order)
+            admin_user_id = db.query(User.id).order_by(User.id).limit(1).scalar()
         
-        if not admin_user:
+        if admin_user_id is None:
             print("❌ No users found. Please create a user first.")
             return
         
-        # Default categories
-        default_categories = [
-            {
-                "name": "Office Supplies",
-                "description": "Stationery, paper, pens, and other office materials"
-            },
-            {
-                "name": "Equipment",
-                "description": "Tools, machinery, and equipment purchases"
-            },
-            {
-                "name": "Transportation",
-                "description": "Fuel, vehicle maintenance, and travel expenses"
-            },
-            {
-                "name": "Utilities",
-                "description": "Electricity, water, internet, and phone bills"
-            },
-            {
-                "name": "Maintenance",
-                "description": "Building and equipment maintenance costs"
-            },
-            {
-                "name": "Marketing",
-                "description": "Advertising, promotional materials, and marketing campaigns"
-            },
-            {
-                "name": "Professional Services",
-                "description": "Legal, accounting, consulting, and other professional fees"
-            },
-            {
-                "name": "Insurance",
-                "description": "Business insurance premiums and coverage"
-            },
-            {
-                "name": "Training",
-                "description": "Employee training and development expenses"
-            },
-            {
-                "name": "Miscellaneous",
-                "description": "Other business expenses not covered by specific categories"
-            }
+        # Names are compared case-insensitively; one query covers every category
+        existing = set(db.scalars(select(func.lower(ExpenseCategory.name))))
+        
+        rows = [
+            {"name": name, "description": description, "created_by_id": admin_user_id}
+            for name, description in _DEFAULT_CATEGORIES
+            if name.lower() not in existing
         ]
         
-        created_count = 0
+        created = set()
+        if rows:
+            # One multi-row INSERT; ON CONFLICT covers a category added since the lookup
+            stmt = (
+                pg_insert(ExpenseCategory)
+                .values(rows)
+                .on_conflict_do_nothing(index_elements=["name"])
+                .returning(ExpenseCategory.name)
+            )
+            created = set(db.scalars(stmt))
         
-        for category_data in default_categories:
-            # Check if category already exists
-            existing = db.query(ExpenseCategory).filter(
-                ExpenseCategory.name.ilike(category_data["name"])
-            ).first()
-            
-            if not existing:
-                category = ExpenseCategory(
-                    name=category_data["name"],
-                    description=category_data["description"],
-                    created_by_id=admin_user.id
-                )
-                db.add(category)
-                created_count += 1
-                print(f"✅ Created category: {category_data['name']}")
+        for name, _ in _DEFAULT_CATEGORIES:
+            if name in created:
+                print(f"✅ Created category: {name}")
             else:
-                print(f"⏭️  Category already exists: {category_data['name']}")
+                print(f"⏭️  Category already exists: {name}")
+        created_count = len(created)
         
-        db.commit()
+        if owns_session:
+            db.commit()
         print(f"\n🎉 Successfully created {created_count} expense categories!")
         
         # Display all categories
@@ -101,11 +88,14 @@ def create_default_categories():
             print(f"  • {cat.name} - {status}")
     
     except Exception as e:
+        if not owns_session:
+            raise
         print(f"❌ Error creating categories: {str(e)}")
         db.rollback()
     
     finally:
-        db.close()
+        if owns_session:
+            db.close()
 
 
 if __name__ == "__main__":
@@ -7,283 +7,365 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine
 from app.config import settings
+import argparse
+import io
+from bisect import bisect_right
 import logging
 import json
+from contextlib import redirect_stdout
+from functools import wraps
+from collections import namedtuple
+from datetime import datetime
+from types import SimpleNamespace
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def list_all_indexes():
-    """List all indexes with detailed information."""
+engine = create_engine(settings.database_url, pool_pre_ping=True)
+
+# Every report below is built from this one catalog read. It starts from pg_index and
+# joins on OIDs rather than going through the pg_indexes view and matching names.
+INDEX_INVENTORY_QUERY = """
+WITH public_indexes AS MATERIALIZED (
+    -- pg_relation_size stats the index files; evaluate it once per index and
+    -- derive the pretty-printed size from the stored value
+    SELECT 
+        i.*,
+        n.nspname as schemaname,
+        t.relname as tablename,
+        c.relname as indexname,
+        pg_relation_size(i.indexrelid) as index_size_bytes
+    FROM pg_index i
+    JOIN pg_class c ON c.oid = i.indexrelid
+    JOIN pg_class t ON t.oid = i.indrelid
+    JOIN pg_namespace n ON n.oid = t.relnamespace
+    WHERE n.nspname = 'public'
+)
+SELECT 
+    x.schemaname,
+    x.tablename,
+    x.indexname,
+    pg_get_indexdef(x.indexrelid) as indexdef,
+    pg_size_pretty(x.index_size_bytes) as index_size,
+    x.index_size_bytes,
+    s.idx_scan as times_used,
+    s.idx_tup_read as tuples_read,
+    s.idx_tup_fetch as tuples_fetched,
+    x.indkey::text as index_columns,
+    x.indnkeyatts as key_column_count,
+    x.indclass::text as index_opclasses,
+    x.indisunique as is_unique,
+    pg_get_expr(x.indexprs, x.indrelid) as index_expressions,
+    pg_get_expr(x.indpred, x.indrelid) as index_predicate
+FROM public_indexes x
+LEFT JOIN pg_stat_user_indexes s ON s.indexrelid = x.indexrelid
+ORDER BY x.tablename, s.idx_scan DESC NULLS LAST, x.indexname;
+"""
+
+def duplicate_key(row):
+    """
+    What makes two indexes on a table interchangeable: the same columns (and the same
+    split between key and INCLUDE columns), operator classes (and so access method),
+    uniqueness, expressions and predicate.
     
-    print("📋 Complete Index Inventory")
-    print("=" * 120)
+    Unlike the index definition text this doesn't include the index name, and
+    expressions and predicates are deparsed so spelling differences don't matter.
+    """
+    return (
+        row.tablename,
+        row.index_columns,
+        row.key_column_count,
+        row.index_opclasses,
+        row.is_unique,
+        row.index_expressions,
+        row.index_predicate,
+    )
+
+# The same columns from the nightly snapshot (see the add_index_inventory_view migration)
+INDEX_SNAPSHOT_QUERY = """
+SELECT *
+FROM mv_index_inventory
+ORDER BY tablename, times_used DESC NULLS LAST, indexname;
+"""
+
+# The snapshot is only refreshed where pg_cron runs the nightly job; anything older than
+# this is treated as stale and the catalog is read instead, so drop advice never rests
+# on usage counts frozen at migration time
+INDEX_SNAPSHOT_MAX_AGE = '24 hours'
+INDEX_SNAPSHOT_AGE_QUERY = f"""
+SELECT
+    max(captured_at) AS captured_at,
+    max(captured_at) > now() - interval '{INDEX_SNAPSHOT_MAX_AGE}' AS fresh
+FROM mv_index_inventory;
+"""
+
+def format_bytes(size):
+    """Human-readable size in the style of pg_size_pretty."""
+    for unit in ("bytes", "kB", "MB", "GB"):
+        if size < 10 * 1024:
+            return f"{size:.0f} {unit}"
+        size /= 1024
+    return f"{size:.0f} TB"
+
+# Scan-count buckets for the usage labels: below 1, below 10, below 100, below 1000, the rest
+USAGE_THRESHOLDS = [1, 10, 100, 1000]
+USAGE_LABELS = ['❌ NEVER USED', '⚠️  RARELY USED', '🟡 LOW USAGE', '🟢 MODERATE USAGE', '🔥 HIGH USAGE']
+
+def usage_status(times_used):
+    """Usage label for an index's scan count (no recorded stats counts as never used)."""
+    return USAGE_LABELS[bisect_right(USAGE_THRESHOLDS, times_used or 0)]
+
+def buffered_output(func):
+    """Collect everything a report prints and write it to stdout in one go."""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        out = io.StringIO()
+        try:
+            with redirect_stdout(out):
+                return func(*args, **kwargs)
+        finally:
+            sys.stdout.write(out.getvalue())
+    return wrapper
+
+def fetch_rows(dbapi_conn, query):
+    """
+    Run a catalog query on a raw DBAPI cursor and return the rows as namedtuples.
     
-    engine = create_engine(settings.database_url)
+    These queries take no parameters and need no type processing, so SQLAlchemy's
+    result machinery is skipped; fields stay accessible by name.
+    """
+    with dbapi_conn.cursor() as cur:
+        cur.execute(query)
+        row_type = namedtuple('IndexRow', [column.name for column in cur.description])
+        return list(map(row_type._make, cur.fetchall()))
+
+def fetch_index_inventory(dbapi_conn, live=False):
+    """
+    All public indexes with size and usage, ordered by table then most used.
     
-    query = """
-    SELECT 
-        t.schemaname,
-        t.tablename,
-        t.indexname,
-        t.indexdef,
-        pg_size_pretty(pg_relation_size(i.indexrelid)) as index_size,
-        s.idx_scan as times_used,
-        s.idx_tup_read as tuples_read,
-        s.idx_tup_fetch as tuples_fetched,
-        CASE 
-            WHEN s.idx_scan = 0 THEN '❌ NEVER USED'
-            WHEN s.idx_scan < 10 THEN '⚠️  RARELY USED'
-            WHEN s.idx_scan < 100 THEN '🟡 LOW USAGE'
-            WHEN s.idx_scan < 1000 THEN '🟢 MODERATE USAGE'
-            ELSE '🔥 HIGH USAGE'
-        END as usage_status
-    FROM pg_indexes t
-    LEFT JOIN pg_stat_user_indexes s ON t.indexname = s.indexrelname AND t.tablename = s.relname
-    LEFT JOIN pg_class i ON t.indexname = i.relname
-    WHERE t.schemaname = 'public'
-    ORDER BY t.tablename, s.idx_scan DESC NULLS LAST, t.indexname;
+    Reads the mv_index_inventory snapshot unless live is set, falling back to
+    the catalog when the view hasn't been created, is empty or is older than
+    INDEX_SNAPSHOT_MAX_AGE.
     """
+    if not live:
+        try:
+            snapshot = fetch_rows(dbapi_conn, INDEX_SNAPSHOT_AGE_QUERY)[0]
+        except Exception as e:
+            logger.warning(f"Index snapshot unavailable, reading the catalog directly: {e}")
+            dbapi_conn.rollback()
+        else:
+            if snapshot.fresh:
+                print(f"Using index snapshot from {snapshot.captured_at} (run with --live for current stats)")
+                return fetch_rows(dbapi_conn, INDEX_SNAPSHOT_QUERY)
+            if snapshot.captured_at is None:
+                logger.warning("Index snapshot is empty, reading the catalog directly")
+            else:
+                logger.warning(
+                    f"Index snapshot from {snapshot.captured_at} is older than {INDEX_SNAPSHOT_MAX_AGE} "
+                    f"(is its refresh scheduled?), reading the catalog directly"
+                )
+    return fetch_rows(dbapi_conn, INDEX_INVENTORY_QUERY)
+
+@buffered_output
+def list_all_indexes(result):
+    """List all indexes with detailed information."""
     
-    try:
-        with engine.connect() as conn:
-            result = conn.execute(text(query)).fetchall()
-            
-            if result:
-                current_table = None
-                table_stats = {}
-                
-                for row in result:
-                    if row.tablename != current_table:
-                        if current_table:
-                            print()
-                        current_table = row.tablename
-                        print(f"\n{'='*120}")
-                        print(f"📊 TABLE: {current_table.upper()}")
-                        print(f"{'='*120}")
-                        print(f"{'Index Name':<45} {'Usage':<18} {'Times Used':<12} {'Size':<10} {'Status':<15}")
-                        print("-" * 120)
-                        
-                        if current_table not in table_stats:
-                            table_stats[current_table] = {
-                                'total': 0,
-                                'used': 0,
-                                'unused': 0,
-                                'rarely_used': 0
-                            }
-                    
-                    # Track statistics
-                    table_stats[current_table]['total'] += 1
-                    if row.times_used == 0 or row.times_used is None:
-                        table_stats[current_table]['unused'] += 1
-                    elif row.times_used < 10:
-                        table_stats[current_table]['rarely_used'] += 1
-                    else:
-                        table_stats[current_table]['used'] += 1
-                    
-                    # Print index info
-                    times_used = row.times_used if row.times_used is not None else 0
-                    print(f"{row.indexname:<45} {row.usage_status:<18} {times_used:<12} {row.index_size:<10}")
-                
-                # Print summary
-                print("\n" + "=" * 120)
-                print("📈 SUMMARY BY TABLE")
-                print("=" * 120)
-                print(f"{'Table':<20} {'Total':<10} {'Used':<10} {'Rarely Used':<15} {'Unused':<10}")
-                print("-" * 120)
-                
-                total_indexes = 0
-                total_used = 0
-                total_unused = 0
-                total_rarely = 0
-                
-                for table, stats in sorted(table_stats.items()):
-                    print(f"{table:<20} {stats['total']:<10} {stats['used']:<10} {stats['rarely_used']:<15} {stats['unused']:<10}")
-                    total_indexes += stats['total']
-                    total_used += stats['used']
-                    total_unused += stats['unused']
-                    total_rarely += stats['rarely_used']
-                
+    print("📋 Complete Index Inventory")
+    print("=" * 120)
+    
+    if result:
+        current_table = None
+        table_stats = {}
+        
+        for row in result:
+            if row.tablename != current_table:
+                if current_table:
+                    print()
+                current_table = row.tablename
+                print(f"\n{'='*120}")
+                print(f"📊 TABLE: {current_table.upper()}")
+                print(f"{'='*120}")
+                print(f"{'Index Name':<45} {'Usage':<18} {'Times Used':<12} {'Size':<10} {'Status':<15}")
                 print("-" * 120)
-                print(f"{'TOTAL':<20} {total_indexes:<10} {total_used:<10} {total_rarely:<15} {total_unused:<10}")
-                
-                print("\n" + "=" * 120)
-                print("💡 RECOMMENDATIONS")
-                print("=" * 120)
-                print(f"✅ Actively used indexes: {total_used}")
-                print(f"⚠️  Rarely used indexes: {total_rarely} (consider reviewing)")
-                print(f"❌ Never used indexes: {total_unused} (safe to drop)")
-                print(f"📊 Total indexes: {total_indexes}")
-                
-                if total_unused > 0:
-                    print(f"\n⚠️  You have {total_unused} unused indexes wasting space and slowing writes!")
                 
+                if current_table not in table_stats:
+                    table_stats[current_table] = {
+                        'total': 0,
+                        'used': 0,
+                        'unused': 0,
+                        'rarely_used': 0
+                    }
+            
+            # Track statistics
+            table_stats[current_table]['total'] += 1
+            if row.times_used == 0 or row.times_used is None:
+                table_stats[current_table]['unused'] += 1
+            elif row.times_used < 10:
+                table_stats[current_table]['rarely_used'] += 1
             else:
-                print("No indexes found")
-                
-    except Exception as e:
-        print(f"❌ Error listing indexes: {e}")
-        logger.error(f"Error: {e}", exc_info=True)
-        return False
-    
-    return True
+                table_stats[current_table]['used'] += 1
+            
+            # Print index info
+            times_used = row.times_used if row.times_used is not None else 0
+            print(f"{row.indexname:<45} {usage_status(row.times_used):<18} {times_used:<12} {row.index_size:<10}")
+        
+        # Print summary
+        print("\n" + "=" * 120)
+        print("📈 SUMMARY BY TABLE")
+        print("=" * 120)
+        print(f"{'Table':<20} {'Total':<10} {'Used':<10} {'Rarely Used':<15} {'Unused':<10}")
+        print("-" * 120)
+        
+        total_indexes = 0
+        total_used = 0
+        total_unused = 0
+        total_rarely = 0
+        
+        for table, stats in sorted(table_stats.items()):
+            print(f"{table:<20} {stats['total']:<10} {stats['used']:<10} {stats['rarely_used']:<15} {stats['unused']:<10}")
+            total_indexes += stats['total']
+            total_used += stats['used']
+            total_unused += stats['unused']
+            total_rarely += stats['rarely_used']
+        
+        print("-" * 120)
+        print(f"{'TOTAL':<20} {total_indexes:<10} {total_used:<10} {total_rarely:<15} {total_unused:<10}")
+        
+        print("\n" + "=" * 120)
+        print("💡 RECOMMENDATIONS")
+        print("=" * 120)
+        print(f"✅ Actively used indexes: {total_used}")
+        print(f"⚠️  Rarely used indexes: {total_rarely} (consider reviewing)")
+        print(f"❌ Never used indexes: {total_unused} (safe to drop)")
+        print(f"📊 Total indexes: {total_indexes}")
+        
+        if total_unused > 0:
+            print(f"\n⚠️  You have {total_unused} unused indexes wasting space and slowing writes!")
+        
+    else:
+        print("No indexes found")
 
-def find_duplicate_indexes():
+@buffered_output
+def find_duplicate_indexes(rows):
     """Find and group duplicate indexes."""
     
     print("\n\n🔍 DUPLICATE INDEX ANALYSIS")
     print("=" * 120)
     
-    engine = create_engine(settings.database_url)
-    
-    query = """
-    SELECT 
-        tablename,
-        indexdef,
-        array_agg(indexname ORDER BY indexname) as duplicate_indexes,
-        count(*) as duplicate_count,
-        array_agg(s.idx_scan ORDER BY indexname) as usage_counts
-    FROM pg_indexes t
-    LEFT JOIN pg_stat_user_indexes s ON t.indexname = s.indexrelname AND t.tablename = s.relname
-    WHERE schemaname = 'public'
-    GROUP BY tablename, indexdef
-    HAVING count(*) > 1
-    ORDER BY count(*) DESC, tablename;
-    """
+    # Group the inventory by what the index actually covers, largest groups first
+    groups = {}
+    for row in sorted(rows, key=lambda row: row.indexname):
+        groups.setdefault(duplicate_key(row), []).append(row)
+    result = sorted(
+        (
+            SimpleNamespace(
+                tablename=group[0].tablename,
+                indexdef=group[0].indexdef,
+                duplicate_indexes=[row.indexname for row in group],
+                duplicate_count=len(group),
+                usage_counts=[row.times_used or 0 for row in group],
+                sizes=[row.index_size_bytes or 0 for row in group],
+            )
+            for group in groups.values()
+            if len(group) > 1
+        ),
+        key=lambda group: (-group.duplicate_count, group.tablename)
+    )
     
     try:
-        with engine.connect() as conn:
-            result = conn.execute(text(query)).fetchall()
+        if result:
+            print(f"Found {len(result)} groups of duplicate indexes:\n")
             
-            if result:
-                print(f"Found {len(result)} groups of duplicate indexes:\n")
-                
-                total_waste = 0
-                recommendations = []
+            total_waste = 0
+            waste_bytes = 0
+            recommendations = []
+            
+            for i, row in enumerate(result, 1):
+                print(f"{i}. Table: {row.tablename}")
+                print(f"   Duplicate count: {row.duplicate_count} identical indexes")
+                print(f"   Index names:")
                 
-                for i, row in enumerate(result, 1):
-                    print(f"{i}. Table: {row.tablename}")
-                    print(f"   Duplicate count: {row.duplicate_count} identical indexes")
-                    print(f"   Index names:")
-                    
-                    # Parse usage counts
-                    usage_counts = row.usage_counts if row.usage_counts else [0] * len(row.duplicate_indexes)
-                    
-                    # Find most used index
-                    max_usage = max(usage_counts) if usage_counts else 0
-                    most_used_idx = usage_counts.index(max_usage) if usage_counts else 0
-                    keep_index = row.duplicate_indexes[most_used_idx]
-                    
-                    for j, idx_name in enumerate(row.duplicate_indexes):
-                        usage = usage_counts[j] if j < len(usage_counts) else 0
-                        usage = usage if usage is not None else 0
-                        
-                        if idx_name == keep_index:
-                            print(f"      ✅ {idx_name} (KEEP - used {usage} times)")
-                        else:
-                            print(f"      ❌ {idx_name} (DROP - used {usage} times)")
-                            recommendations.append(idx_name)
-                    
-                    print(f"   Definition: {row.indexdef[:80]}...")
-                    print()
-                    
-                    total_waste += (row.duplicate_count - 1)
+                usage_counts = row.usage_counts
                 
-                print("=" * 120)
-                print(f"📊 Duplicate Summary:")
-                print(f"   Duplicate groups: {len(result)}")
-                print(f"   Total redundant indexes: {total_waste}")
-                print(f"   Estimated waste: ~{total_waste * 10}MB")
+                # Keep the most used index (first one on ties)
+                keep_idx = max(range(len(usage_counts)), key=usage_counts.__getitem__)
                 
-                # Save recommendations to file
-                if recommendations:
-                    print(f"\n💾 Saving {len(recommendations)} indexes to drop...")
-                    with open('indexes_to_drop.txt', 'w') as f:
-                        f.write("# Indexes recommended for deletion\n")
-                        f.write("# These are duplicates of other indexes\n\n")
-                        for idx in recommendations:
-                            f.write(f"DROP INDEX IF EXISTS {idx};\n")
-                    print(f"   Saved to: indexes_to_drop.txt")
+                for j, (idx_name, usage, size) in enumerate(zip(row.duplicate_indexes, usage_counts, row.sizes)):
+                    if j == keep_idx:
+                        print(f"      ✅ {idx_name} (KEEP - used {usage} times)")
+                    else:
+                        print(f"      ❌ {idx_name} (DROP - used {usage} times, {format_bytes(size)})")
+                        recommendations.append(idx_name)
+                        waste_bytes += size
                 
-            else:
-                print("✅ No duplicate indexes found!")
+                print(f"   Definition: {row.indexdef[:80]}...")
+                print()
                 
+                total_waste += (row.duplicate_count - 1)
+            
+            print("=" * 120)
+            print(f"📊 Duplicate Summary:")
+            print(f"   Duplicate groups: {len(result)}")
+            print(f"   Total redundant indexes: {total_waste}")
+            print(f"   Space used by redundant indexes: {format_bytes(waste_bytes)}")
+            
+            # Save recommendations to file
+            if recommendations:
+                print(f"\n💾 Saving {len(recommendations)} indexes to drop...")
+                with open('indexes_to_drop.txt', 'w', buffering=64 * 1024) as f:
+                    f.write("# Indexes recommended for deletion\n")
+                    f.write("# These are duplicates of other indexes\n\n")
+                    f.writelines(f"DROP INDEX IF EXISTS {idx};\n" for idx in recommendations)
+                print(f"   Saved to: indexes_to_drop.txt")
+            
+        else:
+            print("✅ No duplicate indexes found!")
+            
     except Exception as e:
         print(f"❌ Error finding duplicates: {e}")
         logger.error(f"Error: {e}", exc_info=True)
 
-def show_index_definitions():
+@buffered_output
+def show_index_definitions(rows):
     """Show detailed index definitions for key tables."""
     
     print("\n\n📖 DETAILED INDEX DEFINITIONS")
     print("=" * 120)
     
-    engine = create_engine(settings.database_url)
-    
     key_tables = ['jobs', 'invoices', 'tasks', 'users', 'teams', 'attendance', 'notifications']
     
+    # The inventory is already ordered most used first within each table
+    by_table = {}
+    for row in rows:
+        if row.tablename in key_tables:
+            by_table.setdefault(row.tablename, []).append(row)
+    
     for table in key_tables:
-        query = f"""
-        SELECT 
-            indexname,
-            indexdef,
-            s.idx_scan as times_used
-        FROM pg_indexes t
-        LEFT JOIN pg_stat_user_indexes s ON t.indexname = s.indexrelname
-        WHERE t.schemaname = 'public' 
-        AND t.tablename = '{table}'
-        ORDER BY s.idx_scan DESC NULLS LAST;
-        """
-        
-        try:
-            with engine.connect() as conn:
-                result = conn.execute(text(query)).fetchall()
-                
-                if result:
-                    print(f"\n📋 {table.upper()}")
-                    print("-" * 120)
-                    for row in result:
-                        times_used = row.times_used if row.times_used is not None else 0
-                        print(f"   {row.indexname} (used {times_used} times)")
-                        print(f"   {row.indexdef}")
-                        print()
-                        
-        except Exception as e:
-            print(f"⚠️  Error getting definitions for {table}: {e}")
+        if table in by_table:
+            print(f"\n📋 {table.upper()}")
+            print("-" * 120)
+            for row in by_table[table]:
+                times_used = row.times_used if row.times_used is not None else 0
+                print(f"   {row.indexname} (used {times_used} times)")
+                print(f"   {row.indexdef}")
+                print()
 
-def export_to_json():
+def export_to_json(rows):
     """Export all index information to JSON file."""
     
     print("\n💾 Exporting to JSON...")
     
-    engine = create_engine(settings.database_url)
-    
-    query = """
-    SELECT 
-        t.tablename,
-        t.indexname,
-        t.indexdef,
-        pg_size_pretty(pg_relation_size(i.indexrelid)) as index_size,
-        pg_relation_size(i.indexrelid) as index_size_bytes,
-        s.idx_scan as times_used,
-        s.idx_tup_read as tuples_read,
-        s.idx_tup_fetch as tuples_fetched
-    FROM pg_indexes t
-    LEFT JOIN pg_stat_user_indexes s ON t.indexname = s.indexrelname AND t.tablename = s.relname
-    LEFT JOIN pg_class i ON t.indexname = i.relname
-    WHERE t.schemaname = 'public'
-    ORDER BY t.tablename, t.indexname;
-    """
-    
     try:
-        with engine.connect() as conn:
-            result = conn.execute(text(query)).fetchall()
-            
-            indexes_data = []
-            for row in result:
-                indexes_data.append({
+        # Written one entry per line as it's built, rather than materializing the whole
+        # list and pretty-printing it; the file is still a single JSON array
+        count = 0
+        with open('database_indexes.json', 'w') as f:
+            f.write("[")
+            for row in sorted(rows, key=lambda row: (row.tablename, row.indexname)):
+                f.write(",\n" if count else "\n")
+                f.write(json.dumps({
                     'table': row.tablename,
                     'index_name': row.indexname,
                     'definition': row.indexdef,
@@ -292,42 +374,73 @@ def export_to_json():
                     'times_used': row.times_used if row.times_used is not None else 0,
                     'tuples_read': row.tuples_read if row.tuples_read is not None else 0,
                     'tuples_fetched': row.tuples_fetched if row.tuples_fetched is not None else 0
-                })
-            
-            with open('database_indexes.json', 'w') as f:
-                json.dump(indexes_data, f, indent=2)
-            
-            print(f"✅ Exported {len(indexes_data)} indexes to database_indexes.json")
-            
+                }))
+                count += 1
+            f.write("\n]\n")
+        
+        print(f"✅ Exported {count} indexes to database_indexes.json")
+        
     except Exception as e:
         print(f"❌ Error exporting to JSON: {e}")
 
+def parse_args():
+    """Command line options; by default the inventory, duplicates and JSON export are produced."""
+    parser = argparse.ArgumentParser(description="Analyze database indexes and their usage.")
+    parser.add_argument("--live", action="store_true",
+                        help="read the catalog directly instead of the nightly snapshot")
+    parser.add_argument("--detailed", action="store_true",
+                        help="also print every index definition for the key tables")
+    only = parser.add_mutually_exclusive_group()
+    only.add_argument("--duplicates-only", action="store_true",
+                      help="only run the duplicate index analysis")
+    only.add_argument("--json-only", action="store_true",
+                      help="only export the inventory to JSON")
+    return parser.parse_args()
+
 def main():
     """Main function."""
     
+    args = parse_args()
+    run_all = not (args.duplicates_only or args.json_only)
+    
     print("🚀 Complete Database Index Analysis")
     print("=" * 120)
     print(f"Database: {settings.database_url.split('@')[1] if '@' in settings.database_url else 'Unknown'}")
-    print(f"Timestamp: {__import__('datetime').datetime.now()}")
+    print(f"Timestamp: {datetime.now()}")
     print()
     
+    # One round trip to the catalog; every report below works from these rows
+    try:
+        with engine.connect() as conn:
+            rows = fetch_index_inventory(conn.connection, live=args.live)
+    except Exception as e:
+        print(f"❌ Error listing indexes: {e}")
+        logger.error(f"Error: {e}", exc_info=True)
+        return
+    
     # List all indexes with usage
-    list_all_indexes()
+    if run_all:
+        list_all_indexes(rows)
     
     # Find duplicates
-    find_duplicate_indexes()
+    if run_all or args.duplicates_only:
+        find_duplicate_indexes(rows)
     
-    # Show detailed definitions
-    show_index_definitions()
+    # Show detailed definitions (a full printout, so only on request)
+    if run_all and args.detailed:
+        show_index_definitions(rows)
     
     # Export to JSON
-    export_to_json()
+    if run_all or args.json_only:
+        export_to_json(rows)
     
     print("\n" + "=" * 120)
     print("✅ Analysis complete!")
     print("\nGenerated files:")
-    print("   📄 indexes_to_drop.txt - SQL commands to drop duplicate indexes")
-    print("   📄 database_indexes.json - Complete index inventory in JSON format")
+    if run_all or args.duplicates_only:
+        print("   📄 indexes_to_drop.txt - SQL commands to drop duplicate indexes (when duplicates were found)")
+    if run_all or args.json_only:
+        print("   📄 database_indexes.json - Complete index inventory in JSON format")
 
 if __name__ == "__main__":
     try:
@@ -9,16 +9,15 @@ import sys
 import subprocess
 from pathlib import Path
 
-def run_command(command, description):
-    """Run a command and handle errors."""
+def run_command(args, description):
+    """Run a command (argv list, no shell) with its output streamed live."""
     print(f"Running: {description}")
     try:
-        result = subprocess.run(command, shell=True, check=True, capture_output=True, text=True)
+        subprocess.run(args, check=True)
         print(f"✓ {description} completed successfully")
         return True
     except subprocess.CalledProcessError as e:
-        print(f"✗ {description} failed:")
-        print(f"  Error: {e.stderr}")
+        print(f"✗ {description} failed (exit code {e.returncode})")
         return False
 
 def check_python_version():
@@ -41,15 +40,35 @@ def check_env_file():
 
 def install_dependencies():
     """Install Python dependencies."""
-    return run_command("pip install -r requirements.txt", "Installing dependencies")
+    return run_command([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"], "Installing dependencies")
 
 def run_migrations():
-    """Run database migrations."""
-    return run_command("alembic upgrade head", "Running database migrations")
+    """Run database migrations in this interpreter."""
+    print("Running: Running database migrations")
+    try:
+        # Imported here since alembic is only guaranteed after the install step
+        from alembic import command
+        from alembic.config import Config
+        command.upgrade(Config("alembic.ini"), "head")
+        print("✓ Running database migrations completed successfully")
+        return True
+    except Exception as e:
+        print("✗ Running database migrations failed:")
+        print(f"  Error: {e}")
+        return False
 
 def create_admin_user():
-    """Create admin user."""
-    return run_command("python scripts/init_admin.py", "Creating admin user")
+    """Create admin user in this interpreter, reusing the app imports from the migrations."""
+    print("Running: Creating admin user")
+    try:
+        from init_admin import create_admin_user as init_admin_user
+        init_admin_user()
+        print("✓ Creating admin user completed successfully")
+        return True
+    except Exception as e:
+        print("✗ Creating admin user failed:")
+        print(f"  Error: {e}")
+        return False
 
 def main():
     """Main setup function."""
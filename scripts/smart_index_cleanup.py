@@ -8,12 +8,21 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from sqlalchemy import create_engine, text
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from app.config import settings
 import logging
+import re
+from itertools import groupby
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# One pool for the whole run; CONCURRENTLY drops and VACUUM borrow it in autocommit mode
+engine = create_engine(settings.database_url, pool_pre_ping=True)
+autocommit_engine = engine.execution_options(isolation_level="AUTOCOMMIT")
+
+_IDENTIFIER_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+
 # Indexes that are NEVER used and safe to drop
 UNUSED_INDEXES_TO_DROP = [
     # JOBS - Unused indexes (keeping the ones actually used)
@@ -102,8 +111,9 @@ UNUSED_INDEXES_TO_DROP = [
     "idx_notifications_status",  # Not used
 ]
 
-# Indexes that SHOULD be kept (actively used or needed for dashboard)
-KEEP_INDEXES = [
+# Indexes that SHOULD be kept (actively used or needed for dashboard); a set, since it's
+# only used for membership checks
+KEEP_INDEXES = frozenset({
     # JOBS - Keep these (actively used)
     "ix_jobs_id",  # Used 229 times
     "ix_jobs_supervisor_updated",  # Used 92 times
@@ -146,7 +156,7 @@ KEEP_INDEXES = [
     "ix_notifications_user_created",  # Used 17 times
     "ix_notifications_unread",  # Used 1 time - important for unread count
     "notifications_pkey",  # Primary key
-]
+})
 
 def analyze_dashboard_queries():
     """Show which indexes the dashboard queries should use."""
@@ -193,8 +203,8 @@ def analyze_dashboard_queries():
             print(f"   • {col}")
         print()
 
-def drop_unused_indexes():
-    """Drop unused indexes."""
+def drop_unused_indexes(dry_run=False):
+    """Drop unused indexes (with dry_run, only report which listed indexes still exist)."""
     
     print("\n🧹 Dropping Unused Indexes")
     print("=" * 80)
@@ -202,38 +212,58 @@ def drop_unused_indexes():
     print(f"Indexes to keep: {len(KEEP_INDEXES)}")
     print()
     
-    engine = create_engine(settings.database_url)
-    
     success_count = 0
+    would_drop_count = 0
     not_found_count = 0
     error_count = 0
     
-    with engine.connect() as conn:
+    # Use autocommit for CONCURRENT index drops
+    with autocommit_engine.connect() as conn:
+        # One catalog lookup instead of a DROP round trip for every name that is already gone
+        existing = {
+            row[0] for row in conn.execute(
+                text("SELECT indexname FROM pg_indexes WHERE schemaname = 'public' AND indexname = ANY(:names)"),
+                {"names": UNUSED_INDEXES_TO_DROP}
+            )
+        }
+        
         for i, index_name in enumerate(UNUSED_INDEXES_TO_DROP, 1):
+            print(f"[{i}/{len(UNUSED_INDEXES_TO_DROP)}] Dropping {index_name}...", end=" ")
+            if index_name not in existing:
+                print("⚠️  (not found)")
+                not_found_count += 1
+                continue
+            
+            # Identifiers can't be bound, so only plain names are spliced into the DDL
+            if not _IDENTIFIER_RE.fullmatch(index_name):
+                print("❌ Error: invalid index name")
+                error_count += 1
+                logger.error(f"Refusing to drop {index_name!r}: not a plain identifier")
+                continue
+            
+            if dry_run:
+                print("🔎 (would drop)")
+                would_drop_count += 1
+                continue
+            
             try:
-                print(f"[{i}/{len(UNUSED_INDEXES_TO_DROP)}] Dropping {index_name}...", end=" ")
-                
-                drop_sql = f"DROP INDEX IF EXISTS {index_name}"
-                conn.execute(text(drop_sql))
-                conn.commit()
-                
+                # CONCURRENTLY doesn't block reads and writes on the table while dropping;
+                # it needs its own statement outside a transaction block
+                conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name}"))
                 print("✅")
                 success_count += 1
                 
             except Exception as e:
-                error_msg = str(e).lower()
-                if "does not exist" in error_msg:
-                    print("⚠️  (not found)")
-                    not_found_count += 1
-                else:
-                    print(f"❌ Error: {e}")
-                    error_count += 1
-                    logger.error(f"Failed to drop {index_name}: {e}")
-                    conn.rollback()
+                print(f"❌ Error: {e}")
+                error_count += 1
+                logger.error(f"Failed to drop {index_name}: {e}")
     
     print("\n" + "=" * 80)
     print("📊 Cleanup Summary:")
-    print(f"   Successfully dropped: {success_count}")
+    if dry_run:
+        print(f"   Would drop: {would_drop_count}")
+    else:
+        print(f"   Successfully dropped: {success_count}")
     print(f"   Not found: {not_found_count}")
     print(f"   Errors: {error_count}")
     print()
@@ -246,31 +276,36 @@ def show_remaining_indexes():
     print("\n📋 Remaining Indexes After Cleanup")
     print("=" * 80)
     
-    engine = create_engine(settings.database_url)
-    
     tables = ['jobs', 'invoices', 'tasks', 'users', 'teams', 'attendance', 'notifications']
     
-    for table in tables:
-        query = f"""
-        SELECT indexname
-        FROM pg_indexes
-        WHERE schemaname = 'public' 
-        AND tablename = '{table}'
-        ORDER BY indexname;
-        """
+    # One bound query for every table instead of one interpolated query per table
+    query = text("""
+    SELECT tablename, indexname
+    FROM pg_indexes
+    WHERE schemaname = 'public' 
+    AND tablename = ANY(:tables)
+    ORDER BY tablename, indexname;
+    """)
+    
+    try:
+        with engine.connect() as conn:
+            result = conn.execute(query, {"tables": tables}).fetchall()
         
-        try:
-            with engine.connect() as conn:
-                result = conn.execute(text(query)).fetchall()
-                
-                if result:
-                    print(f"\n{table.upper()} ({len(result)} indexes):")
-                    for row in result:
-                        status = "✅" if row.indexname in KEEP_INDEXES else "⚠️"
-                        print(f"   {status} {row.indexname}")
-                        
-        except Exception as e:
-            print(f"⚠️  Error getting indexes for {table}: {e}")
+        by_table = {table: list(rows) for table, rows in groupby(result, key=lambda row: row.tablename)}
+        for table in tables:
+            if table in by_table:
+                print(f"\n{table.upper()} ({len(by_table[table])} indexes):")
+                for row in by_table[table]:
+                    status = "✅" if row.indexname in KEEP_INDEXES else "⚠️"
+                    print(f"   {status} {row.indexname}")
+                    
+    except Exception as e:
+        print(f"⚠️  Error getting remaining indexes: {e}")
+
+def vacuum_table(table):
+    """VACUUM ANALYZE one table on its own connection."""
+    with autocommit_engine.connect() as conn:
+        conn.execute(text(f"VACUUM ANALYZE {table}"))
 
 def vacuum_analyze():
     """Run VACUUM ANALYZE to reclaim space."""
@@ -278,22 +313,20 @@ def vacuum_analyze():
     print("\n🔧 Running VACUUM ANALYZE...")
     print("=" * 80)
     
-    engine = create_engine(settings.database_url, isolation_level="AUTOCOMMIT")
-    
     tables = ['jobs', 'invoices', 'tasks', 'users', 'teams', 'attendance', 'notifications']
     
     try:
-        conn = engine.connect()
+        # Tables are independent, so each one is vacuumed on its own connection in parallel
+        with ThreadPoolExecutor(max_workers=len(tables)) as executor:
+            futures = {executor.submit(vacuum_table, table): table for table in tables}
+            for future in as_completed(futures):
+                table = futures[future]
+                try:
+                    future.result()
+                    print(f"Analyzed {table} ✅")
+                except Exception as e:
+                    print(f"Analyzing {table} ❌ {e}")
         
-        for table in tables:
-            try:
-                print(f"Analyzing {table}...", end=" ")
-                conn.execute(text(f"VACUUM ANALYZE {table}"))
-                print("✅")
-            except Exception as e:
-                print(f"❌ {e}")
-        
-        conn.close()
         print("\n✅ VACUUM ANALYZE completed")
         
     except Exception as e:
@@ -322,6 +355,11 @@ def main():
     print(f"Will keep: {len(KEEP_INDEXES)} indexes")
     print()
     
+    if '--dry-run' in sys.argv:
+        # Only reports what is left to drop, so no confirmation is needed
+        drop_unused_indexes(dry_run=True)
+        return True
+    
     if os.getenv('AUTO_CONFIRM') != 'true':
         response = input("Do you want to proceed? (yes/no): ")
         if response.lower() not in ['yes', 'y']:
@@ -4,42 +4,107 @@ Script to update existing teams with supervisor_id values
 """
 import sys
 import os
+import logging
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from sqlalchemy.orm import Session
-from app.database import get_db
-from app.models import Team, User, UserRole
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import aliased
+from app.database import SessionLocal
+from app.models import Team, User
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Teams per UPDATE statement and commit, by id range, to bound each statement's row locks
+BATCH_SIZE = 1000
 
 def update_team_supervisors():
     """Update teams with supervisor_id based on existing supervisor assignments"""
-    db = next(get_db())
-    
     try:
-        # Get all teams
-        teams = db.query(Team).all()
-        
-        for team in teams:
-            # Find the supervisor for this team
-            supervisor = db.query(User).filter(
-                User.team_id == team.id,
-                User.role == UserRole.SUPERVISOR
-            ).first()
-            
-            if supervisor:
-                team.supervisor_id = supervisor.id
-                print(f"Updated team '{team.name}' with supervisor '{supervisor.name}' (ID: {supervisor.id})")
-            else:
-                print(f"No supervisor found for team '{team.name}'")
-        
-        # Commit the changes
-        db.commit()
-        print("Successfully updated all teams with supervisor information")
-        
+        with SessionLocal() as db:
+            updated, unassigned, failed = _update_team_supervisors(db)
     except Exception as e:
         print(f"Error updating teams: {e}")
-        db.rollback()
-    finally:
-        db.close()
+        return
+    
+    summary = f"{updated} updated, {unassigned} without a supervisor"
+    if failed:
+        ranges = ", ".join(f"{lower + 1}-{upper}" for lower, upper in failed)
+        print(f"Updated teams with supervisor information ({summary}), but {len(failed)} batch(es) failed "
+              f"for team ids {ranges}; re-run to retry them")
+    else:
+        print(f"Successfully updated all teams with supervisor information ({summary})")
+
+def _update_team_supervisors(db):
+    """
+    Point every team at its members' supervisor, committing each batch of team ids
+    on its own so a failure only loses that batch.
+    
+    Returns (updated, unassigned) counts and the (lower, upper] id ranges that failed.
+    """
+    # Users no longer carry a role; a team's supervisor is the user its members
+    # report to (lowest id if they report to several)
+    assignments = (
+        select(User.team_id, func.min(User.supervisor_id).label("supervisor_id"))
+        .where(User.team_id.isnot(None), User.supervisor_id.isnot(None))
+        .group_by(User.team_id)
+        .subquery()
+    )
+    Supervisor = aliased(User)
+    
+    # The update runs server-side, one statement per range of BATCH_SIZE team ids;
+    # RETURNING feeds the report
+    update_batch = (
+        update(Team)
+        .where(
+            Team.id == assignments.c.team_id,
+            Supervisor.id == assignments.c.supervisor_id,
+            # Filtering on the grouped column lets the range reach the users scan too
+            assignments.c.team_id > bindparam("lower"),
+            assignments.c.team_id <= bindparam("upper"),
+            # Teams already pointing at the right supervisor aren't rewritten, so a re-run writes nothing
+            Team.supervisor_id.is_distinct_from(assignments.c.supervisor_id),
+        )
+        .values(supervisor_id=assignments.c.supervisor_id)
+        .returning(Team.name, Supervisor.id, Supervisor.name)
+        .execution_options(synchronize_session=False)
+    )
+    max_team_id = db.scalar(select(func.max(Team.id))) or 0
+    
+    # Per-team lines are debug output (--verbose); a large run only prints the summary
+    updated_count = 0
+    failed = []
+    for lower in range(0, max_team_id, BATCH_SIZE):
+        upper = lower + BATCH_SIZE
+        try:
+            updated = db.execute(update_batch, {"lower": lower, "upper": upper}).all()
+            db.commit()
+        except SQLAlchemyError:
+            # Committed batches stay; the idempotent update picks this one up on a re-run
+            db.rollback()
+            failed.append((lower, upper))
+            logger.exception(f"Failed to update supervisors for team ids {lower + 1}-{upper}")
+            continue
+        
+        updated_count += len(updated)
+        for team_name, supervisor_id, supervisor_name in updated:
+            logger.debug(f"Updated team '{team_name}' with supervisor '{supervisor_name}' (ID: {supervisor_id})")
+    
+    # Streamed from a server-side cursor in batches, so memory doesn't grow with the team count
+    unassigned = db.scalars(
+        select(Team.name)
+        .where(Team.id.not_in(select(assignments.c.team_id)))
+        .execution_options(yield_per=1000)
+    )
+    unassigned_count = 0
+    for team_name in unassigned:
+        unassigned_count += 1
+        logger.debug(f"No supervisor found for team '{team_name}'")
+    
+    return updated_count, unassigned_count, failed
 
 if __name__ == "__main__":
+    if '--verbose' in sys.argv:
+        logger.setLevel(logging.DEBUG)
     update_team_supervisors()